@@ -1,7 +1,17 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
-from .models import User, Speciality, DoctorProfile, PatientProfile, MedicalRecord
+from . import appointments, audit, jobs, stats
+from .models import (
+    AccessEvent, User, Speciality, DoctorProfile, PatientProfile, MedicalRecord, AuthToken, Job,
+    WeeklySchedule, ScheduleException, Appointment, StatCounter,
+)
 
 # ==============================================
 # ADMIN POUR LE MODÈLE USER PERSONNALISÉ
@@ -52,32 +62,94 @@ class UserAdmin(BaseUserAdmin):
     
     def activate_users(self, request, queryset):
         """Activer les utilisateurs sélectionnés."""
-        updated = queryset.update(is_active=True)
-        self.message_user(request, f"{updated} utilisateur(s) activé(s).")
+        self.bulk_update(request, queryset, {"is_active": True}, "activé(s)")
     activate_users.short_description = _("Activer les utilisateurs sélectionnés")
     
     def deactivate_users(self, request, queryset):
         """Désactiver les utilisateurs sélectionnés."""
-        updated = queryset.update(is_active=False)
-        self.message_user(request, f"{updated} utilisateur(s) désactivé(s).")
+        self.bulk_update(request, queryset, {"is_active": False}, "désactivé(s)")
     deactivate_users.short_description = _("Désactiver les utilisateurs sélectionnés")
     
     def make_agents(self, request, queryset):
         """Transformer les utilisateurs en agents administratifs."""
-        updated = queryset.update(role=User.Roles.AGENT)
-        self.message_user(request, f"{updated} utilisateur(s) transformé(s) en agents.")
+        self.bulk_update(request, queryset, {"role": User.Roles.AGENT}, "transformé(s) en agents")
     make_agents.short_description = _("Définir comme agents administratifs")
     
     def make_patients(self, request, queryset):
         """Transformer les utilisateurs en patients."""
-        updated = queryset.update(role=User.Roles.PATIENT)
-        self.message_user(request, f"{updated} utilisateur(s) transformé(s) en patients.")
+        self.bulk_update(request, queryset, {"role": User.Roles.PATIENT}, "transformé(s) en patients")
     make_patients.short_description = _("Définir comme patients")
+    
+    def bulk_update(self, request, queryset, values, verb):
+        """
+        Mise à jour immédiate jusqu'à ``JOB_INLINE_THRESHOLD`` lignes ; au-delà,
+        une tâche traitée par lots (``manage.py run_jobs``) évite de bloquer la
+        requête et de verrouiller toute la table dans une seule transaction.
+        """
+        # queryset.update() n'émet pas de signaux : l'opération vide elle-même les caches.
+        params = {"values": values}
+        count = queryset.count()
+        if count <= settings.JOB_INLINE_THRESHOLD:
+            updated = jobs.run_inline("users.update", queryset, params)
+            self.message_user(request, f"{updated} utilisateur(s) {verb}.")
+            return
+        job = jobs.enqueue("users.update", queryset, params, user=request.user)
+        url = reverse("admin:app_job_change", args=[job.pk])
+        self.message_user(request, format_html(
+            '{} utilisateur(s) seront {} en arrière-plan : <a href="{}">tâche #{}</a>.',
+            job.total, verb.replace("(s)", "s"), url, job.pk,
+        ))
 
 # ==============================================
 # ADMINS POUR LES MODÈLES MÉTIERS
 # ==============================================
 
+class AuditedAdminMixin:
+    """
+    Journalise les lignes affichées par la liste et la fiche de l'admin
+    (``app/audit.py``), comme ``AuditedSerializerMixin`` pour l'API.
+    """
+    
+    audit_action = None
+    
+    def audit_target(self, obj):
+        """Couple ``(patient_id, record_id)`` de l'objet."""
+        raise NotImplementedError
+    
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, "context_data", {}).get("cl")
+        if changelist is not None:
+            # Même page que celle rendue par le gabarit : pas de requête en plus.
+            audit.record(request, self.audit_action, [self.audit_target(obj) for obj in changelist.result_list])
+        return response
+    
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        response = super().change_view(request, object_id, form_url, extra_context)
+        original = getattr(response, "context_data", {}).get("original")
+        if original is not None:
+            audit.record(request, self.audit_action, [self.audit_target(original)])
+        return response
+
+class DoctorListFilter(admin.RelatedFieldListFilter):
+    """Filtre par médecin chargé en une requête (``__str__`` lit user et speciality)."""
+    
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        doctors = DoctorProfile.objects.select_related('user', 'speciality')
+        if ordering:
+            doctors = doctors.order_by(*ordering)
+        return [(doctor.pk, str(doctor)) for doctor in doctors]
+
+class RankedSearchChangeList(ChangeList):
+    """Trie les résultats d'une recherche plein texte par pertinence."""
+    
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        if self.query and ORDER_VAR not in self.params and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', *ordering]
+        return ordering
+
 @admin.register(Speciality)
 class SpecialityAdmin(admin.ModelAdmin):
     """Administration des spécialités médicales."""
@@ -86,10 +158,25 @@ class SpecialityAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     list_per_page = 20
     
+    def get_queryset(self, request):
+        # Compteur maintenu à l'écriture : pas de jointure ni de GROUP BY sur les médecins.
+        return super().get_queryset(request).annotate(
+            _doctor_count=stats.counter_subquery(stats.DOCTORS_BY_SPECIALITY)
+        )
+    
     def doctor_count(self, obj):
         """Nombre de médecins dans cette spécialité."""
-        return obj.doctorprofile_set.count()
+        return obj._doctor_count
     doctor_count.short_description = _("Nombre de médecins")
+    doctor_count.admin_order_field = '_doctor_count'
+
+class WeeklyScheduleInline(admin.TabularInline):
+    model = WeeklySchedule
+    extra = 0
+
+class ScheduleExceptionInline(admin.TabularInline):
+    model = ScheduleException
+    extra = 0
 
 @admin.register(DoctorProfile)
 class DoctorProfileAdmin(admin.ModelAdmin):
@@ -101,8 +188,11 @@ class DoctorProfileAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 
                     'license_number', 'speciality__name')
     raw_id_fields = ('user', 'speciality')
+    list_select_related = ('user', 'speciality')
     list_per_page = 20
     list_editable = ('is_available', 'consultation_fee')
+    # Chaque modification recalcule l'index des créneaux du médecin (signaux).
+    inlines = (WeeklyScheduleInline, ScheduleExceptionInline)
     
     def get_full_name(self, obj):
         """Affiche le nom complet du médecin."""
@@ -111,7 +201,7 @@ class DoctorProfileAdmin(admin.ModelAdmin):
     get_full_name.admin_order_field = 'user__last_name'
 
 @admin.register(PatientProfile)
-class PatientProfileAdmin(admin.ModelAdmin):
+class PatientProfileAdmin(AuditedAdminMixin, admin.ModelAdmin):
     """Administration des profils patients."""
     
     list_display = ('get_full_name', 'blood_type', 'emergency_contact', 
@@ -120,7 +210,14 @@ class PatientProfileAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 
                     'emergency_contact', 'emergency_phone')
     raw_id_fields = ('user',)
+    list_select_related = ('user',)
     list_per_page = 20
+    audit_action = AccessEvent.Action.VIEW_PATIENT
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _medical_record_count=stats.counter_subquery(stats.RECORDS_BY_PATIENT)
+        )
     
     def get_full_name(self, obj):
         """Affiche le nom complet du patient."""
@@ -130,21 +227,27 @@ class PatientProfileAdmin(admin.ModelAdmin):
     
     def medical_record_count(self, obj):
         """Nombre de dossiers médicaux du patient."""
-        return obj.medical_records.count()
+        return obj._medical_record_count
     medical_record_count.short_description = _("Dossiers médicaux")
+    medical_record_count.admin_order_field = '_medical_record_count'
+    
+    def audit_target(self, obj):
+        return obj.pk, None
 
 @admin.register(MedicalRecord)
-class MedicalRecordAdmin(admin.ModelAdmin):
-    """Administration des dossiers médicaux."""
+class MedicalRecordAdmin(AuditedAdminMixin, admin.ModelAdmin):
+    """Administration des dossiers médicaux (consultations journalisées)."""
     
+    audit_action = AccessEvent.Action.VIEW_RECORD
     list_display = ('title', 'patient_name', 'doctor_name', 'record_date', 
                    'created_at', 'updated_at')
-    list_filter = ('record_date', 'doctor', 'created_at')
+    list_filter = ('record_date', ('doctor', DoctorListFilter), 'created_at')
     search_fields = ('title', 'description', 'diagnosis', 'treatment',
                     'patient__user__username', 'patient__user__first_name',
                     'doctor__user__username', 'doctor__user__first_name')
     date_hierarchy = 'record_date'
     raw_id_fields = ('patient', 'doctor')
+    list_select_related = ('patient__user', 'doctor__user')
     list_per_page = 30
     readonly_fields = ('created_at', 'updated_at')
     
@@ -162,6 +265,18 @@ class MedicalRecordAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_changelist(self, request, **kwargs):
+        return RankedSearchChangeList
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Recherche plein texte (index GIN) sous PostgreSQL, ILIKE sinon."""
+        if not search_term.strip() or connection.vendor != 'postgresql':
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.search(search_term), False
+    
+    def audit_target(self, obj):
+        return obj.patient_id, obj.pk
+    
     def patient_name(self, obj):
         """Affiche le nom du patient."""
         return obj.patient.user.get_full_name()
@@ -174,6 +289,106 @@ class MedicalRecordAdmin(admin.ModelAdmin):
     doctor_name.short_description = _("Médecin")
     doctor_name.admin_order_field = 'doctor__user__last_name'
 
+@admin.register(Appointment)
+class AppointmentAdmin(admin.ModelAdmin):
+    """Consultation et annulation des rendez-vous (la réservation passe par l'API)."""
+    
+    list_display = ('start', 'doctor_name', 'patient_name', 'status', 'reason')
+    list_filter = ('status', 'start')
+    date_hierarchy = 'start'
+    search_fields = ('doctor__user__last_name', 'patient__user__last_name', 'reason')
+    raw_id_fields = ('doctor', 'patient')
+    list_select_related = ('doctor__user', 'patient__user')
+    readonly_fields = ('doctor', 'patient', 'start', 'end', 'status', 'reason', 'created_at')
+    actions = ['cancel_appointments']
+    
+    def has_add_permission(self, request):
+        # Une réservation doit passer par le verrou de l'index des créneaux.
+        return False
+    
+    def doctor_name(self, obj):
+        """Affiche le nom du médecin."""
+        return obj.doctor.user.get_full_name()
+    doctor_name.short_description = _("Médecin")
+    doctor_name.admin_order_field = 'doctor__user__last_name'
+    
+    def patient_name(self, obj):
+        """Affiche le nom du patient."""
+        return obj.patient.user.get_full_name()
+    patient_name.short_description = _("Patient")
+    patient_name.admin_order_field = 'patient__user__last_name'
+    
+    def cancel_appointments(self, request, queryset):
+        """Annuler les rendez-vous sélectionnés et libérer les créneaux."""
+        cancelled = 0
+        for appointment in queryset.filter(status=Appointment.Status.BOOKED):
+            appointments.cancel(appointment)
+            cancelled += 1
+        self.message_user(request, f"{cancelled} rendez-vous annulé(s).")
+    cancel_appointments.short_description = _("Annuler les rendez-vous sélectionnés")
+
+@admin.register(AuthToken)
+class AuthTokenAdmin(admin.ModelAdmin):
+    """Consultation et révocation des jetons d'API."""
+    
+    list_display = ('user', 'name', 'created_at', 'expires_at')
+    list_select_related = ('user',)
+    search_fields = ('user__username', 'name')
+    raw_id_fields = ('user',)
+    readonly_fields = ('user', 'key_hash', 'name', 'created_at', 'expires_at')
+    
+    def has_add_permission(self, request):
+        # Les jetons sont émis par l'API : la clé en clair n'est jamais stockée.
+        return False
+
+@admin.register(StatCounter)
+class StatCounterAdmin(admin.ModelAdmin):
+    """Compteurs des statistiques (lecture seule, corrigés par ``reconcile_stats``)."""
+    
+    list_display = ('name', 'key', 'shard', 'value')
+    list_filter = ('name',)
+    search_fields = ('key',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Suivi des tâches en arrière-plan (lecture seule)."""
+    
+    list_display = ('__str__', 'status', 'progress_display', 'attempts', 'created_by',
+                   'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    list_select_related = ('created_by',)
+    readonly_fields = ('kind', 'params', 'status', 'total', 'processed', 'cursor', 'attempts',
+                       'max_attempts', 'last_error', 'run_after', 'heartbeat_at', 'created_by',
+                       'created_at', 'started_at', 'finished_at')
+    exclude = ('pk_ranges',)
+    actions = ['retry_jobs']
+    
+    def has_add_permission(self, request):
+        # Les tâches sont créées par les actions de masse.
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def progress_display(self, obj):
+        """Avancement : lignes traitées / total."""
+        return f"{obj.processed}/{obj.total} ({obj.progress} %)"
+    progress_display.short_description = _("Avancement")
+    
+    def retry_jobs(self, request, queryset):
+        """Relancer les tâches échouées (reprise au dernier lot validé)."""
+        retried = queryset.filter(status=Job.Status.FAILED).update(
+            status=Job.Status.PENDING, attempts=0, run_after=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f"{retried} tâche(s) relancée(s).")
+    retry_jobs.short_description = _("Relancer les tâches échouées")
+
 # ==============================================
 # PERSONNALISATION DE L'INTERFACE ADMIN GLOBALE
 # ==============================================
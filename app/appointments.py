@@ -0,0 +1,210 @@
+# app/appointments.py
+import itertools
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Appointment, DoctorDaySlots, DoctorProfile, ScheduleException, WeeklySchedule
+
+
+class SlotUnavailable(Exception):
+    """Créneau inexistant, passé ou déjà réservé."""
+
+
+def slot_minutes():
+    minutes = settings.APPOINTMENT_SLOT_MINUTES
+    # Une journée doit tenir dans un BIGINT signé (63 bits).
+    if minutes <= 0 or 1440 % minutes or 1440 // minutes > 63:
+        raise ImproperlyConfigured("APPOINTMENT_SLOT_MINUTES doit diviser 1440 en au plus 63 créneaux.")
+    return minutes
+
+
+def slot_start(day, index):
+    """Début (heure locale) du créneau ``index`` de ``day``."""
+    naive = datetime.combine(day, time.min) + timedelta(minutes=index * slot_minutes())
+    return timezone.make_aware(naive)
+
+
+def slot_of(start):
+    """``(jour, index)`` d'un début de créneau ; ``SlotUnavailable`` s'il n'est pas sur la grille."""
+    local = timezone.localtime(start)
+    minutes = local.hour * 60 + local.minute
+    if local.second or local.microsecond or minutes % slot_minutes():
+        raise SlotUnavailable("Le début ne correspond à aucun créneau.")
+    return local.date(), minutes // slot_minutes()
+
+
+def range_mask(start_time, end_time):
+    """Bits des créneaux entièrement compris dans ``[start_time, end_time)``."""
+    minutes = slot_minutes()
+    first = -(-(start_time.hour * 60 + start_time.minute) // minutes)
+    last = (end_time.hour * 60 + end_time.minute) // minutes if end_time != time.min else 1440 // minutes
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def day_mask(weekday_ranges, exceptions, booked):
+    """Créneaux libres d'une journée : horaires, moins absences et rendez-vous."""
+    mask = 0
+    for start_time, end_time in weekday_ranges:
+        mask |= range_mask(start_time, end_time)
+    for start_time, end_time in exceptions:
+        if start_time is None:
+            return 0
+        # Un créneau entamé par l'absence est retiré.
+        minutes = slot_minutes()
+        first = (start_time.hour * 60 + start_time.minute) // minutes
+        last = -(-(end_time.hour * 60 + end_time.minute) // minutes) if end_time else 1440 // minutes
+        mask &= ~(((1 << max(last - first, 0)) - 1) << first)
+    for index in booked:
+        mask &= ~(1 << index)
+    return mask
+
+
+def rebuild(doctors=None, start=None, days=None):
+    """
+    Recalcule l'index des créneaux sur ``[start, start + days)``.
+
+    ``doctors`` : identifiants de profils (tous par défaut). Les lignes
+    existantes sont verrouillées avant la lecture des rendez-vous, pour ne pas
+    écraser une réservation concurrente ; une ligne en retard resterait de
+    toute façon couverte par la contrainte d'unicité des rendez-vous.
+    Retourne le nombre de journées indexées.
+    """
+    start = start or timezone.localdate()
+    days = settings.APPOINTMENT_HORIZON_DAYS if days is None else days
+    end = start + timedelta(days=days)
+    profiles = DoctorProfile.objects.all()
+    if doctors is not None:
+        profiles = profiles.filter(pk__in=doctors)
+    profiles = {pk: (speciality, available) for pk, speciality, available
+                in profiles.values_list("pk", "speciality_id", "is_available")}
+
+    schedules, exceptions, booked = {}, {}, {}
+    for doctor, weekday, start_time, end_time in WeeklySchedule.objects.filter(
+            doctor__in=profiles).values_list("doctor", "weekday", "start_time", "end_time"):
+        schedules.setdefault((doctor, weekday), []).append((start_time, end_time))
+    for doctor, day, start_time, end_time in ScheduleException.objects.filter(
+            doctor__in=profiles, date__gte=start, date__lt=end).values_list(
+            "doctor", "date", "start_time", "end_time"):
+        exceptions.setdefault((doctor, day), []).append((start_time, end_time))
+
+    with transaction.atomic():
+        existing = DoctorDaySlots.objects.filter(doctor__in=profiles, date__gte=start, date__lt=end)
+        stale = set(existing.select_for_update().values_list("doctor", "date"))
+        for doctor, appointment_start in Appointment.objects.filter(
+                doctor__in=profiles, status=Appointment.Status.BOOKED,
+                start__gte=slot_start(start, 0), start__lt=slot_start(end, 0)).values_list("doctor", "start"):
+            day, index = slot_of(appointment_start)
+            booked.setdefault((doctor, day), []).append(index)
+
+        rows = []
+        for doctor, (speciality, available) in profiles.items():
+            for offset in range(days):
+                day = start + timedelta(days=offset)
+                ranges = schedules.get((doctor, day.weekday()))
+                if not ranges:
+                    continue
+                rows.append(DoctorDaySlots(
+                    doctor_id=doctor, date=day, speciality_id=speciality, is_available=available,
+                    free=day_mask(ranges, exceptions.get((doctor, day), ()), booked.get((doctor, day), ())),
+                ))
+                stale.discard((doctor, day))
+        DoctorDaySlots.objects.bulk_create(
+            rows, batch_size=1000, update_conflicts=True, unique_fields=["doctor", "date"],
+            update_fields=["speciality", "is_available", "free"],
+        )
+        for doctor, day in stale:
+            DoctorDaySlots.objects.filter(doctor=doctor, date=day).delete()
+    return len(rows)
+
+
+def free_slots(speciality=None, doctor=None, days=14, limit=10, now=None):
+    """
+    Premiers créneaux libres des ``days`` prochains jours, par ordre chronologique.
+
+    Une ligne de l'index par médecin et par jour : les journées sont lues dans
+    l'ordre et la lecture s'arrête dès que ``limit`` créneaux sont trouvés.
+    Retourne des tuples ``(début, identifiant du médecin)``.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    rows = DoctorDaySlots.objects.filter(
+        date__gte=today, date__lt=today + timedelta(days=days), is_available=True,
+    ).exclude(free=0)
+    if speciality is not None:
+        rows = rows.filter(speciality=speciality)
+    if doctor is not None:
+        rows = rows.filter(doctor=doctor)
+    rows = rows.order_by("date").values_list("date", "doctor", "free")
+
+    found = []
+    for day, group in itertools.groupby(rows.iterator(chunk_size=500), key=lambda row: row[0]):
+        candidates = []
+        for _, doctor_id, mask in group:
+            while mask:
+                low = mask & -mask
+                mask ^= low
+                candidates.append((low.bit_length() - 1, doctor_id))
+        candidates.sort()
+        for index, doctor_id in candidates:
+            start = slot_start(day, index)
+            if start > now:
+                found.append((start, doctor_id))
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+def book(doctor, patient, start, reason=""):
+    """
+    Réserve un créneau ; ``SlotUnavailable`` s'il n'est pas libre.
+
+    La ligne de l'index du médecin pour ce jour est verrouillée
+    (``SELECT ... FOR UPDATE``) : les réservations concurrentes d'une même
+    journée sont sérialisées, celles de médecins différents restent
+    parallèles. La contrainte ``appointment_no_double_booking`` garantit
+    l'absence de double réservation même sans verrou de ligne (SQLite).
+    """
+    if start <= timezone.now():
+        raise SlotUnavailable("Le créneau est passé.")
+    day, index = slot_of(start)
+    bit = 1 << index
+    with transaction.atomic():
+        slots = (
+            DoctorDaySlots.objects.select_for_update()
+            .filter(doctor=doctor, date=day, is_available=True).only("pk", "free").first()
+        )
+        if slots is None or not slots.free & bit:
+            raise SlotUnavailable("Ce créneau n'est pas disponible.")
+        try:
+            with transaction.atomic():
+                appointment = Appointment.objects.create(
+                    doctor=doctor, patient=patient, start=start,
+                    end=start + timedelta(minutes=slot_minutes()), reason=reason,
+                )
+        except IntegrityError:
+            raise SlotUnavailable("Ce créneau vient d'être réservé.")
+        # Masque appliqué en SQL : pas de mise à jour perdue entre deux créneaux du même jour.
+        DoctorDaySlots.objects.filter(pk=slots.pk).update(free=F("free").bitand(~bit))
+    return appointment
+
+
+def cancel(appointment):
+    """Annule un rendez-vous et remet le créneau dans l'index s'il est toujours ouvert."""
+    with transaction.atomic():
+        updated = Appointment.objects.filter(pk=appointment.pk, status=Appointment.Status.BOOKED).update(
+            status=Appointment.Status.CANCELLED,
+        )
+        appointment.status = Appointment.Status.CANCELLED
+        if updated:
+            day, _ = slot_of(appointment.start)
+            today = timezone.localdate()
+            if today <= day < today + timedelta(days=settings.APPOINTMENT_HORIZON_DAYS):
+                rebuild(doctors=[appointment.doctor_id], start=day, days=1)
+    return appointment
@@ -7,5 +7,5 @@ class AppConfig(AppConfig):
 
     def ready(self):
         # If you use signals, import them here
-        # import app.signals
-        pass
+        import app.checks  # noqa: F401
+        import app.signals  # noqa: F401
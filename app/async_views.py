@@ -0,0 +1,178 @@
+# app/async_views.py
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.authentication import get_authorization_header
+from rest_framework.request import Request
+
+from .authentication import TokenAuthentication
+from .cache import doctor_directory_cache
+from .conditional import (
+    acollection_validators, changed_at, not_modified_response, parse_updated_since, set_validators,
+)
+from .instrumentation import TimedJSONRenderer, span
+from .pagination import KeysetPagination
+from .serializers import DoctorDirectoryFilterSerializer
+from .views import DoctorViewSet, MedicalRecordViewSet, UserAdminViewSet
+
+
+class AsyncAPIView(View):
+    """
+    Vue en lecture seule servie nativement sous ASGI.
+
+    Authentification par jeton (``Authorization: Bearer``, même cache de
+    principaux que ``TokenAuthentication``), permissions DRF, pagination par
+    clé et sérialiseurs des vues synchrones ; les requêtes passent par l'ORM
+    asynchrone (``aget``, ``async for``). Les sessions ne sont pas acceptées.
+
+    Les sous-classes reprennent ``queryset``, ``serializer_class`` et
+    ``permission_classes`` du viewset équivalent via ``viewset``.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    viewset = None
+    renderer = TimedJSONRenderer()
+    authenticator = TokenAuthentication()
+
+    @property
+    def permission_classes(self):
+        return self.viewset.permission_classes
+
+    async def dispatch(self, request, *args, **kwargs):
+        drf_request = Request(request)
+        self.request = drf_request
+        self.args, self.kwargs = args, kwargs
+        try:
+            with span("auth"):
+                drf_request.user, drf_request.auth = await self.authenticate(request)
+            with span("perm"):
+                self.check_permissions(drf_request)
+            response = await super().dispatch(drf_request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            # Même format d'erreur que le gestionnaire d'exceptions de DRF.
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+            response = self.render(data, exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response["WWW-Authenticate"] = self.authenticator.authenticate_header(request)
+        return response
+
+    async def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.authenticator.keyword.lower().encode():
+            return AnonymousUser(), None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed("En-tête d'authentification invalide.")
+        try:
+            key = header[1].decode("ascii")
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed("Jeton invalide.")
+        return await self.authenticator.aauthenticate_credentials(key)
+
+    def check_permissions(self, request):
+        for permission in self.permission_classes:
+            if not permission().has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied()
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status_code,
+                            content_type=self.renderer.media_type)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("context", {"request": self.request, "view": self})
+        return self.viewset.serializer_class(*args, **kwargs)
+
+    def get_queryset(self):
+        return self.viewset.queryset.all()
+
+    async def get_object(self):
+        try:
+            return await self.get_queryset().aget(pk=self.kwargs["pk"])
+        except (self.viewset.queryset.model.DoesNotExist, ValueError):
+            raise exceptions.NotFound()
+
+    async def paginated(self, queryset):
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(queryset, self.request, view=self.viewset)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data).data
+
+
+class AsyncUserList(AsyncAPIView):
+    viewset = UserAdminViewSet
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        columns = self.viewset.serializer_class.requested_model_fields(self.request)
+        if columns is not None:
+            queryset = queryset.only(*columns, *self.viewset.keyset_ordering)
+        return queryset
+
+    async def get(self, request):
+        return self.render(await self.paginated(self.get_queryset()))
+
+
+class AsyncUserDetail(AsyncAPIView):
+    viewset = UserAdminViewSet
+
+    async def get(self, request, pk):
+        return self.render(self.get_serializer(await self.get_object()).data)
+
+
+class AsyncMedicalRecordQuerysetMixin:
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
+
+
+class AsyncMedicalRecordList(AsyncMedicalRecordQuerysetMixin, AsyncAPIView):
+    viewset = MedicalRecordViewSet
+
+    async def get(self, request):
+        queryset = self.get_queryset()
+        changed = changed_at(self.viewset.validator_fields)
+        updated_since = parse_updated_since(request)
+        if updated_since is not None:
+            queryset = queryset.alias(changed_at=changed).filter(changed_at__gt=updated_since)
+        etag, last_modified = await acollection_validators(queryset, changed)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(self.render(await self.paginated(queryset)), etag, last_modified)
+
+
+class AsyncMedicalRecordDetail(AsyncMedicalRecordQuerysetMixin, AsyncAPIView):
+    viewset = MedicalRecordViewSet
+
+    async def get(self, request, pk):
+        return self.render(self.get_serializer(await self.get_object()).data)
+
+
+class AsyncDoctorList(AsyncAPIView):
+    viewset = DoctorViewSet
+
+    async def get(self, request):
+        filters = DoctorDirectoryFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        lookups = filters.to_filters()
+        params = {
+            "view": "async-list",
+            "host": request.get_host(),
+            "filters": lookups,
+            "cursor": request.query_params.get("cursor"),
+            "page_size": request.query_params.get("page_size"),
+        }
+        # Clé distincte de DoctorViewSet : les liens « next » pointent vers /api/async/.
+        return self.render(await doctor_directory_cache.aget_or_build(
+            params, lambda: self.paginated(self.get_queryset().filter(**lookups))
+        ))
+
+
+class AsyncDoctorDetail(AsyncAPIView):
+    viewset = DoctorViewSet
+
+    async def get(self, request, pk):
+        async def build():
+            return self.get_serializer(await self.get_object()).data
+
+        return self.render(await doctor_directory_cache.aget_or_build({"view": "detail", "pk": pk}, build))
@@ -0,0 +1,227 @@
+# app/audit.py
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .importers import copy_insert
+from .models import AccessEvent
+
+logger = logging.getLogger(__name__)
+
+Action = AccessEvent.Action
+
+
+class AuditBuffer:
+    """
+    Tampon en mémoire des accès, écrit par lots.
+
+    ``add`` ne fait qu'ajouter des tuples à une liste : aucune écriture sur le
+    chemin de lecture. Le tampon est écrit dès ``AUDIT_BUFFER_SIZE`` événements
+    ou quand le plus ancien attend depuis ``AUDIT_FLUSH_INTERVAL`` secondes
+    (``COPY`` sous PostgreSQL, ``bulk_create`` sinon), et le reste à l'arrêt du
+    processus. Sous un serveur (``start()`` dans wsgi.py / asgi.py), un thread
+    dédié écrit, y compris sans trafic ; ailleurs (commandes, tests), l'écriture
+    se fait dans l'appelant.
+
+    En cas d'échec, les événements restent dans le tampon (au plus
+    ``AUDIT_BUFFER_MAX``) et sont réessayés au passage suivant.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._oldest = None
+        self._wake = threading.Event()
+        self._background = False
+        self._thread = None
+        self._pid = None
+        self._flush_lock = threading.Lock()
+
+    def start(self):
+        """Écriture par un thread du processus (serveurs)."""
+        self._background = True
+
+    def add(self, events):
+        """``events`` : tuples ``(occurred_at, actor_id, action, patient_id, record_id)``."""
+        with self._lock:
+            if not self._events:
+                self._oldest = time.monotonic()
+            self._events.extend(events)
+            due = (len(self._events) >= settings.AUDIT_BUFFER_SIZE
+                   or time.monotonic() - self._oldest >= settings.AUDIT_FLUSH_INTERVAL)
+        if self._background:
+            self._ensure_thread()
+            if due:
+                self._wake.set()
+        elif due and not _in_event_loop():
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return len(self._events)
+
+    def flush(self, using=None):
+        """Écrit le tampon ; retourne le nombre d'événements écrits."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                oldest, self._oldest = self._oldest, None
+            if not events:
+                return 0
+            try:
+                write_events(events, using or settings.AUDIT_DATABASE)
+            except Exception:
+                logger.exception("Écriture de %s événements d'audit impossible, nouvel essai plus tard", len(events))
+                with self._lock:
+                    self._events[:0] = events
+                    self._oldest = oldest
+                    overflow = len(self._events) - settings.AUDIT_BUFFER_MAX
+                    if overflow > 0:
+                        del self._events[:overflow]
+                        logger.error("Tampon d'audit plein : %s événements perdus", overflow)
+                return 0
+            return len(events)
+
+    def discard(self):
+        """Vide le tampon sans écrire ; retourne le nombre d'événements perdus."""
+        with self._lock:
+            count, self._events, self._oldest = len(self._events), [], None
+        return count
+
+    def _ensure_thread(self):
+        # Après un fork (gunicorn --preload), le thread du parent n'existe plus.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            # Intervalle nul : écriture à chaque ajout, sur réveil uniquement.
+            self._wake.wait(settings.AUDIT_FLUSH_INTERVAL or None)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                # Connexion propre à ce thread : pas de connexion inactive entre deux lots.
+                connections.close_all()
+
+    def close(self):
+        """À l'arrêt : écrit ce qui reste."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Événements d'audit perdus à l'arrêt")
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def write_events(events, using=DEFAULT_DB_ALIAS):
+    instances = [
+        AccessEvent(occurred_at=occurred_at, actor_id=actor_id, action=action,
+                    patient_id=patient_id, record_id=record_id)
+        for occurred_at, actor_id, action, patient_id, record_id in events
+    ]
+    if connections[using].vendor == "postgresql":
+        copy_insert(AccessEvent, instances, using)
+    else:
+        AccessEvent.objects.using(using).bulk_create(instances, batch_size=1000)
+
+
+buffer = AuditBuffer()
+atexit.register(buffer.close)
+
+
+def actor_id(request):
+    user = getattr(request, "user", None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def record(request, action, targets):
+    """Journalise l'accès de l'auteur de ``request`` à ``targets`` (couples ``(patient_id, record_id)``)."""
+    if not settings.AUDIT_ENABLED:
+        return
+    now = datetime.now(dt_timezone.utc)
+    actor = actor_id(request)
+    buffer.add([(now, actor, action, patient_id, record_id) for patient_id, record_id in targets])
+
+
+def audited_rows(rows, request, action=Action.EXPORT_RECORD, batch=500):
+    """Itère sur des lignes d'export ``(id, patient_id, ...)`` en journalisant chaque dossier."""
+    if not settings.AUDIT_ENABLED:
+        yield from rows
+        return
+    targets = []
+    for row in rows:
+        targets.append((row[1], row[0]))
+        if len(targets) >= batch:
+            record(request, action, targets)
+            targets = []
+        yield row
+    record(request, action, targets)
+
+
+def month_partitions(start, months):
+    """Bornes ``(début, fin)`` des ``months`` partitions mensuelles à partir du mois de ``start``."""
+    start = start.replace(day=1)
+    for _ in range(months):
+        end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        yield start, end
+        start = end
+
+
+def ensure_partitions(months=None, using=DEFAULT_DB_ALIAS, today=None):
+    """Crée les partitions du mois courant et des suivants (PostgreSQL) ; retourne leurs noms."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return []
+    months = settings.AUDIT_PARTITION_MONTHS_AHEAD + 1 if months is None else months
+    names = []
+    with connection.cursor() as cursor:
+        for start, end in month_partitions(today or date.today(), months):
+            name = f"app_accessevent_y{start:%Y}m{start:%m}"
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF app_accessevent "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            )
+            names.append(name)
+    return names
+
+
+def detach_partitions_before(month, using=DEFAULT_DB_ALIAS):
+    """
+    Détache les partitions antérieures à ``month`` (PostgreSQL) : elles restent
+    des tables ordinaires, à archiver puis supprimer selon la politique de conservation.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return []
+    cutoff = f"app_accessevent_y{month:%Y}m{month:%m}"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'app_accessevent' AND child.relname ~ '^app_accessevent_y[0-9]{4}m[0-9]{2}$'"
+        )
+        detached = sorted(name for (name,) in cursor.fetchall() if name < cutoff)
+        for name in detached:
+            cursor.execute(f"ALTER TABLE app_accessevent DETACH PARTITION {name}")
+    return detached
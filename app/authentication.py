@@ -0,0 +1,221 @@
+# app/authentication.py
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .models import AuthToken, User
+
+
+def hash_token(key):
+    """Empreinte SHA-256 d'un jeton : suffisante pour un secret aléatoire de 256 bits."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def issue_token(user, name=""):
+    """Crée un jeton pour ``user`` ; la clé en clair n'est retournée qu'une fois."""
+    key = secrets.token_urlsafe(32)
+    token = AuthToken.objects.create(
+        user=user,
+        key_hash=hash_token(key),
+        name=name,
+        expires_at=timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_LIFETIME),
+    )
+    return token, key
+
+
+def revoke_token(key_hash):
+    """Révoque un jeton et l'évince du cache local."""
+    AuthToken.objects.filter(key_hash=key_hash).delete()
+    principal_cache.invalidate(key_hash)
+
+
+class TokenPrincipal:
+    """
+    Utilisateur authentifié par jeton, construit sans accès à la base.
+
+    Expose ce dont ont besoin les permissions (``role``, ``is_superuser``...) ;
+    ``get_user()`` charge le ``User`` complet si une vue en a besoin.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id, role, is_active, is_staff, is_superuser):
+        self.id = self.pk = id
+        self.role = role
+        self.is_active = is_active
+        self.is_staff = is_staff
+        self.is_superuser = is_superuser
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.pk, user.role, user.is_active, user.is_staff, user.is_superuser)
+
+    def __str__(self):
+        return f"principal #{self.id} ({self.role})"
+
+    def __eq__(self, other):
+        return isinstance(other, (TokenPrincipal, User)) and self.pk == other.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def get_user(self):
+        return User.objects.get(pk=self.pk)
+
+    def is_patient(self):
+        return self.role == User.Roles.PATIENT
+
+    def is_doctor(self):
+        return self.role == User.Roles.DOCTOR
+
+    def is_agent(self):
+        return self.role == User.Roles.AGENT
+
+    def is_superadmin(self):
+        return self.role == User.Roles.SUPERADMIN
+
+
+class PrincipalCache:
+    """
+    Cache LRU en mémoire des jetons déjà validés.
+
+    Chaque entrée expire après ``ttl`` secondes (ou à l'expiration du jeton),
+    et peut être invalidée par jeton ou par utilisateur. Le cache est propre
+    au processus : le TTL borne le délai de prise en compte d'une révocation
+    faite dans un autre worker.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key_hash):
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                return None
+            principal, deadline = entry
+            if deadline <= time.monotonic():
+                self._remove(key_hash)
+                return None
+            self._entries.move_to_end(key_hash)
+            return principal
+
+    def set(self, key_hash, principal, expires_at):
+        lifetime = min(self.ttl, (expires_at - timezone.now()).total_seconds())
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._remove(key_hash)
+            self._entries[key_hash] = (principal, time.monotonic() + lifetime)
+            self._by_user.setdefault(principal.pk, set()).add(key_hash)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key_hash):
+        with self._lock:
+            self._remove(key_hash)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key_hash in list(self._by_user.get(user_id, ())):
+                self._remove(key_hash)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def _remove(self, key_hash):
+        entry = self._entries.pop(key_hash, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[0].pk)
+        if keys is not None:
+            keys.discard(key_hash)
+            if not keys:
+                del self._by_user[entry[0].pk]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+)
+
+
+class TokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authentification ``Authorization: Bearer <jeton>``.
+
+    Un jeton connu du cache est accepté sans requête SQL ; sinon une seule
+    requête indexée sur ``key_hash`` charge le jeton et son utilisateur.
+    ``request.auth`` contient l'empreinte du jeton.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed("En-tête d'authentification invalide.")
+        try:
+            key = header[1].decode("ascii")
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed("Jeton invalide.")
+        return self.authenticate_credentials(key)
+
+    def authenticate_credentials(self, key):
+        key_hash = hash_token(key)
+        principal = principal_cache.get(key_hash)
+        if principal is not None:
+            return principal, key_hash
+        token = self.token_queryset(key_hash).first()
+        return self.accept_token(token, key_hash), key_hash
+
+    async def aauthenticate_credentials(self, key):
+        """Variante asynchrone (vues ASGI) : même cache, requête via l'ORM asynchrone."""
+        key_hash = hash_token(key)
+        principal = principal_cache.get(key_hash)
+        if principal is not None:
+            return principal, key_hash
+        token = await self.token_queryset(key_hash).afirst()
+        return self.accept_token(token, key_hash), key_hash
+
+    @staticmethod
+    def token_queryset(key_hash):
+        return (
+            AuthToken.objects.select_related("user")
+            .only("expires_at", "user__id", "user__role", "user__is_active",
+                  "user__is_staff", "user__is_superuser")
+            .filter(key_hash=key_hash)
+        )
+
+    @staticmethod
+    def accept_token(token, key_hash):
+        """Valide le jeton chargé et met son principal en cache."""
+        if token is None or token.is_expired():
+            raise exceptions.AuthenticationFailed("Jeton invalide ou expiré.")
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed("Compte désactivé.")
+        principal = TokenPrincipal.from_user(token.user)
+        principal_cache.set(key_hash, principal, token.expires_at)
+        return principal
+
+    def authenticate_header(self, request):
+        return self.keyword
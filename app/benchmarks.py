@@ -0,0 +1,641 @@
+# app/benchmarks.py
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from . import appointments, stats
+from .authentication import issue_token, principal_cache, revoke_token
+from .cache import doctor_directory_cache
+from .models import Appointment, DoctorProfile, MedicalRecord, PatientProfile, Speciality, User, WeeklySchedule
+from .fastjson import render_json
+from .serializers import MedicalRecordSerializer, UserSerializer, values_fields
+
+# Préfixe des comptes générés : permet de les retrouver et de les remplacer.
+USERNAME_PREFIX = "bench-"
+BENCH_PASSWORD = "bench-password"
+
+# Répartition des rôles des comptes générés (en pourcentage).
+ROLE_WEIGHTS = (
+    (User.Roles.PATIENT, 80),
+    (User.Roles.DOCTOR, 15),
+    (User.Roles.AGENT, 4),
+    (User.Roles.SUPERADMIN, 1),
+)
+
+SPECIALITIES = (
+    "Cardiologie", "Dermatologie", "Endocrinologie", "Gastro-entérologie", "Gynécologie",
+    "Médecine générale", "Neurologie", "Ophtalmologie", "Pédiatrie", "Pneumologie",
+    "Psychiatrie", "Rhumatologie",
+)
+FIRST_NAMES = ("Jean", "Marie", "Pierre", "Fatou", "Awa", "Moussa", "Aminata", "Paul",
+               "Claire", "Ibrahima", "Sophie", "Omar", "Lucie", "Mamadou", "Julie", "Karim")
+LAST_NAMES = ("Diallo", "Martin", "Ndiaye", "Bernard", "Traoré", "Dubois", "Sow", "Moreau",
+              "Ba", "Laurent", "Fall", "Lefebvre", "Diop", "Garcia", "Camara", "Roux")
+TITLES = ("Consultation", "Bilan annuel", "Suivi", "Urgence", "Contrôle post-opératoire",
+          "Téléconsultation", "Vaccination")
+DIAGNOSES = ("hypertension artérielle", "diabète de type 2", "asthme", "migraine", "angine",
+             "lombalgie", "anémie", "eczéma", "bronchite", "otite", "gastrite", "paludisme")
+TREATMENTS = ("paracétamol 1 g", "amoxicilline 7 jours", "repos", "kinésithérapie",
+              "metformine", "salbutamol", "ibuprofène", "régime adapté")
+BLOOD_TYPES = ("A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-")
+
+# Date fixe : les données générées ne dépendent pas du jour d'exécution.
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def generate_dataset(users=2000, records_per_patient=5, seed=42, using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """
+    Génère un jeu de données synthétique reproductible.
+
+    Pour une même graine, les comptes, profils et dossiers sont identiques
+    (hors clés primaires) : les mesures d'une exécution à l'autre portent sur
+    les mêmes données. Les insertions passent par ``bulk_create``.
+    """
+    rng = random.Random(seed)
+    # Un seul hachage PBKDF2 pour tous les comptes (sel fixe : résultat reproductible).
+    password = make_password(BENCH_PASSWORD, salt="medconnectbench")
+    roles, weights = zip(*ROLE_WEIGHTS)
+
+    with transaction.atomic(using=using):
+        specialities = {
+            speciality.name: speciality
+            for speciality in Speciality.objects.using(using).all()
+        }
+        missing = [Speciality(name=name) for name in SPECIALITIES if name not in specialities]
+        Speciality.objects.using(using).bulk_create(missing)
+        specialities = list(Speciality.objects.using(using).filter(name__in=SPECIALITIES).order_by("name"))
+
+        accounts = []
+        for index in range(users):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            role = rng.choices(roles, weights)[0]
+            accounts.append(User(
+                username=f"{USERNAME_PREFIX}{index:07d}",
+                email=f"{USERNAME_PREFIX}{index}@example.com",
+                first_name=first_name,
+                last_name=last_name,
+                phone=f"+221 77 {rng.randrange(10**6, 10**7)}",
+                role=role,
+                date_of_birth=(EPOCH - timedelta(days=rng.randrange(18 * 365, 90 * 365))).date(),
+                date_joined=EPOCH + timedelta(minutes=index),
+                password=password,
+                is_staff=role == User.Roles.SUPERADMIN,
+                is_superuser=role == User.Roles.SUPERADMIN,
+            ))
+        User.objects.using(using).bulk_create(accounts, batch_size=batch_size)
+        accounts = list(
+            User.objects.using(using).filter(username__startswith=USERNAME_PREFIX)
+            .order_by("username").only("id", "role")
+        )
+
+        doctors, patients = [], []
+        for account in accounts:
+            if account.role == User.Roles.DOCTOR:
+                doctors.append(DoctorProfile(
+                    user_id=account.pk,
+                    speciality=rng.choice(specialities),
+                    license_number=f"BENCH-{account.pk}",
+                    years_of_experience=rng.randrange(0, 40),
+                    consultation_fee=Decimal(rng.randrange(50, 500) * 100),
+                    is_available=rng.random() < 0.8,
+                ))
+            elif account.role == User.Roles.PATIENT:
+                patients.append(PatientProfile(
+                    user_id=account.pk,
+                    blood_type=rng.choice(BLOOD_TYPES),
+                    emergency_contact=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                ))
+        DoctorProfile.objects.using(using).bulk_create(doctors, batch_size=batch_size)
+        PatientProfile.objects.using(using).bulk_create(patients, batch_size=batch_size)
+
+        doctor_ids = list(
+            DoctorProfile.objects.using(using).filter(user__username__startswith=USERNAME_PREFIX)
+            .order_by("user__username").values_list("id", flat=True)
+        )
+        patient_ids = list(
+            PatientProfile.objects.using(using).filter(user__username__startswith=USERNAME_PREFIX)
+            .order_by("user__username").values_list("id", flat=True)
+        )
+        records = []
+        for patient_id in patient_ids:
+            for _ in range(records_per_patient):
+                diagnosis = rng.choice(DIAGNOSES)
+                records.append(MedicalRecord(
+                    patient_id=patient_id,
+                    doctor_id=rng.choice(doctor_ids) if doctor_ids else None,
+                    title=f"{rng.choice(TITLES)} – {diagnosis}",
+                    description=f"Patient vu pour {diagnosis}.",
+                    diagnosis=diagnosis,
+                    treatment=rng.choice(TREATMENTS),
+                    record_date=EPOCH + timedelta(hours=rng.randrange(0, 2 * 365 * 24)),
+                ))
+                if len(records) >= batch_size:
+                    MedicalRecord.objects.using(using).bulk_create(records)
+                    records = []
+        MedicalRecord.objects.using(using).bulk_create(records)
+
+        # Consultations du lundi au vendredi, matin et après-midi (horaires variables).
+        schedules = []
+        for doctor_id in doctor_ids:
+            morning, afternoon = rng.choice((7, 8, 9)), rng.choice((13, 14))
+            for weekday in range(rng.choice((3, 4, 5))):
+                schedules.append(WeeklySchedule(doctor_id=doctor_id, weekday=weekday,
+                                                start_time=dt_time(morning), end_time=dt_time(12)))
+                schedules.append(WeeklySchedule(doctor_id=doctor_id, weekday=weekday,
+                                                start_time=dt_time(afternoon), end_time=dt_time(17, 30)))
+        WeeklySchedule.objects.using(using).bulk_create(schedules, batch_size=batch_size)
+
+    if using == DEFAULT_DB_ALIAS:
+        # L'index des créneaux est relatif au jour courant.
+        appointments.rebuild(doctors=doctor_ids)
+    # bulk_create n'émet pas de signaux.
+    stats.reconcile(using=using)
+    doctor_directory_cache.bump()
+    principal_cache.clear()
+    return {
+        "users": len(accounts),
+        "doctors": len(doctors),
+        "patients": len(patients),
+        "records": MedicalRecord.objects.using(using).filter(
+            patient__user__username__startswith=USERNAME_PREFIX).count(),
+    }
+
+
+def delete_dataset(using=DEFAULT_DB_ALIAS):
+    """Supprime les comptes générés (profils et dossiers suivent en cascade)."""
+    # Compteurs recalculés une fois plutôt qu'à chaque ligne supprimée.
+    with stats.suspended():
+        deleted, _ = User.objects.using(using).filter(username__startswith=USERNAME_PREFIX).delete()
+    stats.reconcile(using=using)
+    doctor_directory_cache.bump()
+    principal_cache.clear()
+    return deleted
+
+
+def percentile(values, fraction):
+    """Percentile par interpolation linéaire (``fraction`` entre 0 et 1)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class Scenario:
+    """
+    Scénario chronométré.
+
+    ``prepare`` s'exécute une fois hors mesure ; ``run`` est appelé à chaque
+    itération et retourne le nombre de lignes produites ; ``teardown``
+    libère ce que ``prepare`` a créé, même après une erreur.
+    """
+
+    name = None
+    description = ""
+
+    def __init__(self, using):
+        self.using = using
+
+    def prepare(self):
+        pass
+
+    def run(self):
+        raise NotImplementedError
+
+    def teardown(self):
+        pass
+
+
+class ApiScenario(Scenario):
+    url = None
+    token = None
+
+    def prepare(self):
+        agent = (
+            User.objects.using(self.using)
+            .filter(username__startswith=USERNAME_PREFIX, role=User.Roles.AGENT, is_active=True)
+            .order_by("username").first()
+        )
+        if agent is None:
+            raise LookupError("Aucun agent généré : lancer seed_medconnect d'abord.")
+        # Un jeton par scénario, révoqué dans teardown : pas de jetons orphelins d'un passage à l'autre.
+        self.token, key = issue_token(agent, "benchmark")
+        self.client = Client(HTTP_AUTHORIZATION=f"Bearer {key}")
+
+    def teardown(self):
+        if self.token is not None:
+            revoke_token(self.token.key_hash)
+            self.token = None
+
+    def run(self):
+        response = self.client.get(self.url)
+        if response.status_code != 200:
+            raise AssertionError(f"{self.url} : HTTP {response.status_code}")
+        return len(response.json()["results"])
+
+
+class UsersListScenario(ApiScenario):
+    name = "api.users.list"
+    description = "GET /api/users/ (page de 50, pagination par curseur)"
+    url = "/api/users/"
+
+
+class UsersSparseScenario(ApiScenario):
+    name = "api.users.sparse"
+    description = "GET /api/users/?fields=id,username,role&page_size=200"
+    url = "/api/users/?fields=id,username,role&page_size=200"
+
+
+class RecordsListScenario(ApiScenario):
+    name = "api.records.list"
+    description = "GET /api/medical-records/"
+    url = "/api/medical-records/"
+
+
+class DoctorDirectoryScenario(ApiScenario):
+    name = "api.doctors.list"
+    description = "GET /api/doctors/ (annuaire en cache)"
+    url = "/api/doctors/?page_size=100"
+
+
+class SlotSearchScenario(ApiScenario):
+    name = "api.appointments.slots"
+    description = "GET /api/appointments/slots/ (20 premiers créneaux d'une spécialité sur 14 jours)"
+
+    def prepare(self):
+        super().prepare()
+        speciality = Speciality.objects.using(self.using).filter(name=SPECIALITIES[0]).first()
+        if speciality is None:
+            raise LookupError("Aucune spécialité générée : lancer seed_medconnect d'abord.")
+        self.url = f"/api/appointments/slots/?speciality={speciality.pk}&days=14&limit=20"
+
+
+class AdminScenario(Scenario):
+    model_name = None
+    params = ""
+
+    def prepare(self):
+        admin = (
+            User.objects.using(self.using)
+            .filter(username__startswith=USERNAME_PREFIX, role=User.Roles.SUPERADMIN, is_superuser=True)
+            .order_by("username").first()
+        )
+        if admin is None:
+            raise LookupError("Aucun super administrateur généré : lancer seed_medconnect d'abord.")
+        self.client = Client()
+        self.client.force_login(admin)
+        self.url = f"/admin/app/{self.model_name}/{self.params}"
+        self.rows = None
+
+    def run(self):
+        response = self.client.get(self.url)
+        if response.status_code != 200:
+            raise AssertionError(f"{self.url} : HTTP {response.status_code}")
+        if self.rows is None:
+            # Lignes de la page, comptées une fois (hors de la mesure suivante).
+            self.rows = response.content.count(b'class="action-select"')
+        return self.rows
+
+
+class AdminUserListScenario(AdminScenario):
+    name = "admin.user.list"
+    description = "Liste des utilisateurs dans l'admin"
+    model_name = "user"
+
+
+class AdminRecordListScenario(AdminScenario):
+    name = "admin.medicalrecord.list"
+    description = "Liste des dossiers médicaux dans l'admin"
+    model_name = "medicalrecord"
+
+
+class AdminRecordSearchScenario(AdminScenario):
+    name = "admin.medicalrecord.search"
+    description = "Recherche « asthme » dans les dossiers médicaux de l'admin"
+    model_name = "medicalrecord"
+    params = "?q=asthme"
+
+
+class AdminPatientListScenario(AdminScenario):
+    name = "admin.patientprofile.list"
+    description = "Liste des patients (avec comptage des dossiers) dans l'admin"
+    model_name = "patientprofile"
+
+
+class SerializerScenario(Scenario):
+    serializer_class = None
+    limit = 500
+
+    def queryset(self):
+        raise NotImplementedError
+
+    def run(self):
+        data = self.serializer_class(self.queryset()[: self.limit], many=True).data
+        return len(data)
+
+
+class UserSerializerScenario(SerializerScenario):
+    name = "serializer.users"
+    description = "UserSerializer, 500 utilisateurs"
+    serializer_class = UserSerializer
+
+    def queryset(self):
+        return User.objects.using(self.using).order_by("date_joined", "id")
+
+
+class RecordSerializerScenario(SerializerScenario):
+    name = "serializer.records"
+    description = "MedicalRecordSerializer, 500 dossiers"
+    serializer_class = MedicalRecordSerializer
+
+    def queryset(self):
+        return (
+            MedicalRecord.objects.using(self.using)
+            .select_related("patient__user", "doctor__user")
+            .order_by("-record_date", "-id")
+        )
+
+
+class UserRenderScenario(Scenario):
+    name = "render.users.serializer"
+    description = "1000 utilisateurs : instances, UserSerializer puis JSONRenderer"
+    limit = 1000
+
+    def queryset(self):
+        return User.objects.using(self.using).order_by("date_joined", "id")[: self.limit]
+
+    def run(self):
+        data = UserSerializer(self.queryset(), many=True).data
+        JSONRenderer().render(data)
+        return len(data)
+
+
+class UserValuesRenderScenario(UserRenderScenario):
+    name = "render.users.values"
+    description = "1000 utilisateurs : values() puis encodage direct (chemin de UserAdminViewSet.list)"
+
+    def prepare(self):
+        self.names = values_fields(UserSerializer())
+        self.renderer = JSONRenderer()
+
+    def run(self):
+        rows = list(self.queryset().values(*self.names))
+        render_json(rows, self.renderer)
+        return len(rows)
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        UsersListScenario, UsersSparseScenario, RecordsListScenario, DoctorDirectoryScenario,
+        SlotSearchScenario, AdminUserListScenario, AdminRecordListScenario, AdminRecordSearchScenario,
+        AdminPatientListScenario, UserSerializerScenario, RecordSerializerScenario,
+        UserRenderScenario, UserValuesRenderScenario,
+    )
+}
+
+
+def run_scenario(scenario, iterations=30, warmup=3):
+    """Exécute un scénario et retourne latences (ms), requêtes par itération et lignes/s."""
+    scenario.prepare()
+    try:
+        for _ in range(warmup):
+            scenario.run()
+        connection = connections[scenario.using]
+        timings, queries, rows = [], [], 0
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                rows += scenario.run()
+                timings.append(time.perf_counter() - start)
+            queries.append(len(context.captured_queries))
+    finally:
+        scenario.teardown()
+    elapsed = sum(timings)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 3),
+        "queries": max(queries),
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Régressions par rapport à une référence.
+
+    Latence : p95 au-delà de ``tolerance`` (fraction) de la référence.
+    Requêtes : toute augmentation, le nombre étant déterministe.
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        limit = reference["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > limit:
+            regressions.append(
+                f"{name} : p95 {current['p95_ms']:.1f} ms > {limit:.1f} ms "
+                f"(référence {reference['p95_ms']:.1f} ms)"
+            )
+        if current["queries"] > reference["queries"]:
+            regressions.append(
+                f"{name} : {current['queries']} requêtes au lieu de {reference['queries']}"
+            )
+    return regressions
+
+
+BENCH_BOOKING_REASON = "bench-contention"
+
+
+def booking_contention(threads=8, attempts=50, hot_slots=20, seed=42):
+    """
+    Réservations concurrentes sur un petit ensemble de créneaux.
+
+    Chaque thread (sa propre connexion) tente ``attempts`` réservations sur
+    ``hot_slots`` créneaux tirés au hasard : la plupart échouent, ce qui
+    mesure le coût des conflits. Vérifie ensuite qu'aucun créneau n'a été
+    réservé deux fois, puis supprime les rendez-vous créés.
+    """
+    slots = appointments.free_slots(days=settings.APPOINTMENT_HORIZON_DAYS, limit=hot_slots)
+    patients = list(
+        PatientProfile.objects.filter(user__username__startswith=USERNAME_PREFIX)
+        .order_by("pk").values_list("pk", flat=True)[:100]
+    )
+    if not slots or not patients:
+        raise LookupError("Aucun créneau ou patient généré : lancer seed_medconnect d'abord.")
+    doctors = DoctorProfile.objects.in_bulk({doctor for _, doctor in slots})
+    patients = PatientProfile.objects.in_bulk(patients)
+    latencies, outcomes, lock = [], {"booked": 0, "conflicts": 0, "errors": 0}, threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        local_latencies, booked, conflicts, errors = [], 0, 0, 0
+        try:
+            barrier.wait()
+            for _ in range(attempts):
+                start, doctor = rng.choice(slots)
+                began = time.perf_counter()
+                try:
+                    appointments.book(doctors[doctor], patients[rng.choice(list(patients))], start,
+                                      reason=BENCH_BOOKING_REASON)
+                    booked += 1
+                except appointments.SlotUnavailable:
+                    conflicts += 1
+                except DatabaseError:
+                    # SQLite : deux transactions lectrices ne peuvent pas toutes deux écrire.
+                    errors += 1
+                    continue
+                local_latencies.append(time.perf_counter() - began)
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(local_latencies)
+            outcomes["booked"] += booked
+            outcomes["conflicts"] += conflicts
+            outcomes["errors"] += errors
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    began = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    created = Appointment.objects.filter(reason=BENCH_BOOKING_REASON, status=Appointment.Status.BOOKED)
+    double_booked = created.values("doctor", "start").annotate(n=Count("id")).filter(n__gt=1).count()
+    result = {
+        "attempts": len(latencies),
+        "booked": outcomes["booked"],
+        "conflicts": outcomes["conflicts"],
+        "errors": outcomes["errors"],
+        "double_booked": double_booked,
+        "attempts_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+    created.delete()
+    appointments.rebuild(doctors=list(doctors))
+    return result
+
+
+# Démarrage à froid d'un worker, mesuré dans un processus neuf (voir startup_profile).
+STARTUP_SCRIPT = """
+import importlib, json, os, sys, time
+start = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+phases = {"settings": time.perf_counter() - start}
+django.setup(set_prefix=False)
+phases["apps_ready"] = time.perf_counter() - start
+if sys.argv[1] != "manage":
+    importlib.import_module(sys.argv[1])
+    phases["handler"] = time.perf_counter() - start
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    phases["urls"] = time.perf_counter() - start
+phases["ready_at"] = time.time()
+print(json.dumps(phases))
+sys.stdout.flush()
+sys.stderr.flush()
+# Sans la finalisation de l'interpréteur : seul le démarrage est mesuré.
+os._exit(0)
+"""
+
+STARTUP_PHASES = ("settings", "apps_ready", "handler", "urls")
+
+
+def startup_entry(entry):
+    """Module importé par le serveur pour ``entry`` (``wsgi``, ``asgi``) ; ``manage`` : réglages et applications."""
+    if entry == "manage":
+        return entry
+    package = settings.WSGI_APPLICATION.rsplit(".", 2)[0]
+    return f"{package}.{entry}"
+
+
+def parse_importtime(output):
+    """Lignes de ``-X importtime`` en tuples ``(module, propre µs, cumulé µs)``."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not own.strip().isdigit():
+            continue
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+def import_packages(modules):
+    """Temps d'import propre cumulé par paquet (``django.contrib.admin``, ``rest_framework``...)."""
+    packages = {}
+    for name, own, _ in modules:
+        parts = name.split(".")
+        package = ".".join(parts[:3] if parts[:2] == ["django", "contrib"] else parts[:1])
+        packages[package] = packages.get(package, 0) + own
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def measure_startup(entry="wsgi", env=None, importtime=False):
+    """
+    Démarre un interpréteur neuf jusqu'au premier routage possible ; retourne
+    les phases (secondes depuis le début du script, plus ``process`` : depuis
+    le lancement du processus, interpréteur compris) et, avec ``importtime``,
+    les modules importés.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", STARTUP_SCRIPT, startup_entry(entry)]
+    environment = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get(
+        "DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE), **(env or {})}
+    launched_at = time.time()
+    completed = subprocess.run(command, cwd=settings.BASE_DIR, env=environment, capture_output=True, text=True)
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "échec")
+    phases = json.loads(completed.stdout.strip().splitlines()[-1])
+    phases["process"] = phases.pop("ready_at") - launched_at
+    return phases, parse_importtime(completed.stderr) if importtime else []
+
+
+def startup_profile(entry="wsgi", runs=5, envs=(None,)):
+    """
+    Pour chaque configuration de ``envs`` (variables d'environnement) :
+    médiane des phases sur ``runs`` démarrages et imports d'un démarrage.
+    Les configurations sont mesurées en alternance, après un démarrage
+    d'échauffement chacune, pour que la charge de la machine les touche également.
+    """
+    for env in envs:
+        measure_startup(entry, env)
+    samples = [[] for _ in envs]
+    for _ in range(runs):
+        for index, env in enumerate(envs):
+            samples[index].append(measure_startup(entry, env)[0])
+    profiles = []
+    for env, measured in zip(envs, samples):
+        phases = {name: percentile([sample[name] for sample in measured], 0.5)
+                  for name in (*STARTUP_PHASES, "process") if name in measured[0]}
+        profiles.append((phases, measure_startup(entry, env, importtime=True)[1]))
+    return profiles
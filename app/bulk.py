@@ -0,0 +1,140 @@
+# app/bulk.py
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import stats
+from .authentication import principal_cache
+from .cache import doctor_directory_cache, patient_summary_cache
+from .hashing import hash_passwords
+from .models import PatientProfile, User
+from .serializers import UserSerializer
+
+
+def valid_pk(value):
+    """Clé primaire utilisable telle quelle dans ``in_bulk`` (pas de chaîne, ni de booléen)."""
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+class UserBulkWriter:
+    """
+    Création / mise à jour d'utilisateurs en masse.
+
+    Chaque ligne est validée par ``UserSerializer`` ; les lignes portant un
+    ``id`` sont des mises à jour, les autres des créations. L'unicité des
+    identifiants est contrôlée en une requête, les mots de passe sont hachés
+    en parallèle et l'écriture se fait par lots dans une seule transaction.
+    """
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = dict(context or {}, bulk=True)
+        self.errors = {}
+        self.to_create = []
+        self.to_update = []
+
+    def is_valid(self):
+        existing = User.objects.in_bulk(
+            [row["id"] for row in self.rows if isinstance(row, dict) and valid_pk(row.get("id"))]
+        )
+        for index, row in enumerate(self.rows):
+            if not isinstance(row, dict):
+                self.errors[index] = {"non_field_errors": ["Un objet est attendu."]}
+                continue
+            pk = row.get("id")
+            instance = None
+            if pk is not None:
+                if not valid_pk(pk):
+                    self.errors[index] = {"id": ["Un entier positif est attendu."]}
+                    continue
+                instance = existing.get(pk)
+                if instance is None:
+                    self.errors[index] = {"id": ["Utilisateur introuvable."]}
+                    continue
+            serializer = UserSerializer(
+                instance, data=row, partial=instance is not None, context=self.context
+            )
+            if not serializer.is_valid():
+                self.errors[index] = serializer.errors
+                continue
+            target = self.to_update if instance is not None else self.to_create
+            target.append((index, instance, serializer.validated_data))
+        self._check_usernames()
+        return not self.errors
+
+    def _check_usernames(self):
+        """Détecte les doublons dans le lot et les conflits avec la base."""
+        pending = [
+            (index, instance, data["username"])
+            for index, instance, data in self.to_create + self.to_update
+            if "username" in data
+        ]
+        counts = Counter(username for _, _, username in pending)
+        taken = dict(
+            User.objects.filter(username__in=list(counts)).values_list("username", "id")
+        )
+        rejected = set()
+        for index, instance, username in pending:
+            owner = taken.get(username)
+            if counts[username] > 1:
+                message = "Nom d'utilisateur dupliqué dans le lot."
+            elif owner is not None and (instance is None or owner != instance.pk):
+                message = "Un utilisateur avec ce nom existe déjà."
+            else:
+                continue
+            self.errors[index] = {"username": [message]}
+            rejected.add(index)
+        self.to_create = [item for item in self.to_create if item[0] not in rejected]
+        self.to_update = [item for item in self.to_update if item[0] not in rejected]
+
+    def _hash_passwords(self):
+        pending = [data for _, _, data in self.to_create + self.to_update if data.get("password")]
+        hashed = hash_passwords(data["password"] for data in pending)
+        for data, password in zip(pending, hashed):
+            data["password"] = password
+
+    def save(self):
+        """Écrit les lignes valides ; retourne ``(créés, mis à jour)``."""
+        self._hash_passwords()
+        batch_size = settings.BULK_USERS_BATCH_SIZE
+
+        created = [User(**data) for _, _, data in self.to_create]
+        updated = []
+        update_fields = {"updated_at"}
+        now = timezone.now()
+        # bulk_create / bulk_update n'émettent pas de signaux : compteurs par rôle ajustés ici.
+        deltas = stats.user_deltas([user.role for user in created])
+        # Rôles avant modification : un compte qui quitte le rôle médecin sort de l'annuaire.
+        roles = {user.role for user in created}
+        for _, instance, data in self.to_update:
+            roles.add(instance.role)
+            if "role" in data:
+                deltas.update(stats.user_deltas([instance.role], -1))
+                deltas.update(stats.user_deltas([data["role"]]))
+            for field, value in data.items():
+                setattr(instance, field, value)
+            # bulk_update n'applique pas auto_now.
+            instance.updated_at = now
+            update_fields.update(data)
+            updated.append(instance)
+
+        with transaction.atomic():
+            User.objects.bulk_create(created, batch_size=batch_size)
+            if updated and update_fields:
+                User.objects.bulk_update(updated, sorted(update_fields), batch_size=batch_size)
+            stats.apply(deltas)
+        # bulk_create / bulk_update n'émettent pas de signaux : invalidation explicite.
+        for user in updated:
+            principal_cache.invalidate_user(user.pk)
+            roles.add(user.role)
+        if User.Roles.DOCTOR in roles:
+            doctor_directory_cache.bump()
+        if updated:
+            patient_summary_cache.invalidate(*PatientProfile.objects.filter(
+                user_id__in=[user.pk for user in updated]).values_list("pk", flat=True))
+        return created, updated
+
+    def error_list(self):
+        return [{"index": index, "errors": errors} for index, errors in sorted(self.errors.items())]
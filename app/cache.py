@@ -0,0 +1,147 @@
+# app/cache.py
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class CacheStats:
+    """Compteurs de succès / échecs et latences, par espace de noms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, namespace, hit, seconds):
+        with self._lock:
+            stats = self._data.setdefault(namespace, {
+                "hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0,
+            })
+            if hit:
+                stats["hits"] += 1
+                stats["hit_seconds"] += seconds
+            else:
+                stats["misses"] += 1
+                stats["miss_seconds"] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {namespace: dict(stats) for namespace, stats in self._data.items()}
+
+
+cache_stats = CacheStats()
+
+
+class VersionedCache:
+    """
+    Cache invalidé par numéro de génération.
+
+    Chaque clé inclut la génération courante de l'espace de noms ; invalider
+    revient à incrémenter ce numéro (une opération), sans parcourir les clés.
+    Les anciennes entrées expirent d'elles-mêmes.
+    """
+
+    def __init__(self, namespace, timeout):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.generation_key = f"{namespace}:generation"
+
+    def generation(self):
+        generation = cache.get(self.generation_key)
+        if generation is None:
+            cache.add(self.generation_key, 1, timeout=None)
+            generation = cache.get(self.generation_key, 1)
+        return generation
+
+    def bump(self):
+        try:
+            cache.incr(self.generation_key)
+        except ValueError:
+            cache.add(self.generation_key, 1, timeout=None)
+            cache.incr(self.generation_key)
+
+    def make_key(self, params, generation=None):
+        """Clé stable quel que soit l'ordre des paramètres."""
+        normalized = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        if generation is None:
+            generation = self.generation()
+        return f"{self.namespace}:{generation}:{digest}"
+
+    def get_or_build(self, params, build):
+        start = time.perf_counter()
+        key = self.make_key(params)
+        value = cache.get(key)
+        hit = value is not None
+        if not hit:
+            value = build()
+            cache.set(key, value, timeout=self.timeout)
+        cache_stats.record(self.namespace, hit, time.perf_counter() - start)
+        return value
+
+    async def ageneration(self):
+        generation = await cache.aget(self.generation_key)
+        if generation is None:
+            await cache.aadd(self.generation_key, 1, timeout=None)
+            generation = await cache.aget(self.generation_key, 1)
+        return generation
+
+    async def aget_or_build(self, params, build):
+        """Variante asynchrone : ``build`` est une coroutine."""
+        start = time.perf_counter()
+        key = self.make_key(params, await self.ageneration())
+        value = await cache.aget(key)
+        hit = value is not None
+        if not hit:
+            value = await build()
+            await cache.aset(key, value, timeout=self.timeout)
+        cache_stats.record(self.namespace, hit, time.perf_counter() - start)
+        return value
+
+
+# Pages de l'annuaire des médecins, invalidées par les signaux de app/signals.py
+doctor_directory_cache = VersionedCache(
+    "doctor-directory", timeout=settings.DOCTOR_DIRECTORY_CACHE_TIMEOUT
+)
+
+
+class KeyedCache:
+    """
+    Cache d'une entrée par objet, supprimée à chaque écriture de l'objet.
+
+    ``timeout`` court : il borne aussi la durée de vie d'une entrée qu'une
+    écriture hors signaux (``bulk_create``, ``update``) n'aurait pas invalidée.
+    ``timeout=0`` désactive le cache.
+    """
+
+    def __init__(self, namespace, timeout):
+        self.namespace = namespace
+        self.timeout = timeout
+
+    def make_key(self, pk):
+        return f"{self.namespace}:{pk}"
+
+    def get_or_build(self, pk, build):
+        if not self.timeout:
+            return build()
+        start = time.perf_counter()
+        key = self.make_key(pk)
+        value = cache.get(key)
+        hit = value is not None
+        if not hit:
+            value = build()
+            cache.set(key, value, timeout=self.timeout)
+        cache_stats.record(self.namespace, hit, time.perf_counter() - start)
+        return value
+
+    def invalidate(self, *pks):
+        cache.delete_many([self.make_key(pk) for pk in pks if pk is not None])
+
+
+# Synthèses des patients, invalidées par les signaux de app/signals.py
+patient_summary_cache = KeyedCache(
+    "patient-summary", timeout=settings.PATIENT_SUMMARY_CACHE_TIMEOUT
+)
@@ -0,0 +1,43 @@
+# app/checks.py
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# Backends dont le contenu reste propre à chaque processus
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+def process_local_cache():
+    return settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Les caches invalidés par génération (annuaire des médecins) ne sont
+    cohérents que si tous les processus partagent le même backend : avec un
+    cache local, une modification faite par un worker reste invisible des
+    autres jusqu'à expiration.
+    """
+    if process_local_cache() and settings.WEB_CONCURRENCY > 1:
+        return [Error(
+            f"Cache local au processus avec WEB_CONCURRENCY={settings.WEB_CONCURRENCY} : "
+            "les invalidations de l'annuaire n'atteignent pas les autres workers.",
+            hint="Configurez un cache partagé (CACHE_BACKEND, ex. Redis ou Memcached).",
+            id="app.E001",
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache_deploy(app_configs, **kwargs):
+    """En production, les imports et ``run_jobs`` tournent dans d'autres processus que le serveur."""
+    if process_local_cache():
+        return [Warning(
+            "Cache local au processus : les imports et les tâches de fond (run_jobs) "
+            "n'invalident pas l'annuaire du serveur avant DOCTOR_DIRECTORY_CACHE_TIMEOUT.",
+            hint="Configurez un cache partagé (CACHE_BACKEND, ex. Redis ou Memcached).",
+            id="app.W001",
+        )]
+    return []
@@ -0,0 +1,82 @@
+# app/conditional.py
+from django.db.models import Count, F, Max
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+
+def changed_at(fields):
+    """
+    Dernière modification d'une ligne et des lignes jointes qu'elle affiche
+    (ex. ``("updated_at", "patient__user__updated_at")``). Une jointure vide
+    (médecin absent) compte pour la ligne elle-même.
+    """
+    if len(fields) == 1:
+        return F(fields[0])
+    own = fields[0]
+    return Greatest(F(own), *(Coalesce(F(field), F(own)) for field in fields[1:]))
+
+
+def collection_validators(queryset, field="updated_at"):
+    """
+    ETag et Last-Modified d'un ensemble de lignes.
+
+    Calculés par un seul agrégat ``max(updated_at)`` / ``count(*)`` : aucune
+    ligne n'est chargée. Le comptage détecte les suppressions, que le maximum
+    seul ne verrait pas.
+    """
+    stats = queryset.order_by().aggregate(last=Max(field), count=Count("pk"))
+    return _validators(stats["last"], stats["count"])
+
+
+async def acollection_validators(queryset, field="updated_at"):
+    """Variante asynchrone de ``collection_validators``."""
+    stats = await queryset.order_by().aaggregate(last=Max(field), count=Count("pk"))
+    return _validators(stats["last"], stats["count"])
+
+
+def object_validators(last_modified):
+    return _validators(last_modified, 1)
+
+
+def _validators(last_modified, count):
+    stamp = last_modified.timestamp() if last_modified else 0
+    etag = quote_etag(f"{count}-{stamp:.6f}")
+    return etag, (int(stamp) if last_modified else None)
+
+
+def not_modified_response(request, etag, last_modified):
+    """Réponse 304 si ``If-None-Match`` / ``If-Modified-Since`` correspondent, sinon ``None``."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # Données médicales : jamais de cache partagé, revalidation systématique.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def parse_updated_since(request, param="updated_since"):
+    """Date ISO 8601 de ``?updated_since=`` (synchronisation différentielle), ou ``None``."""
+    raw = request.query_params.get(param)
+    if not raw:
+        return None
+    try:
+        value = parse_datetime(raw.replace(" ", "+"))
+    except ValueError:
+        # Bien formée mais impossible (mois 13, 31 février...).
+        value = None
+    if value is None:
+        raise ValidationError({param: "Date ISO 8601 attendue."})
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
@@ -0,0 +1,218 @@
+# app/db_router.py
+import contextvars
+import fnmatch
+import hashlib
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+# État de routage de la requête en cours (None hors requête : tout va au primaire).
+_state = contextvars.ContextVar("medconnect_db_routing", default=None)
+
+# Lus juste après leur écriture (jeton émis puis utilisé, session ouverte) :
+# jamais servis par un réplica, quel que soit le retard de réplication.
+PRIMARY_ONLY_MODELS = {"app.authtoken", "sessions.session"}
+
+PIN_COOKIE = "db_primary_pin"
+
+# Retard de réplication : nul si tout le WAL reçu a été rejoué, même sans écriture récente.
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class RoutingState:
+    def __init__(self, use_replica=False):
+        self.use_replica = use_replica
+        self.replica = None
+        self.wrote = False
+
+
+class ReplicaHealth:
+    """
+    Disponibilité et retard des réplicas, vérifiés au plus une fois par
+    ``REPLICA_HEALTH_INTERVAL`` secondes et par processus.
+
+    Un réplica injoignable ou en retard de plus de ``REPLICA_MAX_LAG_SECONDS``
+    est écarté jusqu'à la vérification suivante.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = {}
+
+    def is_healthy(self, alias):
+        with self._lock:
+            entry = self._status.get(alias)
+        if entry and time.monotonic() - entry["checked_at"] < settings.REPLICA_HEALTH_INTERVAL:
+            return entry["healthy"]
+        healthy, lag = self.check(alias)
+        with self._lock:
+            previous = self._status.get(alias)
+            self._status[alias] = {"checked_at": time.monotonic(), "healthy": healthy, "lag": lag}
+        if previous is not None and previous["healthy"] != healthy:
+            logger.warning("Réplica %s %s (retard : %s s)", alias,
+                           "rétabli" if healthy else "écarté", lag)
+        return healthy
+
+    def check(self, alias):
+        try:
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    cursor.execute(LAG_SQL)
+                    lag = float(cursor.fetchone()[0] or 0)
+                else:
+                    cursor.execute("SELECT 1")
+                    lag = 0.0
+        except Exception as exc:
+            logger.warning("Réplica %s injoignable : %s", alias, exc)
+            return False, None
+        return lag <= settings.REPLICA_MAX_LAG_SECONDS, lag
+
+    def snapshot(self):
+        with self._lock:
+            return {alias: dict(entry) for alias, entry in self._status.items()}
+
+    def reset(self):
+        with self._lock:
+            self._status.clear()
+
+
+health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """
+    Lectures des requêtes sûres vers les réplicas, tout le reste vers le primaire.
+
+    Le réplica n'est utilisé que si ``ReplicaRoutingMiddleware`` l'autorise
+    pour la requête en cours ; il est choisi une fois par requête parmi les
+    réplicas sains. Hors requête (commandes, shell), tout va au primaire.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        state = _state.get()
+        if state is None or not state.use_replica or model._meta.label_lower in PRIMARY_ONLY_MODELS:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            healthy = [alias for alias in settings.REPLICA_DATABASES if health.is_healthy(alias)]
+            state.replica = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            # Les lectures suivantes de la requête doivent voir cette écriture.
+            state.use_replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas et primaire contiennent les mêmes données.
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Les réplicas reçoivent le schéma par la réplication.
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def pin_key(request):
+    """Clé d'épinglage au primaire : jeton d'API ou cookie de session, sinon ``None``."""
+    identity = request.headers.get("Authorization") or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not identity:
+        return None
+    return "db-primary-pin:" + hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Autorise les lectures sur réplica pour les requêtes GET / HEAD des routes
+    de ``REPLICA_READ_ROUTES`` (motifs sur le nom de vue, ex. ``admin:*_changelist``).
+
+    Lire ses propres écritures : après toute écriture, l'appelant reste épinglé
+    au primaire pendant ``REPLICA_PIN_SECONDS`` (cache partagé, indexé sur le
+    jeton ou la session, et cookie pour les navigateurs).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        key = self.pin(request, response, state)
+        if key:
+            cache.set(key, True, timeout=settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        key = self.pin(request, response, state)
+        if key:
+            await cache.aset(key, True, timeout=settings.REPLICA_PIN_SECONDS)
+        return response
+
+    @staticmethod
+    def pin(request, response, state):
+        """Pose le cookie d'épinglage après une écriture ; retourne la clé de cache à poser."""
+        wrote = state.wrote or request.method not in ("GET", "HEAD", "OPTIONS")
+        seconds = settings.REPLICA_PIN_SECONDS
+        if not (wrote and settings.REPLICA_DATABASES and seconds):
+            return None
+        response.set_cookie(PIN_COOKIE, "1", max_age=seconds, httponly=True, samesite="Lax")
+        return pin_key(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if state is None or not settings.REPLICA_DATABASES or request.method not in ("GET", "HEAD"):
+            return None
+        if not self.is_replica_route(request.resolver_match.view_name):
+            return None
+        if request.COOKIES.get(PIN_COOKIE):
+            return None
+        key = pin_key(request)
+        if key and cache.get(key):
+            return None
+        state.use_replica = True
+        return None
+
+    @staticmethod
+    def is_replica_route(view_name):
+        return any(fnmatch.fnmatchcase(view_name or "", pattern) for pattern in settings.REPLICA_READ_ROUTES)
@@ -0,0 +1,107 @@
+# app/exports.py
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Case, CharField, Value, When
+from django.db.models.functions import Concat, Trim
+from django.utils import timezone
+
+from .models import MedicalRecord
+
+EXPORT_FIELDS = (
+    "id", "patient_id", "patient_name", "doctor_id", "doctor_name", "title",
+    "description", "diagnosis", "treatment", "record_date", "created_at", "updated_at",
+)
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def full_name(prefix):
+    """Équivalent SQL de ``User.get_full_name()`` pour la relation ``prefix``."""
+    return Trim(Concat(f"{prefix}__first_name", Value(" "), f"{prefix}__last_name",
+                       output_field=CharField()))
+
+
+def export_rows(date_from=None, date_to=None, patient=None, doctor=None, using=None):
+    """
+    Tuples des dossiers à exporter, noms joints en SQL.
+
+    Lecture paginée par clé (``pk > dernière clé lue``, ``EXPORT_CHUNK_SIZE``
+    lignes par requête) : mémoire constante quel que soit le volume, sans
+    curseur côté serveur ni transaction longue, donc compatible avec un
+    pooler en mode transaction (PgBouncer, Neon).
+    ``date_from`` / ``date_to`` sont des dates incluses.
+    """
+    queryset = MedicalRecord.objects.using(using) if using else MedicalRecord.objects.all()
+    if date_from:
+        queryset = queryset.filter(record_date__gte=_start_of_day(date_from))
+    if date_to:
+        queryset = queryset.filter(record_date__lt=_start_of_day(date_to + timedelta(days=1)))
+    if patient:
+        queryset = queryset.filter(patient_id=patient)
+    if doctor:
+        queryset = queryset.filter(doctor_id=doctor)
+    queryset = queryset.annotate(
+        patient_name=full_name("patient__user"),
+        doctor_name=Case(When(doctor__isnull=True, then=None), default=full_name("doctor__user")),
+    )
+    # Tri par clé primaire : chaque page est un parcours d'index, pas un tri global.
+    queryset = queryset.order_by("pk").values_list(*EXPORT_FIELDS)
+    size = settings.EXPORT_CHUNK_SIZE
+    last = None
+    while True:
+        page = list((queryset if last is None else queryset.filter(pk__gt=last))[:size])
+        yield from page
+        if len(page) < size:
+            return
+        last = page[-1][0]
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_ndjson(rows, batch=500):
+    """Une ligne JSON par dossier, regroupées par ``batch`` lignes."""
+    buffer = []
+    for row in rows:
+        record = dict(zip(EXPORT_FIELDS, map(_plain, row)))
+        buffer.append(json.dumps(record, ensure_ascii=False))
+        if len(buffer) >= batch:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def iter_csv(rows, batch=500):
+    """CSV avec en-tête, regroupé par ``batch`` lignes."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow([_plain(value) for value in row])
+        count += 1
+        if count % batch == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    if output.tell():
+        yield output.getvalue()
+
+
+WRITERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
@@ -0,0 +1,30 @@
+# app/fastjson.py
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur json
+    orjson = None
+
+
+def render_json(data, renderer):
+    """
+    Encode ``data`` avec les mêmes octets que ``renderer.render(data)`` (sans indentation).
+
+    orjson produit le JSON compact et UTF-8 de DRF (``UNICODE_JSON``,
+    ``COMPACT_JSON``) ; il n'est utilisé que dans cette configuration et pour
+    des types natifs (str, int, bool, None, listes et dictionnaires) : les
+    dates ou décimaux n'y seraient pas formatés comme par DRF.
+    """
+    if orjson is not None and renderer.compact and not renderer.ensure_ascii:
+        content = orjson.dumps(data)
+    else:
+        content = json.dumps(
+            data, cls=renderer.encoder_class or JSONEncoder,
+            ensure_ascii=renderer.ensure_ascii, allow_nan=not renderer.strict,
+            separators=(",", ":") if renderer.compact else (", ", ": "),
+        ).encode()
+    # Comme DRF : U+2028 / U+2029 échappés pour rester un sous-ensemble de JavaScript.
+    return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,70 @@
+# app/hashing.py
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker(settings_module):
+    """Initialise Django dans un processus du pool (utile en mode ``spawn``)."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+def get_executor():
+    """
+    Pool de processus partagé, créé au premier usage puis réutilisé.
+
+    Contexte ``spawn`` : un ``fork`` depuis un worker multi-thread (serveur,
+    tampon d'audit) copierait des verrous tenus et des connexions ouvertes.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "backend_medconnect.settings"),),
+            )
+        return _executor
+
+
+def _discard_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def hash_passwords(passwords):
+    """
+    Hache une liste de mots de passe en conservant l'ordre.
+
+    Le hachage PBKDF2 est coûteux en CPU : au-delà d'un seuil, le travail est
+    réparti sur un pool de processus pour contourner le GIL.
+    """
+    passwords = list(passwords)
+    workers = settings.PASSWORD_HASH_WORKERS
+    if workers <= 1 or len(passwords) < settings.PASSWORD_HASH_PARALLEL_THRESHOLD:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    try:
+        return list(get_executor().map(make_password, passwords, chunksize=chunksize))
+    except (BrokenProcessPool, OSError):
+        # Pool impossible à démarrer ou worker tué : hachage dans le processus courant.
+        logger.warning("Pool de hachage indisponible, hachage séquentiel.", exc_info=True)
+        _discard_executor()
+        return [make_password(password) for password in passwords]
@@ -0,0 +1,282 @@
+# app/instrumentation.py
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+
+from .authentication import principal_cache
+from .cache import cache_stats
+from .db_router import health
+
+# Mesures de la requête en cours (None hors requête : les spans sont ignorés).
+_current = contextvars.ContextVar("medconnect_request_timings", default=None)
+
+# Bornes des histogrammes de latence (secondes), comme les défauts Prometheus.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestTimings:
+    """Durées cumulées par phase pour une requête (db, auth, perm, serialize, render)."""
+
+    def __init__(self):
+        self.phases = {}
+        self.queries = 0
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """``execute_wrapper`` : compte les requêtes SQL et leur durée."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add("db", time.perf_counter() - start)
+
+    def server_timing(self, total):
+        parts = []
+        for name, seconds in self.phases.items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            if name == "db":
+                entry += f';desc="{self.queries} queries"'
+            parts.append(entry)
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+@contextmanager
+def span(name):
+    """Ajoute la durée du bloc à la phase ``name`` de la requête en cours."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+class MetricsRegistry:
+    """Histogrammes de latence et compteurs par route, en mémoire du processus."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, status, total, timings):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "buckets": [0] * len(self.buckets),
+                    "count": 0, "sum": 0.0, "queries": 0,
+                    "phases": {}, "statuses": {},
+                }
+            for index, bound in enumerate(self.buckets):
+                if total <= bound:
+                    stats["buckets"][index] += 1
+            stats["count"] += 1
+            stats["sum"] += total
+            stats["queries"] += timings.queries
+            for name, seconds in timings.phases.items():
+                stats["phases"][name] = stats["phases"].get(name, 0.0) + seconds
+            status_class = f"{status // 100}xx"
+            stats["statuses"][status_class] = stats["statuses"].get(status_class, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: dict(stats, buckets=list(stats["buckets"]), phases=dict(stats["phases"]),
+                            statuses=dict(stats["statuses"]))
+                for route, stats in self._routes.items()
+            }
+
+    def render_prometheus(self):
+        """Format texte d'exposition Prometheus (version 0.0.4)."""
+        lines = [
+            "# HELP medconnect_request_duration_seconds Durée des requêtes HTTP par route.",
+            "# TYPE medconnect_request_duration_seconds histogram",
+        ]
+        routes = self.snapshot()
+        for route, stats in sorted(routes.items()):
+            label = f'route="{_escape(route)}"'
+            for bound, count in zip(self.buckets, stats["buckets"]):
+                lines.append(f'medconnect_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'medconnect_request_duration_seconds_bucket{{{label},le="+Inf"}} {stats["count"]}')
+            lines.append(f"medconnect_request_duration_seconds_sum{{{label}}} {stats['sum']:.6f}")
+            lines.append(f"medconnect_request_duration_seconds_count{{{label}}} {stats['count']}")
+
+        lines += [
+            "# HELP medconnect_requests_total Requêtes HTTP par route et classe de statut.",
+            "# TYPE medconnect_requests_total counter",
+        ]
+        for route, stats in sorted(routes.items()):
+            for status_class, count in sorted(stats["statuses"].items()):
+                lines.append(f'medconnect_requests_total{{route="{_escape(route)}",status="{status_class}"}} {count}')
+
+        lines += [
+            "# HELP medconnect_db_queries_total Requêtes SQL exécutées par route.",
+            "# TYPE medconnect_db_queries_total counter",
+        ]
+        for route, stats in sorted(routes.items()):
+            lines.append(f'medconnect_db_queries_total{{route="{_escape(route)}"}} {stats["queries"]}')
+
+        lines += [
+            "# HELP medconnect_request_phase_seconds_total Temps cumulé par phase (db, auth, perm, serialize, render).",
+            "# TYPE medconnect_request_phase_seconds_total counter",
+        ]
+        for route, stats in sorted(routes.items()):
+            for phase, seconds in sorted(stats["phases"].items()):
+                lines.append(
+                    f'medconnect_request_phase_seconds_total{{route="{_escape(route)}",phase="{phase}"}} {seconds:.6f}'
+                )
+
+        lines += [
+            "# HELP medconnect_cache_requests_total Accès aux caches applicatifs.",
+            "# TYPE medconnect_cache_requests_total counter",
+        ]
+        cache_snapshot = cache_stats.snapshot()
+        for namespace, stats in sorted(cache_snapshot.items()):
+            for result, key in (("hit", "hits"), ("miss", "misses")):
+                lines.append(
+                    f'medconnect_cache_requests_total{{namespace="{_escape(namespace)}",result="{result}"}} '
+                    f'{stats[key]}'
+                )
+        lines += [
+            "# HELP medconnect_cache_latency_seconds_total Temps cumulé de service depuis les caches.",
+            "# TYPE medconnect_cache_latency_seconds_total counter",
+        ]
+        for namespace, stats in sorted(cache_snapshot.items()):
+            for result in ("hit", "miss"):
+                lines.append(
+                    f'medconnect_cache_latency_seconds_total{{namespace="{_escape(namespace)}",result="{result}"}} '
+                    f'{stats[result + "_seconds"]:.6f}'
+                )
+
+        lines += [
+            "# HELP medconnect_principal_cache_entries Jetons validés en cache.",
+            "# TYPE medconnect_principal_cache_entries gauge",
+            f"medconnect_principal_cache_entries {len(principal_cache)}",
+            "# HELP medconnect_replica_healthy Réplica utilisable (dernière vérification).",
+            "# TYPE medconnect_replica_healthy gauge",
+        ]
+        replicas = health.snapshot()
+        for alias, status in sorted(replicas.items()):
+            lines.append(f'medconnect_replica_healthy{{alias="{_escape(alias)}"}} {int(status["healthy"])}')
+        lines += [
+            "# HELP medconnect_replica_lag_seconds Retard de réplication mesuré.",
+            "# TYPE medconnect_replica_lag_seconds gauge",
+        ]
+        for alias, status in sorted(replicas.items()):
+            if status["lag"] is not None:
+                lines.append(f'medconnect_replica_lag_seconds{{alias="{_escape(alias)}"}} {status["lag"]:.3f}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+class PerformanceMiddleware:
+    """
+    Mesure chaque requête : nombre et durée des requêtes SQL (``execute_wrapper``),
+    authentification, permissions, sérialisation et rendu.
+
+    Les mesures sont agrégées par route dans ``registry`` (exposé sur
+    ``/metrics``) et, si ``SERVER_TIMING_HEADER``, renvoyées au personnel dans
+    l'en-tête ``Server-Timing``. À placer en tête de
+    ``MIDDLEWARE`` pour inclure les autres middlewares.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, timings)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, timings)
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    @staticmethod
+    def wrap_connections(stack, timings):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timings.db_wrapper))
+
+    def finish(self, request, response, timings, total):
+        registry.observe(self.route_name(request), response.status_code, total, timings)
+        if settings.SERVER_TIMING_HEADER and (settings.DEBUG or self.is_staff(request)):
+            response["Server-Timing"] = timings.server_timing(total)
+        return response
+
+    @staticmethod
+    def is_staff(request):
+        # DRF recopie l'utilisateur authentifié (jeton) sur la requête Django.
+        return getattr(getattr(request, "user", None), "is_staff", False)
+
+    @staticmethod
+    def route_name(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unmatched"
+        return match.view_name or match._func_path
+
+
+class InstrumentedViewMixin:
+    """Mesure l'authentification et les contrôles de permission des vues DRF."""
+
+    def perform_authentication(self, request):
+        with span("auth"):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with span("perm"):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with span("perm"):
+            super().check_object_permissions(request, obj)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` dont la durée apparaît dans la phase ``render``."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with span("render"):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,203 @@
+# app/jobs.py
+import traceback
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import stats
+from .authentication import principal_cache
+from .cache import doctor_directory_cache
+from .models import Job, User
+
+
+class Operation:
+    """
+    Opération de masse exécutable par le worker.
+
+    ``run_chunk`` traite les lignes d'un lot de clés dans une transaction
+    courte et retourne le nombre de lignes traitées. Elle doit être
+    idempotente : après une panne, le dernier lot peut être rejoué.
+    """
+
+    model = None
+
+    def run_chunk(self, params, queryset):
+        raise NotImplementedError
+
+    def finish(self, params):
+        """Appelé une fois la tâche terminée (invalidation de caches...)."""
+
+
+class UpdateUsers(Operation):
+    """``UPDATE`` de champs à valeur fixe : rejouer un lot ne change rien."""
+
+    model = User
+
+    def run_chunk(self, params, queryset):
+        values = params["values"]
+        if "role" in values:
+            # queryset.update() n'émet pas de signaux : compteurs par rôle ajustés ici.
+            moved = dict(queryset.exclude(role=values["role"]).values_list("role").annotate(n=Count("id")).order_by())
+            deltas = Counter()
+            for role, count in moved.items():
+                deltas[(stats.USERS_BY_ROLE, role)] -= count
+                deltas[(stats.USERS_BY_ROLE, values["role"])] += count
+            stats.apply(deltas)
+        # Pas d'auto_now sous queryset.update() : validateurs des GET conditionnels.
+        return queryset.update(**values, updated_at=timezone.now())
+
+    def finish(self, params):
+        # Le cache des jetons est propre à chaque processus : ici, celui du
+        # worker ; ailleurs, AUTH_PRINCIPAL_CACHE_TTL borne le délai.
+        principal_cache.clear()
+        doctor_directory_cache.bump()
+
+
+OPERATIONS = {
+    "users.update": UpdateUsers(),
+}
+
+
+def pk_ranges(pks):
+    """Compresse des clés triées (liste ou flux) en intervalles ``[début, fin]`` contigus."""
+    ranges = []
+    for pk in pks:
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+
+def run_inline(kind, queryset, params):
+    """Exécute l'opération immédiatement (petites sélections)."""
+    operation = OPERATIONS[kind]
+    with transaction.atomic():
+        count = operation.run_chunk(params, queryset)
+    operation.finish(params)
+    return count
+
+
+def enqueue(kind, queryset, params, user=None):
+    """Crée une tâche pour les lignes de ``queryset`` (clés figées au moment de l'appel)."""
+    if kind not in OPERATIONS:
+        raise ValueError(f"Opération inconnue : {kind}")
+    # Clés lues en flux et compressées au fil de l'eau : seuls les intervalles restent en mémoire.
+    ranges = pk_ranges(queryset.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=10000))
+    return Job.objects.create(
+        kind=kind, params=params, pk_ranges=ranges, total=sum(end - start + 1 for start, end in ranges),
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_job():
+    """
+    Réserve la prochaine tâche exécutable, ou retourne ``None``.
+
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` évite que deux workers attendent la
+    même ligne ; la mise à jour conditionnelle garantit qu'un seul la prend
+    (y compris sous SQLite, sans verrou de ligne). Une tâche ``RUNNING`` dont
+    le worker ne donne plus signe de vie est reprise.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    runnable = (
+        Job.objects.filter(status=Job.Status.PENDING, run_after__lte=now)
+        | Job.objects.filter(status=Job.Status.RUNNING, heartbeat_at__lt=stale)
+    )
+    with transaction.atomic():
+        job = (
+            runnable.select_for_update(skip_locked=True)
+            .order_by("run_after", "pk")
+            .only("pk", "status", "heartbeat_at")
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status=job.status, heartbeat_at=job.heartbeat_at).update(
+            status=Job.Status.RUNNING, heartbeat_at=now,
+            started_at=F("started_at") if job.status == Job.Status.RUNNING else now,
+        )
+    if not claimed:
+        return None
+    return Job.objects.get(pk=job.pk)
+
+
+def chunks(job, size):
+    """
+    Lots de ``size`` clés sélectionnées restant à traiter, pris à la suite à
+    travers les intervalles : une sélection éparse (« tout sélectionner » filtré)
+    reste groupée. Chaque lot est une liste d'intervalles ``(début, fin)``.
+    """
+    batch, count = [], 0
+    for start, end in job.pk_ranges:
+        if job.cursor is not None:
+            if end <= job.cursor:
+                continue
+            start = max(start, job.cursor + 1)
+        while start <= end:
+            high = min(start + size - count - 1, end)
+            batch.append((start, high))
+            count += high - start + 1
+            start = high + 1
+            if count == size:
+                yield batch
+                batch, count = [], 0
+    if batch:
+        yield batch
+
+
+def ranges_filter(ranges):
+    """Condition SQL d'un lot : ``IN`` pour les clés isolées, ``BETWEEN`` pour les intervalles."""
+    condition = Q(pk__in=[start for start, end in ranges if start == end])
+    for start, end in ranges:
+        if start != end:
+            condition |= Q(pk__range=(start, end))
+    return condition
+
+
+def run_job(job, chunk_size=None, should_stop=lambda: False):
+    """
+    Exécute une tâche réservée, lot par lot.
+
+    Chaque lot est une transaction qui enregistre aussi l'avancement
+    (``cursor``, ``processed``) : une reprise ne rejoue au plus que le lot
+    interrompu. En cas d'erreur, la tâche est replanifiée avec un délai
+    croissant jusqu'à ``max_attempts``, puis marquée échouée.
+    """
+    operation = OPERATIONS[job.kind]
+    size = chunk_size or settings.JOB_CHUNK_SIZE
+    try:
+        for ranges in chunks(job, size):
+            high = ranges[-1][1]
+            if should_stop():
+                # Arrêt demandé : la tâche repart du curseur au prochain passage.
+                Job.objects.filter(pk=job.pk).update(status=Job.Status.PENDING, heartbeat_at=None)
+                return job
+            with transaction.atomic():
+                count = operation.run_chunk(job.params, operation.model.objects.filter(ranges_filter(ranges)))
+                job.cursor = high
+                job.processed += count
+                Job.objects.filter(pk=job.pk).update(
+                    cursor=high, processed=F("processed") + count, heartbeat_at=timezone.now(),
+                )
+        operation.finish(job.params)
+    except Exception:
+        job.attempts += 1
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status, job.finished_at = Job.Status.FAILED, timezone.now()
+        else:
+            job.status = Job.Status.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+        job.heartbeat_at = None
+        job.save(update_fields=["attempts", "last_error", "status", "finished_at", "run_after", "heartbeat_at"])
+        return job
+    job.status, job.finished_at, job.heartbeat_at = Job.Status.SUCCEEDED, timezone.now(), None
+    job.save(update_fields=["status", "finished_at", "heartbeat_at"])
+    return job
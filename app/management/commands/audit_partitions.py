@@ -0,0 +1,35 @@
+# app/management/commands/audit_partitions.py
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from app.audit import detach_partitions_before, ensure_partitions
+
+
+def month_argument(value):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Crée à l'avance les partitions mensuelles du journal d'audit (PostgreSQL) et, "
+        "sur demande, détache les plus anciennes pour archivage. À planifier chaque mois."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=None,
+                            help="Partitions à garantir, mois courant compris (AUDIT_PARTITION_MONTHS_AHEAD + 1).")
+        parser.add_argument("--detach-before", type=month_argument, metavar="AAAA-MM",
+                            help="Détache les partitions antérieures à ce mois (les données sont conservées).")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if connections[using].vendor != "postgresql":
+            raise CommandError("Le journal d'audit n'est partitionné que sous PostgreSQL.")
+        for name in ensure_partitions(options["months"], using=using):
+            self.stdout.write(f"partition {name}")
+        if options["detach_before"]:
+            for name in detach_partitions_before(options["detach_before"], using=using):
+                self.stdout.write(f"détachée : {name}")
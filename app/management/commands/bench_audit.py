@@ -0,0 +1,61 @@
+# app/management/commands/bench_audit.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import override_settings
+
+from app.audit import buffer
+from app.benchmarks import SCENARIOS, run_scenario
+from app.models import AccessEvent
+
+# Journal désactivé, tampon (réglages courants), puis une écriture par accès.
+MODES = {
+    "off": {"AUDIT_ENABLED": False},
+    "buffered": {"AUDIT_ENABLED": True},
+    "unbuffered": {"AUDIT_ENABLED": True, "AUDIT_BUFFER_SIZE": 1, "AUDIT_FLUSH_INTERVAL": 0},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le surcoût du journal d'audit sur le chemin de lecture : journal désactivé, "
+        "tamponné, ou écrit à chaque accès. Données : seed_medconnect."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                            help="Scénario mesuré (répétable, api.records.list par défaut).")
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        hosts = list(settings.ALLOWED_HOSTS)
+        if "*" not in hosts and "testserver" not in hosts:
+            hosts.append("testserver")
+        self.stdout.write(f"{'scénario':<28}{'mode':<12}{'p50 ms':>9}{'p95 ms':>9}{'surcoût p50':>13}"
+                          f"{'événements':>12}")
+        for name in options["scenario"] or ["api.records.list"]:
+            reference = None
+            for mode, overrides in MODES.items():
+                before = AccessEvent.objects.using(options["database"]).count()
+                with override_settings(ALLOWED_HOSTS=hosts, **overrides):
+                    try:
+                        result = run_scenario(SCENARIOS[name](options["database"]),
+                                              options["iterations"], options["warmup"])
+                    except LookupError as exc:
+                        raise CommandError(str(exc))
+                    start = time.perf_counter()
+                    buffer.flush()
+                    flushed_ms = (time.perf_counter() - start) * 1000
+                events = AccessEvent.objects.using(options["database"]).count() - before
+                reference = reference or result["p50_ms"]
+                overhead = (result["p50_ms"] / reference - 1) * 100 if reference else 0.0
+                self.stdout.write(
+                    f"{name:<28}{mode:<12}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                    f"{overhead:>12.1f}%{events:>12}"
+                )
+                if mode == "buffered":
+                    self.stdout.write(f"{'':<28}{'':<12}dernier lot écrit en {flushed_ms:.1f} ms")
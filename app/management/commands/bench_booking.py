@@ -0,0 +1,37 @@
+# app/management/commands/bench_booking.py
+from django.core.management.base import BaseCommand, CommandError
+
+from app.benchmarks import booking_contention
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la réservation de créneaux sous contention (threads concurrents sur quelques "
+        "créneaux) et vérifie l'absence de double réservation. Données : seed_medconnect."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", default="1,4,16", help="Niveaux de concurrence, séparés par des virgules.")
+        parser.add_argument("--attempts", type=int, default=50, help="Tentatives par thread.")
+        parser.add_argument("--hot-slots", type=int, default=20, help="Créneaux disputés.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["threads"].split(",")]
+        except ValueError:
+            raise CommandError("--threads attend des entiers séparés par des virgules.")
+        self.stdout.write(f"{'threads':>8}{'tent./s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+                          f"{'réservés':>10}{'conflits':>10}{'erreurs':>9}{'doublons':>10}")
+        for level in levels:
+            try:
+                result = booking_contention(level, options["attempts"], options["hot_slots"], options["seed"])
+            except LookupError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(
+                f"{level:>8}{result['attempts_per_s']:>10.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                f"{result['p99_ms']:>10.1f}{result['booked']:>10}{result['conflicts']:>10}{result['errors']:>9}"
+                f"{result['double_booked']:>10}"
+            )
+            if result["double_booked"]:
+                raise CommandError(f"{result['double_booked']} créneau(x) réservé(s) deux fois.")
@@ -0,0 +1,146 @@
+# app/management/commands/bench_concurrency.py
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.benchmarks import percentile
+
+
+async def read_response(reader):
+    """Lit une réponse HTTP/1.1 (Content-Length ou chunked) ; retourne le statut."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connexion fermée")
+    status = int(status_line.split()[1])
+    length, chunked = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+class Client:
+    """Connexion HTTP persistante (keep-alive), rouverte après une erreur."""
+
+    def __init__(self, url, token):
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise CommandError(f"Seul http:// est pris en charge : {url}")
+        self.host, self.port = parts.hostname, parts.port or 80
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        headers = [f"GET {path} HTTP/1.1", f"Host: {parts.netloc}", "Connection: keep-alive"]
+        if token:
+            headers.append(f"Authorization: Bearer {token}")
+        self.request = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1")
+        self.reader = self.writer = None
+
+    async def get(self):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            self.writer.write(self.request)
+            await self.writer.drain()
+            return await read_response(self.reader)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            self.close()
+            raise
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def run_level(url, token, concurrency, total):
+    """``total`` requêtes réparties sur ``concurrency`` connexions simultanées."""
+    latencies, errors = [], 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        client = Client(url, token)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    status = await client.get()
+                except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit et la latence d'endpoints HTTP à plusieurs niveaux de concurrence, "
+        "pour comparer un worker ASGI (uvicorn, vues /api/async/) au chemin WSGI (gunicorn)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target", action="append", required=True, metavar="NOM=URL",
+            help="Endpoint mesuré, ex. asgi=http://127.0.0.1:8001/api/async/users/ (répétable).",
+        )
+        parser.add_argument("--token", help="Jeton d'API envoyé en « Authorization: Bearer ».")
+        parser.add_argument("--concurrency", default="1,8,32,64",
+                            help="Niveaux de concurrence, séparés par des virgules.")
+        parser.add_argument("--requests", type=int, default=500, help="Requêtes par niveau.")
+        parser.add_argument("--warmup", type=int, default=20)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            name, _, url = target.partition("=")
+            if not url:
+                raise CommandError(f"--target attend NOM=URL : {target}")
+            targets.append((name, url))
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency attend des entiers séparés par des virgules.")
+
+        self.stdout.write(f"{'cible':<12}{'conc.':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+                          f"{'p99 ms':>10}{'erreurs':>9}")
+        for name, url in targets:
+            asyncio.run(run_level(url, options["token"], 1, options["warmup"]))
+            for level in levels:
+                result = asyncio.run(run_level(url, options["token"], level, options["requests"]))
+                self.stdout.write(
+                    f"{name:<12}{level:>6}{result['requests_per_s']:>10.1f}{result['p50_ms']:>10.1f}"
+                    f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>9}"
+                )
@@ -0,0 +1,42 @@
+# app/management/commands/bench_search.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.models import MedicalRecord
+
+
+class Command(BaseCommand):
+    help = "Compare la recherche plein texte (tsvector + GIN) à l'ancienne recherche ILIKE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("terms", nargs="+", help="Termes à rechercher (une recherche par argument).")
+        parser.add_argument("--repeat", type=int, default=5, help="Répétitions par recherche.")
+        parser.add_argument("--limit", type=int, default=20, help="Nombre de résultats lus, comme une page.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("La recherche plein texte nécessite PostgreSQL.")
+        total = MedicalRecord.objects.count()
+        self.stdout.write(f"{total} dossiers médicaux, {options['repeat']} répétitions par terme\n")
+        self.stdout.write(f"{'terme':<30}{'chemin':<10}{'médiane ms':>12}{'max ms':>10}{'résultats':>11}")
+
+        for terms in options["terms"]:
+            paths = {
+                "ilike": lambda: MedicalRecord.objects.search_ilike(terms).order_by("-record_date"),
+                "fts": lambda: MedicalRecord.objects.search(terms).order_by("-search_rank"),
+            }
+            for name, build in paths.items():
+                timings, count = [], 0
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    # Une page de résultats plus le comptage, comme l'admin.
+                    list(build()[: options["limit"]])
+                    count = build().count()
+                    timings.append((time.perf_counter() - start) * 1000)
+                self.stdout.write(
+                    f"{terms:<30}{name:<10}{statistics.median(timings):>12.1f}"
+                    f"{max(timings):>10.1f}{count:>11}"
+                )
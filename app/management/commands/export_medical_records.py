@@ -0,0 +1,65 @@
+# app/management/commands/export_medical_records.py
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.dateparse import parse_date
+
+from app.exports import WRITERS, export_rows
+
+
+def date_argument(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+class Command(BaseCommand):
+    help = "Exporte les dossiers médicaux en flux (NDJSON ou CSV), à mémoire constante."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", choices=sorted(WRITERS), default="ndjson", help="Format de sortie.")
+        parser.add_argument("--file", help="Fichier de destination (sortie standard par défaut).")
+        parser.add_argument("--from", dest="date_from", type=date_argument, help="Date de début incluse (AAAA-MM-JJ).")
+        parser.add_argument("--to", dest="date_to", type=date_argument, help="Date de fin incluse (AAAA-MM-JJ).")
+        parser.add_argument("--patient", type=int, help="Identifiant du profil patient.")
+        parser.add_argument("--doctor", type=int, help="Identifiant du profil médecin.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Base à lire (ex. un réplica).")
+
+    def handle(self, *args, **options):
+        if options["date_from"] and options["date_to"] and options["date_from"] > options["date_to"]:
+            raise CommandError("--from doit précéder --to.")
+        rows = export_rows(
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            patient=options["patient"],
+            doctor=options["doctor"],
+            using=options["database"],
+        )
+        counted = _Counter(rows)
+        destination = open(options["file"], "w", encoding="utf-8", newline="") if options["file"] else sys.stdout
+        start = time.perf_counter()
+        try:
+            for chunk in WRITERS[options["output"]](counted):
+                destination.write(chunk)
+        finally:
+            if destination is not sys.stdout:
+                destination.close()
+        elapsed = time.perf_counter() - start
+        rate = counted.count / elapsed if elapsed else 0
+        self.stderr.write(f"{counted.count} dossiers exportés en {elapsed:.1f} s ({rate:.0f} lignes/s)")
+
+
+class _Counter:
+    """Compte les lignes au passage sans les conserver."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
@@ -0,0 +1,138 @@
+# app/management/commands/import_medconnect.py
+import csv
+import json
+import os
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from app import stats
+from app.importers import IMPORTERS, copy_insert
+from app.models import ImportCheckpoint
+
+
+def read_rows(path, file_format):
+    """Itère sur ``(numéro de ligne, dict)`` sans charger le fichier en mémoire."""
+    with open(path, encoding="utf-8", newline="") as source:
+        if file_format == "csv":
+            for number, row in enumerate(csv.DictReader(source), start=1):
+                yield number, row
+            return
+        for number, line in enumerate(source, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                row = {"__invalid__": f"JSON invalide : {exc}"}
+            if not isinstance(row, dict):
+                row = {"__invalid__": "Un objet JSON est attendu."}
+            yield number, row
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe en masse des utilisateurs, profils patients / médecins ou dossiers médicaux "
+        "depuis un fichier CSV ou NDJSON, par lots, avec reprise et fichier de rejets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS), help="Type de données importées.")
+        parser.add_argument("path", help="Fichier source (.csv, .ndjson ou .jsonl).")
+        parser.add_argument("--format", choices=["csv", "ndjson"], help="Format (déduit de l'extension par défaut).")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Lignes par transaction.")
+        parser.add_argument("--rejects", help="Lignes rejetées au format NDJSON (défaut : <path>.rejects.ndjson).")
+        parser.add_argument("--copy", action="store_true", help="Utilise COPY (PostgreSQL) au lieu de bulk_create.")
+        parser.add_argument("--restart", action="store_true", help="Ignore le point de reprise existant.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        if not os.path.exists(path):
+            raise CommandError(f"Fichier introuvable : {path}")
+        file_format = options["format"] or ("csv" if path.lower().endswith(".csv") else "ndjson")
+        using = options["database"]
+        if options["copy"] and connections[using].vendor != "postgresql":
+            raise CommandError("--copy nécessite PostgreSQL.")
+
+        rejects_path = options["rejects"] or f"{path}.rejects.ndjson"
+        self.checkpoint, _ = ImportCheckpoint.objects.using(using).get_or_create(kind=options["kind"], path=path)
+        if options["restart"]:
+            self.checkpoint.row = self.checkpoint.rejects_offset = 0
+        resume_after = self.checkpoint.row
+        if resume_after:
+            self.stderr.write(f"Reprise après la ligne {resume_after}.")
+
+        importer = IMPORTERS[options["kind"]](using)
+        self.importer = importer
+        self.using = using
+        self.use_copy = options["copy"]
+        self.imported = self.rejected = 0
+        self.start = time.perf_counter()
+
+        batch, last_row = [], resume_after
+        self.pending_rejects = []
+        with open(rejects_path, "a+b" if resume_after else "w+b") as rejects:
+            # Rejets écrits après le dernier lot validé : ils seront réécrits.
+            rejects.truncate(min(rejects.seek(0, os.SEEK_END), self.checkpoint.rejects_offset))
+            self.rejects = rejects
+            for number, row in read_rows(path, file_format):
+                if number <= resume_after:
+                    continue
+                last_row = number
+                try:
+                    if "__invalid__" in row:
+                        raise ValidationError(row["__invalid__"])
+                    instance = importer.build(row)
+                except ValidationError as exc:
+                    errors = exc.message_dict if hasattr(exc, "error_dict") else {"__all__": exc.messages}
+                    self.pending_rejects.append(json.dumps(
+                        {"row": number, "errors": errors, "data": row}, ensure_ascii=False, default=str
+                    ))
+                    self.rejected += 1
+                    continue
+                importer.accept(instance)
+                batch.append(instance)
+                if len(batch) >= options["batch_size"]:
+                    self.flush(importer.model, batch, last_row)
+                    batch = []
+            self.flush(importer.model, batch, last_row)
+        importer.finish()
+
+        elapsed = time.perf_counter() - self.start
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.imported} lignes importées, {self.rejected} rejetées en {elapsed:.1f} s "
+            f"({self.imported / elapsed if elapsed else 0:.0f} lignes/s)."
+        ))
+        if self.rejected:
+            self.stdout.write(f"Rejets : {rejects_path}")
+
+    def flush(self, model, batch, last_row):
+        """
+        Écrit les rejets, puis le lot et le point de reprise dans une même
+        transaction : après un arrêt, aucune ligne n'est importée deux fois, et
+        les rejets écrits au-delà du point de reprise sont tronqués à la reprise.
+        """
+        for line in self.pending_rejects:
+            self.rejects.write((line + "\n").encode("utf-8"))
+        self.rejects.flush()
+        os.fsync(self.rejects.fileno())
+        self.pending_rejects = []
+        self.checkpoint.row, self.checkpoint.rejects_offset = last_row, self.rejects.tell()
+        with transaction.atomic(using=self.using):
+            if batch:
+                if self.use_copy:
+                    copy_insert(model, batch, self.using)
+                else:
+                    model.objects.using(self.using).bulk_create(batch)
+                stats.apply(self.importer.stat_deltas(batch), using=self.using)
+            self.checkpoint.save(using=self.using, update_fields=["row", "rejects_offset", "updated_at"])
+        self.imported += len(batch)
+        elapsed = time.perf_counter() - self.start
+        self.stderr.write(
+            f"ligne {last_row} : {self.imported} importées, {self.rejected} rejetées "
+            f"({self.imported / elapsed if elapsed else 0:.0f} lignes/s)"
+        )
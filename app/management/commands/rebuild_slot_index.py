@@ -0,0 +1,36 @@
+# app/management/commands/rebuild_slot_index.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.appointments import rebuild
+from app.models import DoctorDaySlots
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule l'index des créneaux libres (horaires, absences, rendez-vous) et "
+        "supprime les journées passées. À lancer chaque jour pour faire glisser l'horizon."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctor", type=int, action="append", help="Profil médecin (répétable, tous par défaut).")
+        parser.add_argument("--days", type=int, default=settings.APPOINTMENT_HORIZON_DAYS,
+                            help="Jours indexés à partir d'aujourd'hui.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        today = timezone.localdate()
+        rows = DoctorDaySlots.objects.all()
+        if options["doctor"]:
+            rows = rows.filter(doctor__in=options["doctor"])
+        # Journées passées, et au-delà de l'horizon s'il a été réduit.
+        deleted, _ = (rows.filter(date__lt=today)
+                      | rows.filter(date__gte=today + timedelta(days=options["days"]))).delete()
+        indexed = rebuild(doctors=options["doctor"], start=today, days=options["days"])
+        self.stdout.write(
+            f"{indexed} journées indexées, {deleted} supprimées en {time.perf_counter() - start:.1f} s"
+        )
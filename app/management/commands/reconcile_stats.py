@@ -0,0 +1,28 @@
+# app/management/commands/reconcile_stats.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from app.stats import NAMES, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les compteurs des statistiques par GROUP BY et corrige les écarts "
+        "(écritures SQL directes, restaurations). À planifier, par exemple chaque nuit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--name", action="append", choices=NAMES, help="Statistique (répétable, toutes par défaut).")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        drift = reconcile(options["name"] or NAMES, using=options["database"])
+        for name, changes in drift.items():
+            self.stdout.write(f"{name} : {len(changes)} compteur(s) corrigé(s)")
+            for key, (stored, actual) in sorted(changes.items())[:20]:
+                self.stdout.write(f"  {key or '(aucune)'} : {stored} → {actual}")
+        self.stdout.write(f"Réconciliation terminée en {time.perf_counter() - start:.1f} s"
+                          + ("" if drift else " (aucun écart)"))
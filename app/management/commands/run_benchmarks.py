@@ -0,0 +1,101 @@
+# app/management/commands/run_benchmarks.py
+import json
+import platform
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+
+from app.benchmarks import SCENARIOS, compare, generate_dataset, run_scenario
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les scénarios de performance (API, admin, sérialiseurs) : p50/p95/p99, "
+        "requêtes par appel, lignes/s. Échoue si une référence est dépassée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                            help="Scénario à exécuter (répétable ; tous par défaut).")
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--baseline", help="Référence JSON à laquelle comparer les résultats.")
+        parser.add_argument("--save-baseline", help="Enregistre les résultats comme nouvelle référence.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Dégradation de p95 tolérée (fraction, défaut 0.25).")
+        parser.add_argument("--test-db", action="store_true",
+                            help="Base de test jetable, générée avec --users / --records-per-patient / --seed.")
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--records-per-patient", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        connection = connections[using]
+        names = options["scenario"] or list(SCENARIOS)
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as source:
+                baseline = json.load(source)
+
+        old_name = None
+        if options["test_db"]:
+            old_name = connection.settings_dict["NAME"]
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            counts = generate_dataset(
+                users=options["users"], records_per_patient=options["records_per_patient"],
+                seed=options["seed"], using=using,
+            )
+            self.stderr.write(f"Base de test : {counts}")
+        try:
+            # Le client de test envoie « Host: testserver ».
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                results = {}
+                for name in names:
+                    results[name] = run_scenario(
+                        SCENARIOS[name](using), iterations=options["iterations"], warmup=options["warmup"]
+                    )
+                    self.report(name, results[name], (baseline or {}).get("results", {}).get(name))
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w", encoding="utf-8") as target:
+                json.dump({"environment": self.environment(connection), "results": results},
+                          target, indent=2, sort_keys=True)
+                target.write("\n")
+            self.stdout.write(f"Référence enregistrée : {options['save_baseline']}")
+
+        if baseline is not None:
+            if baseline.get("environment", {}).get("vendor") != connection.vendor:
+                self.stderr.write(self.style.WARNING(
+                    "La référence a été mesurée sur un autre moteur de base de données."
+                ))
+            regressions = compare(results, baseline.get("results", {}), options["tolerance"])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(self.style.ERROR(regression))
+                raise CommandError(f"{len(regressions)} régression(s) par rapport à {options['baseline']}.")
+            self.stdout.write(self.style.SUCCESS("Aucune régression."))
+
+    def report(self, name, result, reference):
+        line = (
+            f"{name:<30}p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  "
+            f"p99 {result['p99_ms']:>8.1f} ms  {result['queries']:>3} req.  {result['rows_per_s']:>10.0f} lignes/s"
+        )
+        if reference:
+            line += f"  (réf. p95 {reference['p95_ms']:.1f} ms, {reference['queries']} req.)"
+        self.stdout.write(line)
+
+    def environment(self, connection):
+        return {
+            "vendor": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "machine": platform.machine(),
+        }
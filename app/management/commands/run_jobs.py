@@ -0,0 +1,54 @@
+# app/management/commands/run_jobs.py
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from app.jobs import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les tâches en arrière-plan (actions de masse de l'admin), lot par lot. "
+        "Plusieurs workers peuvent tourner en parallèle ; SIGTERM termine le lot en cours puis s'arrête."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Vide la file puis s'arrête.")
+        parser.add_argument("--sleep", type=float, default=None,
+                            help="Attente quand la file est vide (JOB_POLL_INTERVAL par défaut).")
+        parser.add_argument("--chunk-size", type=int, default=None,
+                            help="Lignes par transaction (JOB_CHUNK_SIZE par défaut).")
+        parser.add_argument("--max-jobs", type=int, default=None, help="Nombre de tâches avant arrêt.")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        previous = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+        sleep = settings.JOB_POLL_INTERVAL if options["sleep"] is None else options["sleep"]
+        done = 0
+        try:
+            while not self.stopping:
+                close_old_connections()
+                job = claim_job()
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(sleep)
+                    continue
+                start = time.perf_counter()
+                job = run_job(job, chunk_size=options["chunk_size"], should_stop=lambda: self.stopping)
+                self.stdout.write(
+                    f"{job} : {job.processed}/{job.total} lignes en {time.perf_counter() - start:.1f} s"
+                )
+                done += 1
+                if options["max_jobs"] and done >= options["max_jobs"]:
+                    break
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+    def stop(self, signum, frame):
+        # Le lot en cours est validé ; la tâche repart de son curseur au prochain démarrage.
+        self.stopping = True
@@ -0,0 +1,43 @@
+# app/management/commands/seed_medconnect.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from app.benchmarks import USERNAME_PREFIX, delete_dataset, generate_dataset
+from app.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données synthétique reproductible (utilisateurs, profils, "
+        "spécialités, dossiers médicaux) pour les mesures de performance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000, help="Nombre de comptes générés.")
+        parser.add_argument("--records-per-patient", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42, help="Graine du générateur.")
+        parser.add_argument("--replace", action="store_true",
+                            help=f"Supprime d'abord les comptes « {USERNAME_PREFIX}* » déjà générés.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        existing = User.objects.using(using).filter(username__startswith=USERNAME_PREFIX).exists()
+        if existing and not options["replace"]:
+            raise CommandError(f"Des comptes « {USERNAME_PREFIX}* » existent déjà (--replace pour les remplacer).")
+        if existing:
+            self.stderr.write(f"{delete_dataset(using)} objets supprimés.")
+
+        start = time.perf_counter()
+        counts = generate_dataset(
+            users=options["users"],
+            records_per_patient=options["records_per_patient"],
+            seed=options["seed"],
+            using=using,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['users']} utilisateurs, {counts['doctors']} médecins, {counts['patients']} patients, "
+            f"{counts['records']} dossiers générés en {time.perf_counter() - start:.1f} s."
+        ))
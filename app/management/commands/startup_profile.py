@@ -0,0 +1,71 @@
+# app/management/commands/startup_profile.py
+from django.core.management.base import BaseCommand, CommandError
+
+from app.benchmarks import STARTUP_PHASES, import_packages, startup_profile
+
+PHASE_LABELS = {
+    "settings": "réglages chargés",
+    "apps_ready": "applications prêtes",
+    "handler": "handler et middlewares",
+    "urls": "routes chargées",
+    "process": "processus prêt",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le démarrage à froid d'un worker dans des processus neufs : durée des phases "
+        "(médiane) et temps d'import par module (-X importtime). --compare ENABLE_ADMIN=False "
+        "mesure une seconde configuration pour chiffrer le gain."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entry", choices=["wsgi", "asgi", "manage"], default="wsgi",
+                            help="Point d'entrée mesuré (manage : réglages et applications seulement).")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15, help="Modules et paquets affichés.")
+        parser.add_argument("--compare", action="append", metavar="VARIABLE=VALEUR", default=[],
+                            help="Variable d'environnement de la configuration comparée (répétable).")
+
+    def handle(self, *args, **options):
+        variant = {}
+        for item in options["compare"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"--compare attend VARIABLE=VALEUR : {item}")
+            variant[name] = value
+        try:
+            profiles = startup_profile(options["entry"], options["runs"], [None, variant] if variant else [None])
+            phases, modules = profiles[0]
+            variant_phases, variant_modules = profiles[-1]
+        except RuntimeError as exc:
+            raise CommandError(f"Démarrage impossible : {exc}")
+
+        header = f"{'phase (ms depuis le début)':<32}{'actuel':>10}"
+        if variant:
+            header += f"{'comparé':>10}{'gain':>9}"
+        self.stdout.write(header)
+        for name in (*STARTUP_PHASES, "process"):
+            if name not in phases:
+                continue
+            line = f"{PHASE_LABELS[name]:<32}{phases[name] * 1000:>10.1f}"
+            if variant:
+                gain = (1 - variant_phases[name] / phases[name]) * 100 if phases[name] else 0.0
+                line += f"{variant_phases[name] * 1000:>10.1f}{gain:>8.1f}%"
+            self.stdout.write(line)
+        if variant:
+            self.stdout.write("configuration comparée : " + " ".join(options["compare"]))
+
+        self.write_imports("actuel", modules, options["top"])
+        if variant:
+            self.write_imports("comparé", variant_modules, options["top"])
+
+    def write_imports(self, label, modules, top):
+        total = sum(own for _, own, _ in modules)
+        self.stdout.write(f"\nimports ({label}) : {len(modules)} modules, {total / 1000:.1f} ms")
+        self.stdout.write(f"{'paquet':<40}{'ms':>9}")
+        for package, own in import_packages(modules)[:top]:
+            self.stdout.write(f"{package:<40}{own / 1000:>9.1f}")
+        self.stdout.write(f"{'module (cumulé)':<40}{'ms':>9}")
+        for name, _, cumulative in sorted(modules, key=lambda module: module[2], reverse=True)[:top]:
+            self.stdout.write(f"{name:<40}{cumulative / 1000:>9.1f}")
@@ -0,0 +1,95 @@
+# Generated by Django 4.2 on 2026-10-16 22:37
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Le vecteur combine le français et l'anglais (contenu bilingue) ; les noms du
+# patient et du médecin sont indexés sans racinisation (configuration simple).
+CREATE_SEARCH_SQL = """
+CREATE OR REPLACE FUNCTION app_medicalrecord_search_vector() RETURNS trigger AS $$
+DECLARE
+    names text;
+BEGIN
+    SELECT concat_ws(' ', pu.username, pu.first_name, pu.last_name,
+                          du.username, du.first_name, du.last_name)
+      INTO names
+      FROM app_patientprofile p
+      JOIN app_user pu ON pu.id = p.user_id
+      LEFT JOIN app_doctorprofile d ON d.id = NEW.doctor_id
+      LEFT JOIN app_user du ON du.id = d.user_id
+     WHERE p.id = NEW.patient_id;
+
+    NEW.search_vector :=
+        setweight(to_tsvector('french', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(NEW.diagnosis, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.diagnosis, '')), 'B') ||
+        setweight(to_tsvector('french', concat_ws(' ', NEW.description, NEW.treatment)), 'C') ||
+        setweight(to_tsvector('english', concat_ws(' ', NEW.description, NEW.treatment)), 'C') ||
+        setweight(to_tsvector('simple', coalesce(names, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER app_medicalrecord_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, description, diagnosis, treatment, patient_id, doctor_id
+    ON app_medicalrecord
+    FOR EACH ROW EXECUTE FUNCTION app_medicalrecord_search_vector();
+
+-- Un changement de nom recalcule les vecteurs des dossiers concernés.
+CREATE OR REPLACE FUNCTION app_user_refresh_record_search() RETURNS trigger AS $$
+BEGIN
+    UPDATE app_medicalrecord r SET title = r.title
+     WHERE r.patient_id IN (SELECT id FROM app_patientprofile WHERE user_id = NEW.id)
+        OR r.doctor_id IN (SELECT id FROM app_doctorprofile WHERE user_id = NEW.id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER app_user_refresh_record_search_trg
+    AFTER UPDATE OF username, first_name, last_name ON app_user
+    FOR EACH ROW
+    WHEN (OLD.username IS DISTINCT FROM NEW.username
+          OR OLD.first_name IS DISTINCT FROM NEW.first_name
+          OR OLD.last_name IS DISTINCT FROM NEW.last_name)
+    EXECUTE FUNCTION app_user_refresh_record_search();
+
+CREATE INDEX app_medicalrecord_search_gin ON app_medicalrecord USING gin (search_vector);
+
+UPDATE app_medicalrecord SET title = title;
+"""
+
+DROP_SEARCH_SQL = """
+DROP INDEX IF EXISTS app_medicalrecord_search_gin;
+DROP TRIGGER IF EXISTS app_user_refresh_record_search_trg ON app_user;
+DROP FUNCTION IF EXISTS app_user_refresh_record_search();
+DROP TRIGGER IF EXISTS app_medicalrecord_search_vector_trg ON app_medicalrecord;
+DROP FUNCTION IF EXISTS app_medicalrecord_search_vector();
+"""
+
+
+def run_on_postgresql(sql):
+    """Les triggers et l'index GIN n'existent que sous PostgreSQL."""
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_authtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicalrecord',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_on_postgresql(CREATE_SEARCH_SQL),
+            run_on_postgresql(DROP_SEARCH_SQL),
+        ),
+    ]
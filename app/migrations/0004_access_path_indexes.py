@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-16 22:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_medicalrecord_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctorprofile',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['speciality', 'consultation_fee'], name='doctor_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicalrecord',
+            index=models.Index(fields=['patient', '-record_date'], name='record_patient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicalrecord',
+            index=models.Index(fields=['doctor', '-record_date'], name='record_doctor_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role'], name='user_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined', 'id'], name='user_date_joined_idx'),
+        ),
+        # Les index FK simples ne sont supprimés qu'une fois les composites créés.
+        migrations.AlterField(
+            model_name='medicalrecord',
+            name='doctor',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='app.doctorprofile'),
+        ),
+        migrations.AlterField(
+            model_name='medicalrecord',
+            name='patient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='medical_records', to='app.patientprofile'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2 on 2026-10-16 23:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklySchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'), (3, 'Jeudi'), (4, 'Vendredi'), (5, 'Samedi'), (6, 'Dimanche')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_schedules', to='app.doctorprofile')),
+            ],
+            options={
+                'ordering': ['doctor', 'weekday', 'start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField(blank=True, null=True)),
+                ('end_time', models.TimeField(blank=True, null=True)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_exceptions', to='app.doctorprofile')),
+            ],
+            options={
+                'ordering': ['doctor', 'date', 'start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DoctorDaySlots',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_available', models.BooleanField(default=True)),
+                ('free', models.BigIntegerField(default=0)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_slots', to='app.doctorprofile')),
+                ('speciality', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.speciality')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('status', models.CharField(choices=[('BOOKED', 'Réservé'), ('CANCELLED', 'Annulé')], default='BOOKED', max_length=20)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.doctorprofile')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.patientprofile')),
+            ],
+            options={
+                'ordering': ['start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weeklyschedule',
+            constraint=models.CheckConstraint(check=models.Q(('start_time__lt', models.F('end_time'))), name='schedule_start_before_end'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleexception',
+            index=models.Index(fields=['doctor', 'date'], name='exception_doctor_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctordayslots',
+            index=models.Index(condition=models.Q(('is_available', True), models.Q(('free', 0), _negated=True)), fields=['speciality', 'date'], name='day_slots_search_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='doctordayslots',
+            constraint=models.UniqueConstraint(fields=('doctor', 'date'), name='day_slots_doctor_date_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'start'], name='appointment_patient_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'BOOKED')), fields=('doctor', 'start'), name='appointment_no_double_booking'),
+        ),
+    ]
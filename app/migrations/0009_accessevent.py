@@ -0,0 +1,89 @@
+# Generated by Django 4.2 on 2026-10-16 23:07
+
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Table partitionnée par mois : les requêtes par période ne lisent que les
+# partitions concernées, et l'archivage se fait en détachant une partition.
+# La clé primaire d'une table partitionnée doit contenir la clé de partition.
+CREATE_PARTITIONED_SQL = """
+CREATE TABLE app_accessevent (
+    id bigserial NOT NULL,
+    occurred_at timestamp with time zone NOT NULL,
+    actor_id bigint NULL,
+    action smallint NOT NULL CHECK (action >= 0),
+    patient_id bigint NULL,
+    record_id bigint NULL,
+    PRIMARY KEY (id, occurred_at)
+) PARTITION BY RANGE (occurred_at);
+
+CREATE INDEX access_patient_time_idx ON app_accessevent (patient_id, occurred_at);
+CREATE INDEX access_actor_time_idx ON app_accessevent (actor_id, occurred_at);
+
+-- Filet de sécurité si la partition du mois n'a pas été créée (audit_partitions).
+CREATE TABLE app_accessevent_default PARTITION OF app_accessevent DEFAULT;
+"""
+
+PARTITION_SQL = """
+CREATE TABLE IF NOT EXISTS app_accessevent_y{start:%Y}m{start:%m} PARTITION OF app_accessevent
+    FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}');
+"""
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def create_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(apps.get_model('app', 'AccessEvent'))
+        return
+    schema_editor.execute(CREATE_PARTITIONED_SQL)
+    start = date.today().replace(day=1)
+    for _ in range(3):
+        end = next_month(start)
+        schema_editor.execute(PARTITION_SQL.format(start=start, end=end))
+        start = end
+
+
+def drop_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.delete_model(apps.get_model('app', 'AccessEvent'))
+        return
+    schema_editor.execute("DROP TABLE app_accessevent CASCADE;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_statcounter'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='AccessEvent',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('occurred_at', models.DateTimeField()),
+                        ('action', models.PositiveSmallIntegerField(choices=[(1, "Consultation d'un dossier"), (2, "Consultation d'un profil patient"), (3, "Export d'un dossier")])),
+                        ('actor', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                        ('patient', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app.patientprofile')),
+                        ('record', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app.medicalrecord')),
+                    ],
+                    options={
+                        'indexes': [
+                            models.Index(fields=['patient', 'occurred_at'], name='access_patient_time_idx'),
+                            models.Index(fields=['actor', 'occurred_at'], name='access_actor_time_idx'),
+                        ],
+                    },
+                ),
+            ],
+        ),
+        # Après l'état : le modèle historique sert à créer la table hors PostgreSQL.
+        migrations.RunPython(create_table, drop_table),
+    ]
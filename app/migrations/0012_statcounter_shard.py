@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-17 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='statcounter',
+            name='stat_counter_name_key_uniq',
+        ),
+        migrations.AddField(
+            model_name='statcounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='statcounter',
+            constraint=models.UniqueConstraint(fields=('name', 'key', 'shard'), name='stat_counter_name_key_shard_uniq'),
+        ),
+    ]
@@ -1,5 +1,12 @@
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, models
+from django.db.models import F, FloatField, Q, Value
 from django.utils import timezone
 
 class User(AbstractUser):
@@ -13,6 +20,15 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=Roles.choices, default=Roles.PATIENT)
     date_of_birth = models.DateField(blank=True, null=True)
     address = models.TextField(blank=True, null=True)
+    # Entre dans les validateurs des GET conditionnels des profils et dossiers qui affichent le compte
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Filtres par rôle (permissions, admin) et pagination par clé (date_joined, id)
+            models.Index(fields=['role'], name='user_role_idx'),
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -47,9 +63,39 @@ class DoctorProfile(models.Model):
     is_available = models.BooleanField(default=True)
     bio = models.TextField(blank=True, null=True)
     
+    class Meta:
+        indexes = [
+            # Annuaire : seuls les médecins disponibles sont recherchés
+            models.Index(fields=['speciality', 'consultation_fee'], name='doctor_available_idx',
+                         condition=models.Q(is_available=True)),
+        ]
+    
     def __str__(self):
         return f"Dr. {self.user.get_full_name()} - {self.speciality}"
 
+def treated_patients(doctors, field="pk"):
+    """
+    Condition « ``field`` désigne un patient suivi par l'un des ``doctors`` »
+    (au moins un dossier rédigé, ou un rendez-vous réservé à venir ou terminé
+    depuis moins de ``APPOINTMENT_RECORD_ACCESS_DAYS`` jours).
+
+    Deux sous-requêtes ``IN`` servies par les index sur le médecin des
+    dossiers et des rendez-vous.
+    """
+    appointments = Appointment.objects.filter(
+        doctor__in=doctors, status=Appointment.Status.BOOKED,
+        end__gte=timezone.now() - timedelta(days=settings.APPOINTMENT_RECORD_ACCESS_DAYS),
+    )
+    return (
+        Q(**{f"{field}__in": MedicalRecord.objects.filter(doctor__in=doctors).values("patient")})
+        | Q(**{f"{field}__in": appointments.values("patient")})
+    )
+
+class PatientProfileQuerySet(models.QuerySet):
+    def treated_by(self, doctors):
+        """Patients suivis par l'un des ``doctors`` (identifiants ou sous-requête)."""
+        return self.filter(treated_patients(doctors))
+
 # Modèle pour les patients (extension de User)
 class PatientProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, limit_choices_to={'role': User.Roles.PATIENT})
@@ -57,14 +103,74 @@ class PatientProfile(models.Model):
     allergies = models.TextField(blank=True, null=True)
     emergency_contact = models.CharField(max_length=100, blank=True, null=True)
     emergency_phone = models.CharField(max_length=20, blank=True, null=True)
+    # Validateur des GET conditionnels (ETag / Last-Modified)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PatientProfileQuerySet.as_manager()
     
     def __str__(self):
         return f"Patient: {self.user.get_full_name()}"
 
+# Recherche plein texte sur les dossiers médicaux
+class MedicalRecordQuerySet(models.QuerySet):
+    # Contenu bilingue : chaque texte est indexé en français et en anglais,
+    # les noms (patient, médecin) avec la configuration « simple ».
+    SEARCH_CONFIGS = ("french", "english", "simple")
+    ILIKE_FIELDS = ("title", "description", "diagnosis", "treatment",
+                    "patient__user__username", "patient__user__first_name",
+                    "doctor__user__username", "doctor__user__first_name")
+
+    def search(self, terms):
+        """
+        Recherche classée par pertinence (annotation ``search_rank``).
+
+        Sous PostgreSQL, utilise la colonne ``search_vector`` (index GIN,
+        maintenue par trigger) ; ailleurs, se rabat sur ``search_ilike``.
+        """
+        if connections[self.db].vendor != "postgresql":
+            return self.search_ilike(terms)
+        query = reduce(or_, (
+            SearchQuery(terms, config=config, search_type="websearch")
+            for config in self.SEARCH_CONFIGS
+        ))
+        return self.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+
+    def visible_to(self, user):
+        """
+        Dossiers accessibles à ``user``, filtrés en SQL : le patient voit les
+        siens, le médecin ceux des patients qu'il suit (dont tous ceux qu'il a
+        rédigés), agents et superadmins voient tout.
+        """
+        role = getattr(user, "role", None)
+        if user.is_superuser or role in (User.Roles.AGENT, User.Roles.SUPERADMIN):
+            return self.all()
+        if role == User.Roles.PATIENT:
+            return self.filter(patient__in=PatientProfile.objects.filter(user_id=user.pk).values("pk"))
+        if role == User.Roles.DOCTOR:
+            return self.filter(treated_patients(DoctorProfile.objects.filter(user_id=user.pk).values("pk"), "patient"))
+        return self.none()
+
+    def search_ilike(self, terms):
+        """Ancienne recherche ``ILIKE '%terme%'`` (parcours séquentiel)."""
+        condition = Q()
+        for word in terms.split():
+            condition &= reduce(or_, (Q(**{f"{field}__icontains": word}) for field in self.ILIKE_FIELDS))
+        return self.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+class MedicalRecordManager(models.Manager.from_queryset(MedicalRecordQuerySet)):
+    def get_queryset(self):
+        # Le tsvector peut être volumineux et n'est utile qu'en SQL.
+        return super().get_queryset().defer("search_vector")
+
 # Modèle pour les dossiers médicaux
 class MedicalRecord(models.Model):
-    patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE, related_name='medical_records')
-    doctor = models.ForeignKey(DoctorProfile, on_delete=models.SET_NULL, null=True, blank=True)
+    # Index simples remplacés par les index composites (…, -record_date) ci-dessous
+    patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE, related_name='medical_records',
+                                db_index=False)
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.SET_NULL, null=True, blank=True,
+                               db_index=False)
     title = models.CharField(max_length=200)
     description = models.TextField()
     diagnosis = models.TextField(blank=True, null=True)
@@ -72,9 +178,236 @@ class MedicalRecord(models.Model):
     record_date = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintenu par trigger PostgreSQL (voir migration 0003), jamais écrit par Django.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = MedicalRecordManager()
     
     class Meta:
         ordering = ['-record_date']
+        indexes = [
+            models.Index(fields=['patient', '-record_date'], name='record_patient_date_idx'),
+            models.Index(fields=['doctor', '-record_date'], name='record_doctor_date_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.title} - {self.patient.user.get_full_name()}"
\ No newline at end of file
+        return f"{self.title} - {self.patient.user.get_full_name()}"
+
+# Jetons d'authentification de l'API (seule l'empreinte SHA-256 est stockée)
+class AuthToken(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auth_tokens')
+    key_hash = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Jeton {self.key_hash[:8]}… - {self.user.username}"
+
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+
+# File de tâches en base (opérations de masse lancées depuis l'admin)
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "En attente"
+        RUNNING = "RUNNING", "En cours"
+        SUCCEEDED = "SUCCEEDED", "Terminée"
+        FAILED = "FAILED", "Échouée"
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    # Clés primaires visées, compressées en intervalles [début, fin] inclus
+    pk_ranges = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    # Dernière clé traitée : une reprise repart de là
+    cursor = models.BigIntegerField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Prochaine tâche à exécuter
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"Tâche #{self.pk} {self.kind} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """Avancement en pourcentage."""
+        if not self.total:
+            return 100 if self.status == self.Status.SUCCEEDED else 0
+        return min(100, round(100 * self.processed / self.total))
+
+
+# Point de reprise d'un import (import_medconnect), écrit dans la transaction de chaque lot
+class ImportCheckpoint(models.Model):
+    kind = models.CharField(max_length=20)
+    path = models.CharField(max_length=500)
+    # Dernière ligne du fichier traitée (importée ou rejetée)
+    row = models.PositiveBigIntegerField(default=0)
+    # Taille du fichier de rejets à cette ligne : une reprise tronque ce qui a été écrit au-delà
+    rejects_offset = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'path'], name='import_checkpoint_kind_path_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.path} : ligne {self.row}"
+
+
+# Horaires hebdomadaires de consultation d'un médecin
+class WeeklySchedule(models.Model):
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, "Lundi"
+        TUESDAY = 1, "Mardi"
+        WEDNESDAY = 2, "Mercredi"
+        THURSDAY = 3, "Jeudi"
+        FRIDAY = 4, "Vendredi"
+        SATURDAY = 5, "Samedi"
+        SUNDAY = 6, "Dimanche"
+
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='weekly_schedules')
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    class Meta:
+        ordering = ['doctor', 'weekday', 'start_time']
+        constraints = [
+            models.CheckConstraint(check=Q(start_time__lt=F('end_time')), name='schedule_start_before_end'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+# Absences ponctuelles (congés, formation) : retirent des créneaux des horaires
+class ScheduleException(models.Model):
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='schedule_exceptions')
+    date = models.DateField()
+    # Sans heures : toute la journée
+    start_time = models.TimeField(blank=True, null=True)
+    end_time = models.TimeField(blank=True, null=True)
+    reason = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        ordering = ['doctor', 'date', 'start_time']
+        indexes = [
+            models.Index(fields=['doctor', 'date'], name='exception_doctor_date_idx'),
+        ]
+
+    def __str__(self):
+        if self.start_time is None:
+            return f"{self.date} (journée)"
+        return f"{self.date} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+# Rendez-vous pris sur un créneau
+class Appointment(models.Model):
+    class Status(models.TextChoices):
+        BOOKED = "BOOKED", "Réservé"
+        CANCELLED = "CANCELLED", "Annulé"
+
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='appointments')
+    patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE, related_name='appointments')
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.BOOKED)
+    reason = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['start']
+        constraints = [
+            # Créneaux sur une grille fixe : un même début suffit à détecter un chevauchement.
+            models.UniqueConstraint(fields=['doctor', 'start'], condition=Q(status='BOOKED'),
+                                    name='appointment_no_double_booking'),
+        ]
+        indexes = [
+            models.Index(fields=['patient', 'start'], name='appointment_patient_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.start:%Y-%m-%d %H:%M} - {self.doctor} / {self.patient}"
+
+# Index des créneaux libres : un bit par créneau de la journée (voir app/appointments.py)
+class DoctorDaySlots(models.Model):
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='day_slots')
+    date = models.DateField()
+    # Recopiés du profil pour filtrer sans jointure
+    speciality = models.ForeignKey(Speciality, on_delete=models.SET_NULL, null=True, blank=True,
+                                   db_index=False, related_name='+')
+    is_available = models.BooleanField(default=True)
+    # Bit i à 1 : créneau i libre (début à minuit + i × APPOINTMENT_SLOT_MINUTES)
+    free = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'date'], name='day_slots_doctor_date_uniq'),
+        ]
+        indexes = [
+            # Recherche des premiers créneaux libres par spécialité
+            models.Index(fields=['speciality', 'date'], name='day_slots_search_idx',
+                         condition=Q(is_available=True) & ~Q(free=0)),
+        ]
+
+    def __str__(self):
+        return f"{self.doctor_id} {self.date} ({self.free:b})"
+
+# Compteurs des statistiques (tableau de bord), tenus à jour à chaque écriture (voir app/stats.py)
+class StatCounter(models.Model):
+    name = models.CharField(max_length=50)
+    key = models.CharField(max_length=50, blank=True)
+    # Fraction du compteur : la valeur d'une clé est la somme de ses fractions
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'key', 'shard'], name='stat_counter_name_key_shard_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}[{self.key}#{self.shard}] = {self.value}"
+
+# Journal des accès aux données médicales, en ajout seul. Sous PostgreSQL, la
+# table est partitionnée par mois sur occurred_at (voir migration 0009).
+class AccessEvent(models.Model):
+    class Action(models.IntegerChoices):
+        VIEW_RECORD = 1, "Consultation d'un dossier"
+        VIEW_PATIENT = 2, "Consultation d'un profil patient"
+        EXPORT_RECORD = 3, "Export d'un dossier"
+
+    occurred_at = models.DateTimeField()
+    # Sans contrainte : insertion sans vérification, et le journal survit aux suppressions
+    actor = models.ForeignKey(User, on_delete=models.DO_NOTHING, null=True, db_constraint=False,
+                              db_index=False, related_name='+')
+    action = models.PositiveSmallIntegerField(choices=Action.choices)
+    patient = models.ForeignKey(PatientProfile, on_delete=models.DO_NOTHING, null=True, db_constraint=False,
+                                db_index=False, related_name='+')
+    record = models.ForeignKey(MedicalRecord, on_delete=models.DO_NOTHING, null=True, db_constraint=False,
+                               db_index=False, related_name='+')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'occurred_at'], name='access_patient_time_idx'),
+            models.Index(fields=['actor', 'occurred_at'], name='access_actor_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.occurred_at:%Y-%m-%d %H:%M:%S} {self.actor_id} {self.get_action_display()}"
@@ -0,0 +1,126 @@
+# app/pagination.py
+import base64
+import json
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import SimpleNamespace
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par clé (keyset) sur un tri composite et unique.
+
+    Le curseur est opaque : il encode les valeurs de tri de la dernière ligne
+    de la page. La page suivante est obtenue par ``WHERE (a, b) > (x, y)``,
+    ce qui garde un coût constant quelle que soit la profondeur de la page.
+    """
+
+    ordering = ("date_joined", "id")
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Curseur invalide."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Variante asynchrone (vues ASGI) : la page est lue avec l'ORM asynchrone."""
+        return self.set_page([row async for row in self.page_queryset(queryset, request, view)])
+
+    def page_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        ordering = getattr(view, "keyset_ordering", None) or self.ordering
+        self.fields = [field.lstrip("-") for field in ordering]
+
+        self.model = queryset.model
+        queryset = queryset.order_by(*ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.build_filter(ordering, position))
+
+        # Une ligne de plus pour savoir s'il existe une page suivante.
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def build_filter(self, ordering, position):
+        """Construit la comparaison lexicographique ``(a, b, ...) > (x, y, ...)``."""
+        condition = Q()
+        for index, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            clause = Q(**{f"{self.fields[index]}__{lookup}": position[index]})
+            for previous in range(index):
+                clause &= Q(**{self.fields[previous]: position[previous]})
+            condition |= clause
+        return condition
+
+    def encode_cursor(self, instance):
+        values = []
+        for name in self.fields:
+            field = self.model._meta.get_field(name)
+            if isinstance(instance, Mapping):
+                # Ligne issue de values() : même encodage que pour une instance.
+                values.append(field.value_to_string(SimpleNamespace(**{field.attname: instance[name]})))
+            else:
+                values.append(field.value_to_string(instance))
+        raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
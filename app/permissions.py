@@ -12,3 +12,16 @@ class IsAgentOrSuperAdmin(permissions.BasePermission):
             return False
         # Permet si role AGENT ou SUPERADMIN, ou si superuser Django
         return getattr(user, "role", None) in ("AGENT", "SUPERADMIN") or user.is_superuser
+
+
+class IsAgentOrDoctor(permissions.BasePermission):
+    """
+    Autorise agents, superadmins et médecins ; la vue restreint les objets
+    accessibles à un médecin.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return getattr(user, "role", None) in ("AGENT", "SUPERADMIN", "DOCTOR") or user.is_superuser
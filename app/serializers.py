@@ -1,26 +1,372 @@
 # app/serializers.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
 from rest_framework import serializers
-from .models import User
+from rest_framework.validators import UniqueValidator
+from . import audit
+from .instrumentation import span
+from .models import AccessEvent, Appointment, DoctorProfile, MedicalRecord, PatientProfile, User
+
+
+class TimedSerializerMixin:
+    """Mesure ``.data`` (phase ``serialize`` de l'en-tête Server-Timing)."""
+
+    @property
+    def data(self):
+        with span("serialize"):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class AuditedSerializerMixin:
+    """
+    Journalise chaque objet sérialisé pour une requête (``app/audit.py``) :
+    liste, détail, recherche ou vue asynchrone passent tous par ici.
+    """
+
+    audit_action = None
+
+    def audit_target(self, instance):
+        """Couple ``(patient_id, record_id)`` de l'objet."""
+        raise NotImplementedError
+
+    def to_representation(self, instance):
+        request = self.context.get("request")
+        if request is not None:
+            audit.record(request, self.audit_action, [self.audit_target(instance)])
+        return super().to_representation(instance)
+
+
+class SparseFieldsMixin:
+    """
+    Permet de restreindre les champs sérialisés via ``?fields=a,b,c``.
+
+    Les champs demandés sont aussi exposés par ``requested_model_fields``
+    pour que la vue puisse limiter les colonnes SQL avec ``.only()``.
+    """
+
+    fields_query_param = "fields"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.get_requested_fields(self.context.get("request"))
+        if requested is not None:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Retourne la liste des champs demandés, ou ``None`` si aucun filtre."""
+        if request is None or request.method not in ("GET", "HEAD"):
+            return None
+        raw = request.query_params.get(cls.fields_query_param)
+        if not raw:
+            return None
+        requested = [name.strip() for name in raw.split(",") if name.strip()]
+        readable = [
+            name for name in cls.Meta.fields
+            if name not in getattr(cls, "write_only_fields", ())
+        ]
+        unknown = [name for name in requested if name not in readable]
+        if unknown:
+            raise serializers.ValidationError(
+                {cls.fields_query_param: f"Champs inconnus : {', '.join(unknown)}."}
+            )
+        return requested
+
+    @classmethod
+    def requested_model_fields(cls, request):
+        """Colonnes du modèle à charger pour les champs demandés."""
+        requested = cls.get_requested_fields(request)
+        if requested is None:
+            return None
+        concrete = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        return [name for name in requested if name in concrete]
+
+
+# Champs dont la représentation DRF est la valeur lue en base, telle quelle.
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+                      serializers.ChoiceField)
+
+
+def values_fields(serializer):
+    """
+    Colonnes à lire avec ``values()`` pour reproduire ``serializer.data`` sans
+    instancier de modèles, dans l'ordre de sortie ; ``None`` si un champ exige
+    la sérialisation complète (relation, date, décimal, méthode...).
+    """
+    if type(serializer).to_representation is not serializers.Serializer.to_representation:
+        return None
+    concrete = {field.name: field for field in serializer.Meta.model._meta.concrete_fields}
+    names = []
+    for field in serializer._readable_fields:
+        model_field = concrete.get(field.source)
+        if model_field is None or model_field.is_relation or not isinstance(field, PASSTHROUGH_FIELDS):
+            return None
+        if field.source != field.field_name:
+            return None
+        if isinstance(field, serializers.ChoiceField) and not all(isinstance(key, str) for key in field.choices):
+            return None
+        names.append(field.field_name)
+    return names
+
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)
+    write_only_fields = ("password",)
 
     class Meta:
         model = User
         fields = ["id","username","email","first_name","last_name","phone","role","password","is_active"]
+        list_serializer_class = TimedListSerializer
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get("bulk"):
+            # En masse, l'unicité est vérifiée en une seule requête (voir app/bulk.py).
+            username = fields["username"]
+            username.validators = [
+                validator for validator in username.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
 
     def create(self, validated_data):
+        # Mot de passe haché avant l'INSERT : un seul aller-retour en base.
         password = validated_data.pop("password", None)
-        user = super().create(validated_data)
         if password:
-            user.set_password(password)
-            user.save()
-        return user
+            validated_data["password"] = make_password(password)
+        return super().create(validated_data)
 
     def update(self, instance, validated_data):
         password = validated_data.pop("password", None)
-        user = super().update(instance, validated_data)
         if password:
-            user.set_password(password)
-            user.save()
-        return user
+            validated_data["password"] = make_password(password)
+        return super().update(instance, validated_data)
+
+
+class AuthTokenSerializer(serializers.Serializer):
+    """Identifiants échangés contre un jeton d'API."""
+
+    username = serializers.CharField()
+    password = serializers.CharField(write_only=True, trim_whitespace=False)
+    name = serializers.CharField(required=False, allow_blank=True, max_length=100)
+
+    def validate(self, attrs):
+        with span("auth"):
+            user = authenticate(
+                self.context.get("request"),
+                username=attrs["username"],
+                password=attrs["password"],
+            )
+        if user is None:
+            raise serializers.ValidationError("Identifiants invalides.", code="authorization")
+        attrs["user"] = user
+        return attrs
+
+
+class MedicalRecordSerializer(AuditedSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    """Dossier médical avec les noms du patient et du médecin (via select_related)."""
+
+    audit_action = audit.Action.VIEW_RECORD
+
+    patient_name = serializers.CharField(source="patient.user.get_full_name", read_only=True)
+    doctor_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MedicalRecord
+        fields = ["id", "patient", "patient_name", "doctor", "doctor_name", "title",
+                  "description", "diagnosis", "treatment", "record_date",
+                  "created_at", "updated_at"]
+        read_only_fields = ["created_at", "updated_at"]
+        list_serializer_class = TimedListSerializer
+
+    def get_doctor_name(self, obj):
+        return obj.doctor.user.get_full_name() if obj.doctor else None
+
+    def audit_target(self, instance):
+        return instance.patient_id, instance.pk
+
+
+class PatientProfileSerializer(AuditedSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    """Profil patient avec les informations du compte associé."""
+
+    audit_action = audit.Action.VIEW_PATIENT
+
+    username = serializers.CharField(source="user.username", read_only=True)
+    full_name = serializers.CharField(source="user.get_full_name", read_only=True)
+    email = serializers.EmailField(source="user.email", read_only=True)
+    date_of_birth = serializers.DateField(source="user.date_of_birth", read_only=True)
+
+    class Meta:
+        model = PatientProfile
+        fields = ["id", "user", "username", "full_name", "email", "date_of_birth", "blood_type",
+                  "allergies", "emergency_contact", "emergency_phone", "updated_at"]
+        list_serializer_class = TimedListSerializer
+
+    def audit_target(self, instance):
+        return instance.pk, None
+
+
+class SummaryRecordSerializer(serializers.ModelSerializer):
+    """Dossier récent dans la synthèse d'un patient (médecin et spécialité via select_related)."""
+
+    doctor_name = serializers.SerializerMethodField()
+    speciality = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MedicalRecord
+        fields = ["id", "title", "diagnosis", "treatment", "record_date", "doctor", "doctor_name", "speciality"]
+
+    def get_doctor_name(self, obj):
+        return obj.doctor.user.get_full_name() if obj.doctor else None
+
+    def get_speciality(self, obj):
+        return obj.doctor.speciality.name if obj.doctor and obj.doctor.speciality else None
+
+
+class PatientSummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Synthèse d'un patient : identité, informations médicales, contact
+    d'urgence et derniers dossiers (``recent_records``, voir la vue).
+    """
+
+    full_name = serializers.CharField(source="user.get_full_name", read_only=True)
+    email = serializers.EmailField(source="user.email", read_only=True)
+    phone = serializers.CharField(source="user.phone", read_only=True)
+    date_of_birth = serializers.DateField(source="user.date_of_birth", read_only=True)
+    record_count = serializers.IntegerField(read_only=True)
+    recent_records = SummaryRecordSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = PatientProfile
+        fields = ["id", "full_name", "email", "phone", "date_of_birth", "blood_type", "allergies",
+                  "emergency_contact", "emergency_phone", "record_count", "recent_records"]
+
+
+class MedicalRecordSearchResultSerializer(MedicalRecordSerializer):
+    rank = serializers.FloatField(source="search_rank", read_only=True)
+
+    class Meta(MedicalRecordSerializer.Meta):
+        fields = MedicalRecordSerializer.Meta.fields + ["rank"]
+
+
+class MedicalRecordExportSerializer(serializers.Serializer):
+    """Paramètres d'export des dossiers médicaux."""
+
+    output = serializers.ChoiceField(choices=["ndjson", "csv"], default="ndjson")
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    patient = serializers.IntegerField(required=False, min_value=1)
+    doctor = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        if attrs.get("date_from") and attrs.get("date_to") and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from doit précéder date_to.")
+        return attrs
+
+
+class DoctorDirectorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Fiche publique d'un médecin dans l'annuaire."""
+
+    full_name = serializers.SerializerMethodField()
+    speciality_name = serializers.CharField(source="speciality.name", read_only=True, default=None)
+
+    class Meta:
+        model = DoctorProfile
+        fields = ["id", "full_name", "speciality", "speciality_name", "years_of_experience",
+                  "consultation_fee", "is_available", "bio"]
+        list_serializer_class = TimedListSerializer
+
+    def get_full_name(self, obj):
+        return obj.user.get_full_name() or obj.user.username
+
+
+class DoctorDirectoryFilterSerializer(serializers.Serializer):
+    """Filtres de l'annuaire, normalisés pour servir de clé de cache."""
+
+    speciality = serializers.IntegerField(required=False, min_value=1)
+    is_available = serializers.BooleanField(required=False, allow_null=True, default=None)
+    min_fee = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_fee = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    min_experience = serializers.IntegerField(required=False, min_value=0)
+    max_experience = serializers.IntegerField(required=False, min_value=0)
+
+    def to_filters(self):
+        """Paramètres validés → arguments de ``QuerySet.filter``."""
+        lookups = {
+            "speciality": "speciality_id",
+            "is_available": "is_available",
+            "min_fee": "consultation_fee__gte",
+            "max_fee": "consultation_fee__lte",
+            "min_experience": "years_of_experience__gte",
+            "max_experience": "years_of_experience__lte",
+        }
+        return {
+            lookups[name]: value
+            for name, value in self.validated_data.items()
+            if value is not None
+        }
+
+
+class AppointmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Rendez-vous ; ``patient`` est facultatif pour un patient (son propre profil)."""
+
+    doctor_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Appointment
+        fields = ["id", "doctor", "doctor_name", "patient", "start", "end", "status", "reason", "created_at"]
+        read_only_fields = ["end", "status", "created_at"]
+        extra_kwargs = {"patient": {"required": False}}
+        list_serializer_class = TimedListSerializer
+
+    def get_doctor_name(self, obj):
+        return obj.doctor.user.get_full_name() or obj.doctor.user.username
+
+
+class SlotSearchSerializer(serializers.Serializer):
+    """Paramètres de recherche des créneaux libres."""
+
+    speciality = serializers.IntegerField(required=False, min_value=1)
+    doctor = serializers.IntegerField(required=False, min_value=1)
+    days = serializers.IntegerField(required=False, default=14, min_value=1)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+    def validate_days(self, value):
+        # L'index ne couvre que APPOINTMENT_HORIZON_DAYS jours.
+        return min(value, settings.APPOINTMENT_HORIZON_DAYS)
+
+
+class AccessEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AccessEvent
+        fields = ["id", "occurred_at", "actor", "action", "patient", "record"]
+
+
+class AccessEventFilterSerializer(serializers.Serializer):
+    """Filtres du journal d'audit ; la période est toujours bornée."""
+
+    patient = serializers.IntegerField(required=False, min_value=1)
+    actor = serializers.IntegerField(required=False, min_value=1)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("since", (attrs.get("until") or timezone.now()) - timedelta(days=30))
+        if attrs.get("until") and attrs["until"] <= attrs["since"]:
+            raise serializers.ValidationError({"until": "Doit suivre « since »."})
+        return attrs
+
+    def to_filters(self):
+        lookups = {"patient": "patient_id", "actor": "actor_id", "since": "occurred_at__gte",
+                   "until": "occurred_at__lt"}
+        return {lookups[name]: value for name, value in self.validated_data.items()}
+
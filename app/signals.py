@@ -0,0 +1,168 @@
+# app/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import appointments, stats
+from .authentication import principal_cache
+from .cache import doctor_directory_cache, patient_summary_cache
+from .models import (
+    AuthToken, DoctorDaySlots, DoctorProfile, MedicalRecord, PatientProfile, ScheduleException, Speciality,
+    StatCounter, User, WeeklySchedule,
+)
+
+
+# ==============================================
+# INVALIDATION DU CACHE D'AUTHENTIFICATION
+# ==============================================
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_principals(sender, instance, **kwargs):
+    """Un changement de rôle ou de statut doit être visible immédiatement."""
+    principal_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=AuthToken)
+def invalidate_revoked_token(sender, instance, **kwargs):
+    """Un jeton supprimé (révocation, admin) ne doit plus être accepté."""
+    principal_cache.invalidate(instance.key_hash)
+
+
+# ==============================================
+# INVALIDATION DE L'ANNUAIRE DES MÉDECINS
+# ==============================================
+
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+@receiver(post_save, sender=Speciality)
+@receiver(post_delete, sender=Speciality)
+def invalidate_doctor_directory(sender, **kwargs):
+    doctor_directory_cache.bump()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_doctor_directory_for_user(sender, instance, update_fields=None, **kwargs):
+    """Seuls les comptes médecins figurent dans l'annuaire (la connexion ne compte pas)."""
+    if instance.role != User.Roles.DOCTOR or update_fields == frozenset({"last_login"}):
+        return
+    doctor_directory_cache.bump()
+
+
+# ==============================================
+# INVALIDATION DES SYNTHÈSES PATIENTS
+# ==============================================
+
+@receiver(post_save, sender=MedicalRecord)
+@receiver(post_delete, sender=MedicalRecord)
+def invalidate_record_patient_summary(sender, instance, **kwargs):
+    """Un dossier déplacé invalide aussi la synthèse de son ancien patient (voir ``remember_counted_fields``)."""
+    previous = getattr(instance, "_stats_previous", None)
+    patient_summary_cache.invalidate(instance.patient_id, previous[0] if previous else None)
+
+
+@receiver(post_save, sender=PatientProfile)
+@receiver(post_delete, sender=PatientProfile)
+def invalidate_patient_summary(sender, instance, **kwargs):
+    patient_summary_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_patient_summary_for_user(sender, instance, update_fields=None, **kwargs):
+    if instance.role != User.Roles.PATIENT or update_fields == frozenset({"last_login"}):
+        return
+    patient_summary_cache.invalidate(
+        *PatientProfile.objects.filter(user=instance).values_list("pk", flat=True)
+    )
+
+
+# ==============================================
+# INDEX DES CRÉNEAUX DE RENDEZ-VOUS
+# ==============================================
+
+@receiver(post_save, sender=WeeklySchedule)
+@receiver(post_delete, sender=WeeklySchedule)
+@receiver(post_save, sender=ScheduleException)
+@receiver(post_delete, sender=ScheduleException)
+def rebuild_doctor_slots(sender, instance, **kwargs):
+    """Horaires ou absences modifiés : l'index du médecin est recalculé sur tout l'horizon."""
+    appointments.rebuild(doctors=[instance.doctor_id])
+
+
+@receiver(post_save, sender=DoctorProfile)
+def sync_doctor_slots(sender, instance, created, **kwargs):
+    """Spécialité et disponibilité sont recopiées dans l'index."""
+    if not created:
+        DoctorDaySlots.objects.filter(doctor=instance).update(
+            speciality=instance.speciality_id, is_available=instance.is_available,
+        )
+
+
+# ==============================================
+# COMPTEURS DES STATISTIQUES
+# ==============================================
+
+# Champs dont dépendent les compteurs, par modèle
+STAT_FIELDS = {
+    User: ("role",),
+    DoctorProfile: ("speciality_id",),
+    MedicalRecord: ("patient_id", "record_date"),
+}
+
+
+def stat_deltas(sender, values, sign):
+    if sender is User:
+        return stats.user_deltas([values[0]], sign)
+    if sender is DoctorProfile:
+        return stats.doctor_deltas([values[0]], sign)
+    return stats.record_deltas([values], sign)
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=DoctorProfile)
+@receiver(pre_save, sender=MedicalRecord)
+def remember_counted_fields(sender, instance, using, update_fields=None, **kwargs):
+    """Valeurs en base avant une modification (une requête, sauf si ``update_fields`` les exclut)."""
+    fields = STAT_FIELDS[sender]
+    instance._stats_previous = None
+    if instance._state.adding or (update_fields is not None and not set(fields) & set(update_fields)):
+        return
+    instance._stats_previous = sender._base_manager.using(using).filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_save, sender=MedicalRecord)
+def count_saved(sender, instance, created, using, **kwargs):
+    current = tuple(getattr(instance, field) for field in STAT_FIELDS[sender])
+    previous = getattr(instance, "_stats_previous", None)
+    if created:
+        stats.apply(stat_deltas(sender, current, 1), using=using)
+    elif previous is not None and previous != current:
+        deltas = stat_deltas(sender, previous, -1)
+        deltas.update(stat_deltas(sender, current, 1))
+        stats.apply(deltas, using=using)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=DoctorProfile)
+@receiver(post_delete, sender=MedicalRecord)
+def count_deleted(sender, instance, using, **kwargs):
+    current = tuple(getattr(instance, field) for field in STAT_FIELDS[sender])
+    stats.apply(stat_deltas(sender, current, -1), using=using)
+
+
+@receiver(post_delete, sender=PatientProfile)
+def drop_patient_counter(sender, instance, using, **kwargs):
+    # Ses dossiers ont été décomptés un à un (cascade) : la ligne est à zéro.
+    StatCounter.objects.using(using).filter(name=stats.RECORDS_BY_PATIENT, key=str(instance.pk)).delete()
+
+
+@receiver(post_delete, sender=Speciality)
+def move_speciality_counter(sender, instance, using, **kwargs):
+    """Les médecins passent « sans spécialité » par un UPDATE SQL (SET_NULL), sans signal."""
+    key = str(instance.pk)
+    count = stats.value(stats.DOCTORS_BY_SPECIALITY, key, using=using)
+    stats.apply({(stats.DOCTORS_BY_SPECIALITY, key): -count,
+                 (stats.DOCTORS_BY_SPECIALITY, stats.NONE_KEY): count}, using=using)
+
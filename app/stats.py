@@ -0,0 +1,173 @@
+# app/stats.py
+import contextlib
+import contextvars
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import CharField, Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import DoctorProfile, MedicalRecord, StatCounter, User
+
+USERS_BY_ROLE = "users.role"
+DOCTORS_BY_SPECIALITY = "doctors.speciality"
+RECORDS_BY_PATIENT = "records.patient"
+RECORDS_BY_MONTH = "records.month"
+
+# Statistiques à peu de clés, réparties sur plusieurs lignes (voir ``shard_for``)
+SHARDED = {USERS_BY_ROLE, DOCTORS_BY_SPECIALITY, RECORDS_BY_MONTH}
+
+# Clé des médecins sans spécialité
+NONE_KEY = ""
+
+# Signaux ignorés pendant une opération suivie d'un ``reconcile`` (voir ``suspended``).
+_suspended = contextvars.ContextVar("medconnect_stats_suspended", default=False)
+
+
+def month_key(value):
+    return f"{timezone.localtime(value):%Y-%m}" if timezone.is_aware(value) else f"{value:%Y-%m}"
+
+
+def user_deltas(roles, sign=1):
+    return Counter({(USERS_BY_ROLE, role): sign * count for role, count in Counter(roles).items()})
+
+
+def doctor_deltas(speciality_ids, sign=1):
+    keys = (NONE_KEY if pk is None else str(pk) for pk in speciality_ids)
+    return Counter({(DOCTORS_BY_SPECIALITY, key): sign * count for key, count in Counter(keys).items()})
+
+
+def record_deltas(records, sign=1):
+    """``records`` : couples ``(patient_id, record_date)``."""
+    deltas = Counter()
+    for patient_id, record_date in records:
+        deltas[(RECORDS_BY_PATIENT, str(patient_id))] += sign
+        deltas[(RECORDS_BY_MONTH, month_key(record_date))] += sign
+    return deltas
+
+
+def shard_for(name):
+    """
+    Ligne du compteur modifiée par cette écriture.
+
+    Les statistiques à peu de clés (rôles, spécialités, mois courant) sont
+    touchées par presque chaque insertion : réparties sur
+    ``STAT_COUNTER_SHARDS`` lignes sommées à la lecture, les transactions
+    concurrentes ne s'attendent plus sur un même verrou de ligne.
+    """
+    if name not in SHARDED:
+        return 0
+    return random.randrange(settings.STAT_COUNTER_SHARDS)
+
+
+def apply(deltas, using=DEFAULT_DB_ALIAS):
+    """
+    Ajoute ``deltas`` (``{(nom, clé): delta}``) aux compteurs, dans la
+    transaction de l'écriture qui les motive.
+
+    ``UPDATE ... SET value = value + delta`` : pas de lecture préalable, et les
+    lignes sont toujours modifiées dans le même ordre (pas d'interblocage :
+    une seule ligne par clé et par transaction).
+    """
+    if _suspended.get():
+        return
+    counters = StatCounter.objects.using(using)
+    for (name, key), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        shard = shard_for(name)
+        if counters.filter(name=name, key=key, shard=shard).update(value=F("value") + delta):
+            continue
+        try:
+            with transaction.atomic(using=using):
+                counters.create(name=name, key=key, shard=shard, value=delta)
+        except IntegrityError:
+            # Créé entre-temps par une transaction concurrente.
+            counters.filter(name=name, key=key, shard=shard).update(value=F("value") + delta)
+
+
+@contextlib.contextmanager
+def suspended():
+    """Suspend la mise à jour des compteurs (suppressions massives), à faire suivre d'un ``reconcile``."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def totals(counters):
+    """Lignes ``(nom, clé, valeur)`` de ``counters``, fractions sommées."""
+    return counters.values_list("name", "key").annotate(total=Sum("value")).exclude(total=0).order_by()
+
+
+def read(name, using=DEFAULT_DB_ALIAS):
+    """Compteurs ``{clé: valeur}`` d'une statistique (une requête sur l'index unique)."""
+    return {key: total for _, key, total in totals(StatCounter.objects.using(using).filter(name=name))}
+
+
+def value(name, key, using=DEFAULT_DB_ALIAS):
+    return StatCounter.objects.using(using).filter(name=name, key=str(key)).aggregate(
+        total=Sum("value"))["total"] or 0
+
+
+def counter_subquery(name, outer="pk"):
+    """Valeur du compteur dont la clé est ``outer`` de la ligne courante (0 si absent)."""
+    counters = StatCounter.objects.filter(name=name, key=Cast(OuterRef(outer), output_field=CharField()))
+    total = counters.order_by().values("key").annotate(total=Sum("value")).values("total")
+    return Coalesce(Subquery(total[:1]), Value(0))
+
+
+def compute(name, using=DEFAULT_DB_ALIAS):
+    """Valeurs exactes, recalculées par ``GROUP BY``."""
+    if name == USERS_BY_ROLE:
+        rows = User.objects.using(using).values_list("role").annotate(n=Count("id")).order_by()
+        return {role: n for role, n in rows}
+    if name == DOCTORS_BY_SPECIALITY:
+        rows = DoctorProfile.objects.using(using).values_list("speciality").annotate(n=Count("id")).order_by()
+        return {NONE_KEY if pk is None else str(pk): n for pk, n in rows}
+    if name == RECORDS_BY_PATIENT:
+        rows = MedicalRecord.objects.using(using).values_list("patient").annotate(n=Count("id")).order_by()
+        return {str(pk): n for pk, n in rows}
+    if name == RECORDS_BY_MONTH:
+        rows = (MedicalRecord.objects.using(using).annotate(month=TruncMonth("record_date"))
+                .values_list("month").annotate(n=Count("id")).order_by())
+        return {month_key(month): n for month, n in rows}
+    raise ValueError(f"Statistique inconnue : {name}")
+
+
+NAMES = (USERS_BY_ROLE, DOCTORS_BY_SPECIALITY, RECORDS_BY_PATIENT, RECORDS_BY_MONTH)
+
+
+def reconcile(names=NAMES, using=DEFAULT_DB_ALIAS):
+    """
+    Remet les compteurs en accord avec les tables ; retourne les écarts
+    corrigés ``{nom: {clé: (stocké, réel)}}``.
+
+    Les compteurs existants sont verrouillés avant le recalcul : une écriture
+    concurrente attend la fin de la réconciliation puis s'y ajoute.
+    """
+    drift = {}
+    counters = StatCounter.objects.using(using)
+    for name in names:
+        with transaction.atomic(using=using):
+            stored = Counter()
+            for key, count in counters.select_for_update().filter(name=name).values_list("key", "value"):
+                stored[key] += count
+            actual = compute(name, using)
+            changed = {
+                key: (stored.get(key, 0), actual.get(key, 0))
+                for key in stored.keys() | actual.keys()
+                if stored.get(key, 0) != actual.get(key, 0)
+            }
+            for key, (_, real) in changed.items():
+                # Valeur exacte regroupée sur la fraction 0.
+                counters.filter(name=name, key=key).delete()
+                counters.create(name=name, key=key, shard=0, value=real)
+            counters.filter(name=name, value=0).delete()
+        if changed:
+            drift[name] = changed
+    return drift
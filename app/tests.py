@@ -1,3 +1,1383 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+from datetime import time, timedelta
+from io import StringIO
+from unittest import skipUnless
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import appointments, audit, bulk as bulk_module, checks, db_router, exports, hashing, instrumentation, jobs, stats, views
+from .authentication import TokenAuthentication, hash_token, issue_token, principal_cache, revoke_token
+from .benchmarks import (
+    SCENARIOS, compare, delete_dataset, generate_dataset, import_packages, measure_startup, parse_importtime, percentile,
+    run_scenario,
+)
+from .models import AccessEvent, Appointment, AuthToken, DoctorDaySlots, ImportCheckpoint, Job, ScheduleException, StatCounter, WeeklySchedule, User, Speciality, DoctorProfile, PatientProfile, MedicalRecord
+
+# Journal d'audit coupé hors des tests qui l'activent : rien ne doit rester dans
+# le tampon, écrit à la sortie du processus, après la suppression de la base de test.
+audit_disabled = override_settings(AUDIT_ENABLED=False)
+
+
+def setUpModule():
+    audit_disabled.enable()
+
+
+def tearDownModule():
+    audit_disabled.disable()
+    audit.buffer.discard()
+
+
+class AdminChangelistQueryBudgetTests(TestCase):
+    """
+    Chaque page de liste de l'admin doit coûter un nombre fixe de requêtes,
+    indépendant du nombre de lignes affichées (pas de N+1).
+    """
+
+    # Requêtes maximales par page (session, utilisateur, comptages, lignes, filtres).
+    budgets = {
+        "user": 5,
+        "speciality": 5,
+        "doctorprofile": 7,
+        "patientprofile": 6,
+        "medicalrecord": 8,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "motdepasse")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def seed(self, count, offset=0):
+        """Crée ``count`` spécialités, médecins, patients et dossiers."""
+        for i in range(offset, offset + count):
+            speciality = Speciality.objects.create(name=f"Spécialité {i}")
+            doctor = DoctorProfile.objects.create(
+                user=User.objects.create(username=f"doc{i}", last_name=f"Doc{i}",
+                                         role=User.Roles.DOCTOR),
+                speciality=speciality,
+                license_number=f"LIC-{i}",
+            )
+            patient = PatientProfile.objects.create(
+                user=User.objects.create(username=f"pat{i}", last_name=f"Pat{i}"),
+            )
+            MedicalRecord.objects.create(patient=patient, doctor=doctor,
+                                         title=f"Consultation {i}", description="-")
+            MedicalRecord.objects.create(patient=patient, title=f"Bilan {i}", description="-")
+
+    def count_queries(self, model_name, params=""):
+        url = reverse(f"admin:app_{model_name}_changelist") + params
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_changelists_stay_within_budget(self):
+        self.seed(3)
+        small = {name: self.count_queries(name) for name in self.budgets}
+        self.seed(12, offset=3)
+        for name, budget in self.budgets.items():
+            with self.subTest(changelist=name):
+                queries = self.count_queries(name)
+                self.assertEqual(queries, small[name], "le nombre de requêtes dépend du nombre de lignes")
+                self.assertLessEqual(queries, budget)
+
+    def test_sorting_by_annotated_columns(self):
+        self.seed(5)
+        # Tri sur les colonnes calculées : o=2 → doctor_count, o=5 → medical_record_count.
+        self.assertLessEqual(self.count_queries("speciality", "?o=2"), self.budgets["speciality"])
+        self.assertLessEqual(self.count_queries("patientprofile", "?o=5"), self.budgets["patientprofile"])
+
+
+class IndexUsageTests(TestCase):
+    """
+    Les chemins d'accès critiques doivent pouvoir être servis par un index.
+
+    Sous PostgreSQL, les parcours séquentiels sont désactivés pendant le test :
+    si le plan contient encore un « Seq Scan », aucun index n'est utilisable.
+    Sous SQLite, un « SCAN » sans index trahit la même régression.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.speciality = Speciality.objects.create(name="Cardiologie")
+        cls.doctor = DoctorProfile.objects.create(
+            user=User.objects.create(username="doc", role=User.Roles.DOCTOR),
+            speciality=cls.speciality,
+            license_number="LIC-1",
+        )
+        cls.patient = PatientProfile.objects.create(user=User.objects.create(username="pat"))
+        for i in range(20):
+            User.objects.create(username=f"user{i}", role=User.Roles.AGENT if i % 5 else User.Roles.PATIENT)
+            MedicalRecord.objects.create(patient=cls.patient, doctor=cls.doctor,
+                                         title=f"Consultation {i}", description="-")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == "postgresql":
+            self.assertNotIn("Seq Scan", plan, plan)
+        else:
+            for line in plan.splitlines():
+                if " SCAN " in f" {line} ":
+                    self.assertIn("INDEX", line, plan)
+
+    def test_records_by_patient(self):
+        self.assertUsesIndex(MedicalRecord.objects.filter(patient=self.patient).order_by("-record_date")[:30])
+
+    def test_records_by_doctor(self):
+        self.assertUsesIndex(MedicalRecord.objects.filter(doctor=self.doctor).order_by("-record_date")[:30])
+
+    def test_records_visible_to_each_role(self):
+        for user in (self.patient.user, self.doctor.user):
+            self.assertUsesIndex(MedicalRecord.objects.visible_to(user).order_by("-record_date", "-id")[:51])
+
+    def test_users_by_role(self):
+        self.assertUsesIndex(User.objects.filter(role=User.Roles.AGENT))
+
+    def test_users_keyset_page(self):
+        first = User.objects.order_by("date_joined", "id").first()
+        self.assertUsesIndex(
+            User.objects.filter(date_joined__gte=first.date_joined).order_by("date_joined", "id")[:50]
+        )
+
+    def test_available_doctors_by_speciality(self):
+        self.assertUsesIndex(
+            DoctorProfile.objects.filter(is_available=True, speciality=self.speciality)
+            .order_by("consultation_fee")
+        )
+
+
+class BenchmarkHarnessTests(TestCase):
+    """Le jeu de données synthétique et la comparaison aux références."""
+
+    def snapshot(self):
+        return (
+            list(User.objects.filter(username__startswith="bench-").order_by("username")
+                 .values_list("username", "role", "first_name", "last_name", "date_joined")),
+            list(MedicalRecord.objects.filter(patient__user__username__startswith="bench-")
+                 .order_by("patient__user__username", "record_date", "title")
+                 .values_list("patient__user__username", "doctor__user__username", "title", "record_date")),
+        )
+
+    def test_dataset_is_reproducible(self):
+        counts = generate_dataset(users=60, records_per_patient=2, seed=7)
+        first = self.snapshot()
+        self.assertEqual(counts["users"], 60)
+        self.assertEqual(counts["records"], counts["patients"] * 2)
+        delete_dataset()
+        generate_dataset(users=60, records_per_patient=2, seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def test_api_scenarios_revoke_their_token(self):
+        generate_dataset(users=30, records_per_patient=1, seed=7)
+        result = run_scenario(SCENARIOS["api.users.list"](DEFAULT_DB_ALIAS), iterations=2, warmup=1)
+        self.assertEqual(result["iterations"], 2)
+        self.assertFalse(AuthToken.objects.exists())
+        scenario = SCENARIOS["api.users.list"](DEFAULT_DB_ALIAS)
+        scenario.url = "/api/inconnue/"
+        with self.assertRaises(AssertionError):
+            run_scenario(scenario, iterations=1, warmup=0)
+        self.assertFalse(AuthToken.objects.exists())
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 50.5)
+        self.assertAlmostEqual(percentile(values, 0.99), 99.01)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"api.users.list": {"p95_ms": 10.0, "queries": 2}}
+        self.assertEqual(compare({"api.users.list": {"p95_ms": 12.0, "queries": 2}}, baseline, 0.25), [])
+        regressions = compare({"api.users.list": {"p95_ms": 13.0, "queries": 3}}, baseline, 0.25)
+        self.assertEqual(len(regressions), 2)
+
+
+@override_settings(REPLICA_DATABASES=["replica1"], REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTests(TestCase):
+    """Choix de la base par ``ReplicaRouter`` selon la requête en cours."""
+
+    def setUp(self):
+        cache.clear()
+        healthy = mock.patch.object(db_router.health, "is_healthy", return_value=True)
+        self.is_healthy = healthy.start()
+        self.addCleanup(healthy.stop)
+
+    def route(self, method, path, read=User, write=False, **headers):
+        """Exécute la requête à travers le middleware ; retourne la base de lecture choisie."""
+        request = RequestFactory().generic(method, path, **headers)
+        request.resolver_match = resolve(path)
+        middleware = db_router.ReplicaRoutingMiddleware(None)
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, None, (), {})
+            if write:
+                router.db_for_write(User)
+            seen["db"] = router.db_for_read(read)
+            return HttpResponse()
+
+        middleware.get_response = get_response
+        seen["response"] = middleware(request)
+        return seen["db"]
+
+    def test_outside_requests_use_primary(self):
+        self.assertEqual(router.db_for_read(User), DEFAULT_DB_ALIAS)
+
+    def test_safe_reads_on_listed_routes_use_replica(self):
+        self.assertEqual(self.route("GET", "/api/users/"), "replica1")
+        self.assertEqual(self.route("GET", "/api/medical-records/"), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.route("GET", "/api/users/", read=AuthToken), DEFAULT_DB_ALIAS)
+
+    def test_writes_pin_the_caller_to_primary(self):
+        self.assertEqual(self.route("GET", "/api/users/", HTTP_AUTHORIZATION="Bearer a"), "replica1")
+        self.assertEqual(self.route("POST", "/api/users/", HTTP_AUTHORIZATION="Bearer a"), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.route("GET", "/api/users/", HTTP_AUTHORIZATION="Bearer a"), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.route("GET", "/api/users/", HTTP_AUTHORIZATION="Bearer b"), "replica1")
+
+    def test_reads_after_a_write_in_the_same_request_use_primary(self):
+        self.assertEqual(self.route("GET", "/api/users/", write=True), DEFAULT_DB_ALIAS)
+
+    def test_unhealthy_replicas_fail_over_to_primary(self):
+        self.is_healthy.return_value = False
+        self.assertEqual(self.route("GET", "/api/users/"), DEFAULT_DB_ALIAS)
+
+    def test_health_check(self):
+        self.assertEqual(db_router.health.check(DEFAULT_DB_ALIAS), (True, 0.0))
+        with self.assertLogs("app.db_router", "WARNING"):
+            self.assertEqual(db_router.health.check("missing"), (False, None))
+
+
+class AsyncViewTests(TestCase):
+    """Les vues ASGI renvoient les mêmes données que les viewsets DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(users=40, records_per_patient=2, seed=3)
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        cls.patient = User.objects.create(username="patient")
+
+    def get(self, path, user=None):
+        headers = {}
+        if user is not None:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {issue_token(user, 'test')[1]}"
+        return self.client.get(path, **headers)
+
+    def test_same_payload_as_sync_views(self):
+        record = MedicalRecord.objects.first()
+        for path in ("users/?page_size=10", "users/?fields=id,username", f"users/{self.agent.pk}/",
+                     "medical-records/", f"medical-records/{record.pk}/", "doctors/"):
+            with self.subTest(path=path):
+                sync = self.get(f"/api/{path}", self.agent)
+                native = self.get(f"/api/async/{path}", self.agent)
+                self.assertEqual(native.status_code, 200)
+                expected, actual = sync.json(), native.json()
+                if "next" in expected:
+                    # Les liens « next » diffèrent par le chemin, pas par le curseur.
+                    self.assertEqual(bool(expected.pop("next")), bool(actual.pop("next")))
+                self.assertEqual(actual, expected)
+
+    def test_authentication_and_permissions(self):
+        self.assertEqual(self.get("/api/async/users/").status_code, 401)
+        self.assertEqual(self.get("/api/async/users/", self.patient).status_code, 403)
+        self.assertEqual(self.get("/api/async/doctors/").status_code, 200)
+        self.assertEqual(self.get("/api/async/users/0/", self.agent).status_code, 404)
+
+
+class UserListValuesPathTests(TestCase):
+    """La liste des utilisateurs lue par ``values()`` rend les mêmes octets que le sérialiseur."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        names = ["Zoé", "O\'Brien \"Junior\"", "tab\tnl\nctl\x01", "ligne\u2028para\u2029", "😀 ünïcødé", "a/b\\c"]
+        for i, name in enumerate(names):
+            User.objects.create(username=f"user{i}", first_name=name, last_name=name[::-1],
+                                phone=None if i % 2 else "+221 77 000", is_active=bool(i % 3))
+
+    def setUp(self):
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+
+    def fetch(self, params, fast=True):
+        # Sans colonnes compatibles, la vue repasse par UserSerializer.
+        with mock.patch("app.views.values_fields", wraps=views.values_fields if fast else lambda serializer: None):
+            response = self.client.get(f"/api/users/{params}", **self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_same_bytes_as_serializer(self):
+        for params in ("", "?page_size=3", "?fields=username,first_name", "?fields=id,is_active,role&page_size=2"):
+            with self.subTest(params=params):
+                fast, slow = self.fetch(params), self.fetch(params, fast=False)
+                self.assertEqual(fast.content, slow.content)
+                self.assertEqual(fast["Content-Type"], slow["Content-Type"])
+
+    def test_same_bytes_without_orjson(self):
+        with mock.patch("app.fastjson.orjson", None):
+            self.assertEqual(self.fetch("").content, self.fetch("", fast=False).content)
+
+    def test_pages_follow_the_same_cursor(self):
+        fast = self.fetch("?page_size=2").json()["next"]
+        self.assertEqual(self.client.get(fast, **self.headers).content,
+                         self.fetch(fast.split("/api/users/")[1], fast=False).content)
+
+
+@override_settings(JOB_CHUNK_SIZE=4, JOB_INLINE_THRESHOLD=5, JOB_MAX_ATTEMPTS=2)
+class BackgroundJobTests(TestCase):
+    """Actions de masse de l'admin : immédiates ou en tâche traitée par lots."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "motdepasse")
+        User.objects.bulk_create(User(username=f"user{i}", role=User.Roles.PATIENT) for i in range(10))
+        cls.users = User.objects.filter(username__startswith="user")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def action(self, name, queryset):
+        return self.client.post("/admin/app/user/", {
+            "action": name, "_selected_action": list(queryset.values_list("pk", flat=True)),
+        }, follow=True)
+
+    def test_pk_ranges(self):
+        self.assertEqual(jobs.pk_ranges([1, 2, 3, 7, 9, 10]), [[1, 3], [7, 7], [9, 10]])
+        self.assertEqual(jobs.pk_ranges([]), [])
+
+    def test_chunks_group_scattered_keys(self):
+        job = Job(pk_ranges=[[1, 1], [3, 3], [5, 9], [12, 12]], cursor=None)
+        self.assertEqual(list(jobs.chunks(job, 4)), [[(1, 1), (3, 3), (5, 6)], [(7, 9), (12, 12)]])
+        job.cursor = 6
+        self.assertEqual(list(jobs.chunks(job, 4)), [[(7, 9), (12, 12)]])
+
+    def test_scattered_selection_is_batched(self):
+        scattered = self.users.order_by("pk")[::2]
+        job = jobs.enqueue("users.update", User.objects.filter(pk__in=[u.pk for u in scattered]),
+                           {"values": {"is_active": False}})
+        self.assertEqual((len(job.pk_ranges), job.total), (5, 5))
+        with CaptureQueriesContext(connection) as queries:
+            job = jobs.run_job(jobs.claim_job())
+        updates = [q for q in queries.captured_queries if q["sql"].startswith('UPDATE "app_user"')]
+        self.assertEqual((len(updates), job.processed), (2, 5))
+        self.assertEqual(set(self.users.filter(is_active=False)), set(scattered))
+
+    def test_small_selection_runs_inline(self):
+        self.action("deactivate_users", self.users[:3])
+        self.assertEqual(self.users.filter(is_active=False).count(), 3)
+        self.assertFalse(Job.objects.exists())
+
+    def test_large_selection_is_enqueued_and_processed_in_chunks(self):
+        self.action("make_agents", self.users)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.total, job.created_by), (Job.Status.PENDING, 10, self.admin))
+        self.assertFalse(self.users.filter(role=User.Roles.AGENT).exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            job = jobs.run_job(jobs.claim_job())
+        updates = [q for q in queries.captured_queries if q["sql"].startswith('UPDATE "app_user"')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual((job.status, job.processed), (Job.Status.SUCCEEDED, 10))
+        self.assertEqual(self.users.filter(role=User.Roles.AGENT).count(), 10)
+        self.assertIsNone(jobs.claim_job())
+
+    def test_interrupted_job_resumes_after_last_chunk(self):
+        job = jobs.enqueue("users.update", self.users, {"values": {"is_active": False}})
+        calls = iter([False, True])
+        job = jobs.run_job(jobs.claim_job(), should_stop=lambda: next(calls))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (Job.Status.PENDING, 4))
+        self.assertEqual(self.users.filter(is_active=False).count(), 4)
+
+        job = jobs.run_job(jobs.claim_job())
+        self.assertEqual((job.status, job.processed), (Job.Status.SUCCEEDED, 10))
+        self.assertEqual(self.users.filter(is_active=False).count(), 10)
+
+    def test_stale_running_job_is_reclaimed(self):
+        job = jobs.enqueue("users.update", self.users, {"values": {"is_active": False}})
+        self.assertEqual(jobs.claim_job().pk, job.pk)
+        self.assertIsNone(jobs.claim_job())
+        with override_settings(JOB_STALE_SECONDS=-1):
+            self.assertEqual(jobs.claim_job().pk, job.pk)
+
+    def test_failures_are_retried_then_marked_failed(self):
+        jobs.enqueue("users.update", self.users, {"values": {"no_such_field": 1}})
+        job = jobs.run_job(jobs.claim_job())
+        self.assertEqual((job.status, job.attempts), (Job.Status.PENDING, 1))
+        self.assertIn("no_such_field", job.last_error)
+        # Délai avant nouvelle tentative.
+        self.assertIsNone(jobs.claim_job())
+        Job.objects.update(run_after=job.created_at)
+        job = jobs.run_job(jobs.claim_job())
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+        response = self.client.post("/admin/app/job/", {"action": "retry_jobs", "_selected_action": [job.pk]})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(jobs.claim_job().pk, job.pk)
+
+
+@override_settings(APPOINTMENT_SLOT_MINUTES=30, APPOINTMENT_HORIZON_DAYS=21)
+class AppointmentSlotTests(TestCase):
+    """Index des créneaux libres et réservation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cardio, derma = Speciality.objects.create(name="Cardiologie"), Speciality.objects.create(name="Dermatologie")
+        cls.doctors = []
+        for i, speciality in enumerate((cardio, cardio, derma)):
+            user = User.objects.create(username=f"doc{i}", role=User.Roles.DOCTOR)
+            doctor = DoctorProfile.objects.create(user=user, speciality=speciality, license_number=f"L{i}")
+            # Lundi 9 h - 11 h ; le second médecin commence à 10 h.
+            WeeklySchedule.objects.create(doctor=doctor, weekday=0, start_time=time(9 + (i == 1)),
+                                          end_time=time(11))
+            cls.doctors.append(doctor)
+        cls.cardio = cardio
+        cls.patient_user = User.objects.create(username="patient", role=User.Roles.PATIENT)
+        cls.patient = PatientProfile.objects.create(user=cls.patient_user)
+        today = timezone.localdate()
+        cls.monday = today + timedelta(days=7 - today.weekday())
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(timezone.datetime.combine(self.monday, time(hour, minute)))
+
+    def test_masks(self):
+        self.assertEqual(appointments.range_mask(time(9), time(10, 15)), 0b11 << 18)
+        self.assertEqual(appointments.day_mask([(time(9), time(11))], [(time(9, 45), time(10))], [21]),
+                         0b101 << 18)
+        self.assertEqual(appointments.day_mask([(time(9), time(11))], [(None, None)], []), 0)
+
+    def test_first_free_slots_by_speciality(self):
+        with self.assertNumQueries(1):
+            found = appointments.free_slots(speciality=self.cardio.pk, days=14, limit=3)
+        self.assertEqual(found, [(self.at(9), self.doctors[0].pk), (self.at(9, 30), self.doctors[0].pk),
+                                 (self.at(10), self.doctors[0].pk)])
+        # Un seul lundi sur sept jours : 4 + 2 créneaux.
+        found = appointments.free_slots(speciality=self.cardio.pk, days=7, limit=8)
+        self.assertEqual(len(found), 6)
+        self.assertEqual([start for start, _ in found], sorted(start for start, _ in found))
+
+    def test_index_follows_schedule_changes(self):
+        ScheduleException.objects.create(doctor=self.doctors[0], date=self.monday)
+        self.assertEqual(appointments.free_slots(doctor=self.doctors[0].pk, days=7), [])
+        ScheduleException.objects.all().delete()
+        self.assertEqual(len(appointments.free_slots(doctor=self.doctors[0].pk, days=7)), 4)
+        self.doctors[0].is_available = False
+        self.doctors[0].save()
+        self.assertEqual(appointments.free_slots(doctor=self.doctors[0].pk), [])
+
+    def test_booking_and_cancellation(self):
+        doctor = self.doctors[0]
+        appointment = appointments.book(doctor, self.patient, self.at(9, 30))
+        self.assertEqual(appointment.end, self.at(10))
+        self.assertNotIn((self.at(9, 30), doctor.pk), appointments.free_slots(doctor=doctor.pk))
+        for start in (self.at(9, 30), self.at(9, 10), self.at(12)):
+            with self.subTest(start=start), self.assertRaises(appointments.SlotUnavailable):
+                appointments.book(doctor, self.patient, start)
+
+        # Index en retard : la contrainte d'unicité empêche encore la double réservation.
+        DoctorDaySlots.objects.filter(doctor=doctor).update(free=-1 ^ (-1 << 62))
+        with self.assertRaises(appointments.SlotUnavailable):
+            appointments.book(doctor, self.patient, self.at(9, 30))
+        appointments.rebuild(doctors=[doctor.pk])
+
+        appointments.cancel(appointment)
+        self.assertIn((self.at(9, 30), doctor.pk), appointments.free_slots(doctor=doctor.pk))
+        self.assertEqual(Appointment.objects.get().status, Appointment.Status.CANCELLED)
+
+    def test_api(self):
+        slots = self.client.get(f"/api/appointments/slots/?speciality={self.cardio.pk}&limit=2").json()
+        self.assertEqual([slot["doctor"] for slot in slots["results"]], [self.doctors[0].pk] * 2)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.patient_user, 'test')[1]}"}
+        payload = {"doctor": self.doctors[0].pk, "start": slots["results"][0]["start"]}
+        self.assertEqual(self.client.post("/api/appointments/", payload, **headers).status_code, 201)
+        self.assertEqual(self.client.post("/api/appointments/", payload, **headers).status_code, 409)
+        self.assertEqual(len(self.client.get("/api/appointments/", **headers).json()["results"]), 1)
+
+
+@override_settings(JOB_INLINE_THRESHOLD=2, JOB_CHUNK_SIZE=2)
+class StatCounterTests(TestCase):
+    """Les compteurs suivent toutes les voies d'écriture sans recalcul."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT, is_staff=True, is_superuser=True)
+        cls.speciality = Speciality.objects.create(name="Cardiologie")
+        cls.doctor = DoctorProfile.objects.create(
+            user=User.objects.create(username="doc", role=User.Roles.DOCTOR),
+            speciality=cls.speciality, license_number="L1",
+        )
+        cls.patients = [PatientProfile.objects.create(user=User.objects.create(username=f"pat{i}"))
+                        for i in range(4)]
+        for i, patient in enumerate(cls.patients):
+            MedicalRecord.objects.create(patient=patient, doctor=cls.doctor, title="Bilan", description="-",
+                                         record_date=timezone.datetime(2025, 1 + i % 2, 10, tzinfo=timezone.utc))
+
+    def assertInSync(self):
+        self.assertEqual(stats.reconcile(), {})
+
+    def test_saves_and_deletes(self):
+        self.assertEqual(stats.read(stats.USERS_BY_ROLE), {"AGENT": 1, "DOCTOR": 1, "PATIENT": 4})
+        self.assertEqual(stats.read(stats.RECORDS_BY_MONTH), {"2025-01": 2, "2025-02": 2})
+        user = self.patients[0].user
+        user.role = User.Roles.AGENT
+        user.save()
+        record = MedicalRecord.objects.filter(patient=self.patients[1]).get()
+        record.patient, record.record_date = self.patients[2], timezone.datetime(2025, 3, 1, tzinfo=timezone.utc)
+        record.save()
+        self.assertEqual(stats.value(stats.RECORDS_BY_PATIENT, self.patients[2].pk), 2)
+        self.patients[3].user.delete()
+        self.assertInSync()
+        self.speciality.delete()
+        self.assertEqual(stats.read(stats.DOCTORS_BY_SPECIALITY), {stats.NONE_KEY: 1})
+        self.assertInSync()
+
+    def test_bulk_paths(self):
+        self.client.force_login(self.agent)
+        pks = [patient.user_id for patient in self.patients]
+        self.client.post("/admin/app/user/", {"action": "make_agents", "_selected_action": pks[:2]})
+        self.client.post("/admin/app/user/", {"action": "make_patients", "_selected_action": pks})
+        jobs.run_job(jobs.claim_job())
+        self.assertInSync()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        response = self.client.post("/api/users/bulk/", [
+            {"username": "nouveau", "role": User.Roles.DOCTOR},
+            {"id": pks[0], "role": User.Roles.AGENT},
+        ], content_type="application/json", **headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertInSync()
+
+    def test_reconcile_fixes_drift(self):
+        StatCounter.objects.filter(name=stats.USERS_BY_ROLE, key="PATIENT").delete()
+        StatCounter.objects.bulk_create([StatCounter(name=stats.USERS_BY_ROLE, key="PATIENT", shard=shard, value=21)
+                                         for shard in range(2)])
+        StatCounter.objects.create(name=stats.USERS_BY_ROLE, key="GHOST", value=3)
+        self.assertEqual(stats.reconcile([stats.USERS_BY_ROLE]),
+                         {stats.USERS_BY_ROLE: {"PATIENT": (42, 4), "GHOST": (3, 0)}})
+        self.assertFalse(StatCounter.objects.filter(key="GHOST").exists())
+        self.assertEqual(list(StatCounter.objects.filter(name=stats.USERS_BY_ROLE, key="PATIENT")
+                              .values_list("shard", "value")), [(0, 4)])
+
+    @override_settings(STAT_COUNTER_SHARDS=4)
+    def test_hot_counters_are_sharded(self):
+        with mock.patch.object(stats.random, "randrange", side_effect=[0, 1, 2, 3, 1] * 4):
+            for i in range(5):
+                User.objects.create(username=f"nouveau{i}")
+                MedicalRecord.objects.create(patient=self.patients[0], doctor=self.doctor, title="Bilan",
+                                             description="-", record_date=timezone.datetime(2025, 1, 20, tzinfo=timezone.utc))
+        shards = StatCounter.objects.filter(name=stats.USERS_BY_ROLE, key="PATIENT").values_list("shard", flat=True)
+        self.assertLessEqual({0, 1, 2, 3}, set(shards))
+        self.assertEqual(stats.read(stats.USERS_BY_ROLE)["PATIENT"], 9)
+        self.assertEqual(stats.value(stats.RECORDS_BY_MONTH, "2025-01"), 7)
+        # Compteur par patient : une clé par ligne, jamais réparti.
+        self.assertEqual(StatCounter.objects.filter(name=stats.RECORDS_BY_PATIENT, key=str(self.patients[0].pk))
+                         .count(), 1)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        data = self.client.get(f"/api/stats/?patient={self.patients[0].pk}", **headers).json()
+        self.assertEqual((data["users_by_role"]["PATIENT"], data["records_by_month"]["2025-01"],
+                          data["patient_records"]), (9, 7, 6))
+        self.assertInSync()
+
+    def test_api_reads_counters_only(self):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        self.client.get("/api/stats/", **headers)
+        with self.assertNumQueries(1):
+            data = self.client.get(f"/api/stats/?patient={self.patients[0].pk}", **headers).json()
+        self.assertEqual(data["users_by_role"]["PATIENT"], 4)
+        self.assertEqual(data["doctors_by_speciality"], {str(self.speciality.pk): 1})
+        self.assertEqual(data["patient_records"], 1)
+
+
+
+@override_settings(AUDIT_ENABLED=True, AUDIT_BUFFER_SIZE=1000, AUDIT_FLUSH_INTERVAL=3600)
+class AccessAuditTests(TestCase):
+    """Les consultations sont journalisées par lots, hors du chemin de lecture."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        cls.other = User.objects.create(username="agent2", role=User.Roles.AGENT)
+        doctor = DoctorProfile.objects.create(user=User.objects.create(username="doc", role=User.Roles.DOCTOR),
+                                              license_number="L1")
+        cls.patients = [PatientProfile.objects.create(user=User.objects.create(username=f"pat{i}"))
+                        for i in range(2)]
+        cls.records = [MedicalRecord.objects.create(patient=patient, doctor=doctor, title="Bilan", description="-")
+                       for patient in cls.patients]
+
+    def setUp(self):
+        audit.buffer.flush()
+        AccessEvent.objects.all().delete()
+
+    def get(self, url, user=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(user or self.agent, 'test')[1]}"}
+        return self.client.get(url, **headers)
+
+    def test_reads_are_buffered_then_written(self):
+        self.get("/api/medical-records/")
+        self.get(f"/api/medical-records/{self.records[0].pk}/")
+        self.assertFalse(AccessEvent.objects.exists())
+        self.assertEqual(audit.buffer.pending(), 3)
+        self.assertEqual(audit.buffer.flush(), 3)
+        self.assertEqual(
+            sorted(AccessEvent.objects.values_list("actor", "action", "record")),
+            sorted([(self.agent.pk, AccessEvent.Action.VIEW_RECORD, record.pk)
+                    for record in self.records + self.records[:1]]),
+        )
+
+    def test_admin_reads_are_audited(self):
+        staff = User.objects.create_superuser("staff", "staff@example.com", "motdepasse")
+        self.client.force_login(staff)
+        self.client.get("/admin/app/medicalrecord/")
+        self.client.get(f"/admin/app/medicalrecord/{self.records[1].pk}/change/")
+        self.client.get("/admin/app/patientprofile/", {"q": "pat0"})
+        self.client.get(f"/admin/app/patientprofile/{self.patients[1].pk}/change/")
+        audit.buffer.flush()
+        record_events = [(self.patients[i].pk, self.records[i].pk) for i in (0, 1, 1)]
+        patient_events = [(self.patients[0].pk, None), (self.patients[1].pk, None)]
+        self.assertEqual(
+            sorted(AccessEvent.objects.values_list("actor", "action", "patient", "record")),
+            sorted([(staff.pk, AccessEvent.Action.VIEW_RECORD, *target) for target in record_events]
+                   + [(staff.pk, AccessEvent.Action.VIEW_PATIENT, *target) for target in patient_events]),
+        )
+
+    def test_disabled(self):
+        with override_settings(AUDIT_ENABLED=False):
+            self.get("/api/medical-records/")
+        self.assertEqual(audit.buffer.pending(), 0)
+
+    def test_size_threshold_flushes_in_caller(self):
+        with override_settings(AUDIT_BUFFER_SIZE=2):
+            self.get("/api/medical-records/")
+        self.assertEqual(audit.buffer.pending(), 0)
+        self.assertEqual(AccessEvent.objects.count(), 2)
+
+    def test_failed_write_is_retried(self):
+        audit.record(None, AccessEvent.Action.VIEW_PATIENT, [(self.patients[0].pk, None)])
+        with mock.patch("app.audit.write_events", side_effect=DatabaseError), self.assertLogs("app.audit"):
+            self.assertEqual(audit.buffer.flush(), 0)
+        self.assertEqual(audit.buffer.pending(), 1)
+        self.assertEqual(audit.buffer.flush(), 1)
+
+    def test_query_and_export(self):
+        self.get(f"/api/medical-records/export/?patient={self.patients[0].pk}").getvalue()
+        self.get(f"/api/medical-records/{self.records[1].pk}/", user=self.other)
+        audit.buffer.flush()
+        data = self.get(f"/api/audit/events/?patient={self.patients[0].pk}").json()["results"]
+        self.assertEqual([(e["actor"], e["action"]) for e in data],
+                         [(self.agent.pk, AccessEvent.Action.EXPORT_RECORD)])
+        data = self.get(f"/api/audit/events/?actor={self.other.pk}").json()["results"]
+        self.assertEqual([e["record"] for e in data], [self.records[1].pk])
+        self.assertEqual(self.get("/api/audit/events/", user=self.patients[0].user).status_code, 403)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class MedicalRecordExportTests(TestCase):
+    """Export en flux : formats, filtres et lecture paginée par clé."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        cls.doctor = DoctorProfile.objects.create(
+            user=User.objects.create(username="doc", first_name="Jean", last_name="Durand", role=User.Roles.DOCTOR),
+            license_number="L1")
+        cls.patients = [PatientProfile.objects.create(
+            user=User.objects.create(username=f"pat{i}", first_name=f"Pat{i}")) for i in range(2)]
+        cls.records = [MedicalRecord.objects.create(
+            patient=cls.patients[i % 2], doctor=cls.doctor if i % 3 else None, title=f"Bilan {i}",
+            description="Ligne 1\nligne, 2", record_date=timezone.datetime(2025, 1, 1 + i, 12, tzinfo=timezone.utc),
+        ) for i in range(5)]
+
+    def export(self, query=""):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        response = self.client.get(f"/api/medical-records/export/{query}", **headers)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, content = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [record.pk for record in self.records])
+        self.assertEqual(list(rows[1]), list(exports.EXPORT_FIELDS))
+        self.assertEqual((rows[0]["doctor_name"], rows[1]["doctor_name"]), (None, "Jean Durand"))
+        self.assertEqual((rows[1]["patient_name"], rows[1]["description"]), ("Pat1", "Ligne 1\nligne, 2"))
+        self.assertEqual(rows[0]["record_date"], "2025-01-01T12:00:00+00:00")
+
+    def test_csv(self):
+        response, content = self.export("?output=csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('attachment; filename="medical-records-', response["Content-Disposition"])
+        header, *rows = csv.reader(StringIO(content))
+        self.assertEqual(tuple(header), exports.EXPORT_FIELDS)
+        self.assertEqual([int(row[0]) for row in rows], [record.pk for record in self.records])
+        self.assertEqual(rows[1][6], "Ligne 1\nligne, 2")
+
+    def test_filters(self):
+        def exported(query):
+            return [json.loads(line)["title"] for line in self.export(query)[1].splitlines()]
+
+        self.assertEqual(exported(f"?patient={self.patients[0].pk}"), ["Bilan 0", "Bilan 2", "Bilan 4"])
+        self.assertEqual(exported(f"?doctor={self.doctor.pk}"), ["Bilan 1", "Bilan 2", "Bilan 4"])
+        self.assertEqual(exported("?date_from=2025-01-02&date_to=2025-01-03"), ["Bilan 1", "Bilan 2"])
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        response = self.client.get("/api/medical-records/export/?date_from=2025-01-03&date_to=2025-01-02", **headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_keyset_pages_without_server_cursor(self):
+        rows = exports.export_rows()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(list(rows)), 5)
+        # 2 + 2 + 1 lignes : trois requêtes courtes, chacune reprenant après la dernière clé.
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn('."id" >', queries[0]["sql"])
+        self.assertIn(f'."id" > {self.records[3].pk}', queries[2]["sql"])
+
+    def test_command(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "records.csv")
+        stderr = StringIO()
+        call_command("export_medical_records", "--output=csv", f"--file={path}", "--to=2025-01-02", stderr=stderr)
+        with open(path, encoding="utf-8", newline="") as source:
+            self.assertEqual(len(list(csv.reader(source))), 3)
+        self.assertIn("2 dossiers exportés", stderr.getvalue())
+
+
+@override_settings(PASSWORD_HASH_WORKERS=1)
+class UserBulkTests(TestCase):
+    """/api/users/bulk/ : créations, mises à jour et erreurs ligne par ligne."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        cls.patient = User.objects.create(username="patient", first_name="Ancien")
+
+    def post(self, rows, query=""):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        return self.client.post(f"/api/users/bulk/{query}", rows, content_type="application/json", **headers)
+
+    def test_create_and_update(self):
+        response = self.post([
+            {"username": "nouveau", "password": "motdepasse-solide", "role": User.Roles.DOCTOR},
+            {"id": self.patient.pk, "first_name": "Nouveau"},
+        ])
+        self.assertEqual(response.status_code, 201)
+        created = User.objects.get(username="nouveau")
+        self.assertEqual(response.json(), {"created": [created.pk], "updated": [self.patient.pk], "errors": []})
+        self.assertTrue(created.check_password("motdepasse-solide"))
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.first_name, "Nouveau")
+
+    def test_invalid_ids_are_row_errors(self):
+        rows = [{"id": value, "first_name": "X"} for value in ("abc", -1, 0, True, 1.5, [1], str(self.patient.pk))]
+        response = self.post(rows + [{"id": 10 ** 6, "first_name": "X"}])
+        self.assertEqual(response.status_code, 400)
+        errors = {error["index"]: error["errors"]["id"] for error in response.json()["errors"]}
+        self.assertEqual(set(errors), set(range(8)))
+        self.assertEqual(errors[7], ["Utilisateur introuvable."])
+
+    def test_partial_success_and_atomic(self):
+        rows = [{"username": "nouveau"}, {"username": "patient"}, {"username": "double"}, {"username": "double"},
+                "pas un objet"]
+        response = self.post(rows, "?atomic=true")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(username="nouveau").exists())
+        response = self.post(rows)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [1, 2, 3, 4])
+        self.assertTrue(User.objects.filter(username="nouveau").exists())
+
+    @override_settings(BULK_USERS_MAX_ROWS=2)
+    def test_rejects_large_or_malformed_payloads(self):
+        self.assertEqual(self.post([{"username": f"u{i}"} for i in range(3)]).status_code, 400)
+        self.assertEqual(self.post({"username": "u"}).status_code, 400)
+
+    @override_settings(PASSWORD_HASH_WORKERS=2, PASSWORD_HASH_PARALLEL_THRESHOLD=1)
+    def test_hashing_falls_back_inline(self):
+        with mock.patch.object(hashing, "get_executor", side_effect=OSError("fork interdit")):
+            with self.assertLogs("app.hashing", "WARNING"):
+                hashed = hashing.hash_passwords(["a", "b"])
+        self.assertEqual(len(hashed), 2)
+        self.assertTrue(check_password("b", hashed[1]))
+
+
+class ImportCommandTests(TestCase):
+    """import_medconnect : lots, rejets, reprise après un arrêt en cours de lot."""
+
+    rows = [
+        "username,email,role,is_active",
+        "alice,alice@example.com,PATIENT,true",
+        "bob,bob@example.com,INCONNU,true",
+        "carol,carol@example.com,DOCTOR,FALSE",
+        "dave,dave@example.com,PATIENT,",
+        "alice,doublon@example.com,PATIENT,1",
+        "erin,erin@example.com,AGENT,f",
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "users.csv")
+        with open(self.path, "w", encoding="utf-8") as target:
+            target.write("\n".join(self.rows) + "\n")
+
+    def run_import(self, *args):
+        call_command("import_medconnect", "users", self.path, "--batch-size=2", *args,
+                     stdout=StringIO(), stderr=StringIO())
+
+    def rejected_rows(self):
+        with open(f"{self.path}.rejects.ndjson", encoding="utf-8") as source:
+            return [json.loads(line)["row"] for line in source]
+
+    def imported(self):
+        return dict(User.objects.order_by("username").values_list("username", "is_active"))
+
+    def test_import_and_rejects(self):
+        self.run_import()
+        self.assertEqual(self.imported(), {"alice": True, "carol": False, "dave": True, "erin": False})
+        self.assertEqual(self.rejected_rows(), [2, 5])
+        self.assertEqual(stats.value(stats.USERS_BY_ROLE, User.Roles.PATIENT), 2)
+        self.assertEqual(ImportCheckpoint.objects.get(kind="users", path=self.path).row, 6)
+
+    def test_resume_after_a_failed_batch(self):
+        with mock.patch.object(stats, "apply", side_effect=[None, RuntimeError("arrêt")]):
+            with self.assertRaises(RuntimeError):
+                self.run_import()
+        # Premier lot (lignes 1 à 3) validé avec son point de reprise, second annulé.
+        self.assertEqual(self.imported(), {"alice": True, "carol": False})
+        self.assertEqual(ImportCheckpoint.objects.get(kind="users", path=self.path).row, 3)
+        self.assertEqual(self.rejected_rows(), [2, 5])
+        self.run_import()
+        self.assertEqual(self.imported(), {"alice": True, "carol": False, "dave": True, "erin": False})
+        self.assertEqual(self.rejected_rows(), [2, 5])
+
+    def test_restart_ignores_the_checkpoint(self):
+        self.run_import()
+        User.objects.all().delete()
+        self.run_import()
+        self.assertEqual(self.imported(), {})
+        self.run_import("--restart")
+        self.assertEqual(len(self.imported()), 4)
+        self.assertEqual(self.rejected_rows(), [2, 5])
+
+    @skipUnless(connection.vendor == "postgresql", "COPY nécessite PostgreSQL")
+    def test_copy_matches_bulk_create(self):
+        fields = ("username", "email", "role", "is_active", "first_name", "is_staff")
+        self.run_import()
+        bulk = list(User.objects.order_by("username").values_list(*fields))
+        User.objects.all().delete()
+        self.run_import("--restart", "--copy")
+        self.assertEqual(list(User.objects.order_by("username").values_list(*fields)), bulk)
+        self.assertEqual(self.rejected_rows(), [2, 5])
+
+
+class InstrumentationTests(TestCase):
+    """Mesures par requête : en-tête Server-Timing réservé, registre et /metrics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create(username="staff", is_staff=True)
+        cls.patient = User.objects.create(username="patient")
+
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+
+    def bearer(self, user):
+        return {"HTTP_AUTHORIZATION": f"Bearer {issue_token(user, 'test')[1]}"}
+
+    def test_span_outside_request_is_ignored(self):
+        with instrumentation.span("serialize"):
+            pass
+        timings = instrumentation.RequestTimings()
+        token = instrumentation._current.set(timings)
+        try:
+            with instrumentation.span("serialize"):
+                pass
+            with instrumentation.span("serialize"):
+                pass
+        finally:
+            instrumentation._current.reset(token)
+        self.assertEqual(list(timings.phases), ["serialize"])
+
+    def test_server_timing_is_off_by_default(self):
+        response = self.client.get("/api/doctors/", **self.bearer(self.staff))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_is_sent_to_staff_only(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/doctors/"))
+        self.assertNotIn("Server-Timing", self.client.get("/api/doctors/", **self.bearer(self.patient)))
+        cache.clear()
+        header = self.client.get("/api/doctors/", **self.bearer(self.staff))["Server-Timing"]
+        for phase in ("db;", "auth;", "serialize;", "render;", "total;"):
+            self.assertIn(phase, header)
+
+    def test_registry(self):
+        registry = instrumentation.MetricsRegistry(buckets=(0.1, 1.0))
+        timings = instrumentation.RequestTimings()
+        timings.add("db", 0.05)
+        timings.queries = 3
+        registry.observe('doctor-list', 200, 0.5, timings)
+        registry.observe('doctor-list', 404, 0.05, timings)
+        stats = registry.snapshot()["doctor-list"]
+        self.assertEqual((stats["buckets"], stats["count"], stats["queries"]), ([1, 2], 2, 6))
+        self.assertEqual(stats["statuses"], {"2xx": 1, "4xx": 1})
+        text = registry.render_prometheus()
+        self.assertIn('medconnect_request_duration_seconds_bucket{route="doctor-list",le="0.1"} 1', text)
+        self.assertIn('medconnect_request_duration_seconds_bucket{route="doctor-list",le="+Inf"} 2', text)
+        self.assertIn('medconnect_request_phase_seconds_total{route="doctor-list",phase="db"} 0.100000', text)
+
+    def test_metrics_requires_a_token(self):
+        self.client.get("/api/doctors/")
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with override_settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get("/metrics").status_code, 401)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer autre").status_code, 401)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('route="doctor-list"', response.content.decode())
+
+
+class DoctorDirectoryCacheTests(TestCase):
+    """Annuaire mis en cache : toute écriture qui le concerne change la réponse suivante."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.speciality = Speciality.objects.create(name="Cardiologie")
+        cls.doctor = DoctorProfile.objects.create(
+            user=User.objects.create(username="doc", first_name="Jean", last_name="Durand", role=User.Roles.DOCTOR),
+            speciality=cls.speciality, license_number="L1", consultation_fee=50)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self):
+        """Liste et fiche, chacune servie deux fois (la seconde depuis le cache)."""
+        responses = []
+        for url in ("/api/doctors/", f"/api/doctors/{self.doctor.pk}/"):
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                responses.append(self.client.get(url).json())
+        listed, detail = responses
+        self.assertEqual(listed["results"], [detail])
+        return detail
+
+    def test_doctor_save_invalidates(self):
+        self.assertEqual(self.get()["consultation_fee"], "50.00")
+        self.doctor.consultation_fee = 60
+        self.doctor.save()
+        self.assertEqual(self.get()["consultation_fee"], "60.00")
+
+    def test_speciality_save_invalidates(self):
+        self.assertEqual(self.get()["speciality_name"], "Cardiologie")
+        self.speciality.name = "Cardiologie interventionnelle"
+        self.speciality.save()
+        self.assertEqual(self.get()["speciality_name"], "Cardiologie interventionnelle")
+
+    def test_user_save_invalidates(self):
+        self.assertEqual(self.get()["full_name"], "Jean Durand")
+        self.doctor.user.last_name = "Martin"
+        self.doctor.user.save()
+        self.assertEqual(self.get()["full_name"], "Jean Martin")
+
+    @override_settings(PASSWORD_HASH_WORKERS=1)
+    def test_bulk_user_writes_invalidate(self):
+        agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(agent, 'test')[1]}"}
+
+        def bulk(rows):
+            response = self.client.post("/api/users/bulk/", rows, content_type="application/json", **headers)
+            self.assertIn(response.status_code, (200, 201))
+
+        self.assertEqual(self.get()["full_name"], "Jean Durand")
+        bulk([{"id": self.doctor.user_id, "last_name": "Martin"}])
+        self.assertEqual(self.get()["full_name"], "Jean Martin")
+        with mock.patch.object(bulk_module.doctor_directory_cache, "bump") as bump:
+            bulk([{"id": agent.pk, "first_name": "Agent"}, {"username": "nouveau"}])
+        bump.assert_not_called()
+
+    def test_process_local_cache_requires_single_worker(self):
+        self.assertEqual(checks.check_shared_cache(None), [])
+        with override_settings(WEB_CONCURRENCY=4):
+            self.assertEqual([error.id for error in checks.check_shared_cache(None)], ["app.E001"])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(WEB_CONCURRENCY=4, CACHES=shared):
+            self.assertEqual(checks.check_shared_cache(None), [])
+        self.assertEqual([warning.id for warning in checks.check_shared_cache_deploy(None)], ["app.W001"])
+
+
+class PatientSummaryTests(TestCase):
+    """Synthèse patient : nombre de requêtes constant, cache invalidé à l'écriture."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        speciality = Speciality.objects.create(name="Cardiologie")
+        cls.doctors = [DoctorProfile.objects.create(
+            user=User.objects.create(username=f"doc{i}", first_name=f"Doc{i}", role=User.Roles.DOCTOR),
+            speciality=speciality, license_number=f"L{i}") for i in range(3)]
+        cls.patient, cls.other = [PatientProfile.objects.create(
+            user=User.objects.create(username=f"pat{i}"), allergies="Pénicilline") for i in range(2)]
+        for i in range(15):
+            MedicalRecord.objects.create(patient=cls.patient, doctor=cls.doctors[i % 3], title=f"Bilan {i}",
+                                         description="-", record_date=timezone.now() - timedelta(days=i))
+        MedicalRecord.objects.create(patient=cls.other, doctor=cls.doctors[0], title="Bilan", description="-")
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, patient, user=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(user or self.agent, 'test')[1]}"}
+        return self.client.get(f"/api/patients/{patient.pk}/summary/", **headers)
+
+    def test_content_and_constant_queries(self):
+        with mock.patch.object(views.patient_summary_cache, "timeout", 0):
+            self.get(self.other)
+            with CaptureQueriesContext(connection) as small:
+                self.get(self.other)
+            with CaptureQueriesContext(connection) as large:
+                data = self.get(self.patient).json()
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(data["allergies"], "Pénicilline")
+        self.assertEqual(data["record_count"], 15)
+        self.assertEqual([r["title"] for r in data["recent_records"]], [f"Bilan {i}" for i in range(10)])
+        self.assertEqual((data["recent_records"][1]["doctor_name"], data["recent_records"][1]["speciality"]),
+                         ("Doc1", "Cardiologie"))
+
+    @override_settings(PASSWORD_HASH_WORKERS=1)
+    def test_cache_invalidated_on_bulk_user_update(self):
+        self.assertEqual(self.get(self.patient).json()["full_name"], "")
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        response = self.client.post("/api/users/bulk/", [
+            {"id": self.patient.user_id, "first_name": "Awa", "last_name": "Diallo", "email": "awa@example.com"},
+        ], content_type="application/json", **headers)
+        self.assertEqual(response.status_code, 200)
+        data = self.get(self.patient).json()
+        self.assertEqual((data["full_name"], data["email"]), ("Awa Diallo", "awa@example.com"))
+
+    def test_cache_invalidated_on_record_save(self):
+        self.get(self.patient)
+        with CaptureQueriesContext(connection) as cached:
+            self.get(self.patient)
+        self.assertFalse([q for q in cached if "app_medicalrecord" in q["sql"]])
+        record = MedicalRecord.objects.filter(patient=self.patient).first()
+        record.title = "Modifié"
+        record.save()
+        self.assertEqual(self.get(self.patient).json()["recent_records"][0]["title"], "Modifié")
+        record.patient = self.other
+        record.save()
+        self.assertEqual(self.get(self.patient).json()["record_count"], 14)
+
+    def test_doctor_sees_treated_patients_only(self):
+        newcomer = DoctorProfile.objects.create(
+            user=User.objects.create(username="doc9", role=User.Roles.DOCTOR), license_number="L9")
+        self.assertEqual(self.get(self.patient, user=self.doctors[1].user).status_code, 200)
+        self.assertEqual(self.get(self.patient, user=newcomer.user).status_code, 404)
+        appointment = Appointment.objects.create(doctor=newcomer, patient=self.patient,
+                                                 start=timezone.now(), end=timezone.now())
+        self.assertEqual(self.get(self.patient, user=newcomer.user).status_code, 200)
+        appointment.status = Appointment.Status.CANCELLED
+        appointment.save()
+        self.assertEqual(self.get(self.patient, user=newcomer.user).status_code, 404)
+        self.assertEqual(self.get(self.patient, user=self.patient.user).status_code, 403)
+
+    @override_settings(AUDIT_ENABLED=True, AUDIT_BUFFER_SIZE=1000, AUDIT_FLUSH_INTERVAL=3600)
+    def test_cached_reads_are_audited(self):
+        audit.buffer.flush()
+        self.get(self.patient)
+        self.get(self.patient)
+        self.assertEqual(audit.buffer.pending(), 2 * 11)
+        audit.buffer.flush()
+
+
+class MedicalRecordSearchTests(TestCase):
+    """Recherche des dossiers : repli ILIKE partout, plein texte classé sous PostgreSQL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create_superuser("agent", "agent@example.com", "motdepasse", role=User.Roles.AGENT)
+        cls.doctor = DoctorProfile.objects.create(
+            user=User.objects.create(username="cmoreau", first_name="Claire", last_name="Moreau",
+                                     role=User.Roles.DOCTOR), license_number="L1")
+        cls.patient = PatientProfile.objects.create(
+            user=User.objects.create(username="lbernard", first_name="Luc", last_name="Bernard"))
+        cls.titled, cls.mentioned, cls.other = [MedicalRecord.objects.create(
+            patient=cls.patient, doctor=cls.doctor, title=title, description=description, diagnosis=diagnosis,
+        ) for title, description, diagnosis in (
+            ("Hypertension artérielle", "Tension élevée", "hypertension"),
+            ("Bilan annuel", "Antécédents d'hypertension", ""),
+            ("Fracture du poignet", "Chute", "fracture"),
+        )]
+
+    def found(self, queryset):
+        return {record.pk for record in queryset}
+
+    def test_search_ilike(self):
+        records = MedicalRecord.objects.all()
+        self.assertEqual(self.found(records.search_ilike("HYPERTENSION")), {self.titled.pk, self.mentioned.pk})
+        self.assertEqual(self.found(records.search_ilike("hypertension bilan")), {self.mentioned.pk})
+        self.assertEqual(self.found(records.search_ilike("claire")), {self.titled.pk, self.mentioned.pk, self.other.pk})
+        self.assertEqual({record.search_rank for record in records.search_ilike("poignet")}, {0.0})
+
+    def test_search_endpoint(self):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.agent, 'test')[1]}"}
+        self.assertEqual(self.client.get("/api/medical-records/search/", **headers).status_code, 400)
+        results = self.client.get("/api/medical-records/search/?q=fracture&limit=5", **headers).json()["results"]
+        self.assertEqual([result["id"] for result in results], [self.other.pk])
+        self.assertIn("rank", results[0])
+
+    @skipUnless(connection.vendor == "postgresql", "recherche plein texte PostgreSQL")
+    def test_ranking(self):
+        results = list(MedicalRecord.objects.search("hypertension").order_by("-search_rank"))
+        self.assertEqual([record.pk for record in results], [self.titled.pk, self.mentioned.pk])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+        # Racinisation française : le pluriel trouve le singulier.
+        self.assertEqual(self.found(MedicalRecord.objects.search("fractures")), {self.other.pk})
+
+    @skipUnless(connection.vendor == "postgresql", "recherche plein texte PostgreSQL")
+    def test_triggers_maintain_the_vector(self):
+        self.other.diagnosis = "entorse"
+        self.other.save()
+        self.assertEqual(self.found(MedicalRecord.objects.search("entorse")), {self.other.pk})
+        user = self.doctor.user
+        user.last_name = "Lefebvre"
+        user.save()
+        self.assertEqual(self.found(MedicalRecord.objects.search("lefebvre")),
+                         {self.titled.pk, self.mentioned.pk, self.other.pk})
+        self.assertFalse(MedicalRecord.objects.search("moreau").exists())
+
+    @skipUnless(connection.vendor == "postgresql", "recherche plein texte PostgreSQL")
+    def test_admin_search_is_ranked(self):
+        self.client.force_login(self.agent)
+        response = self.client.get("/admin/app/medicalrecord/", {"q": "hypertension"})
+        self.assertEqual([record.pk for record in response.context["cl"].result_list],
+                         [self.titled.pk, self.mentioned.pk])
+
+
+class RecordScopingTests(TestCase):
+    """Chaque rôle ne voit que ses dossiers, filtrés en SQL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        cls.doctors = [DoctorProfile.objects.create(
+            user=User.objects.create(username=f"doc{i}", role=User.Roles.DOCTOR), license_number=f"L{i}")
+            for i in range(3)]
+        cls.patients = [PatientProfile.objects.create(user=User.objects.create(username=f"pat{i}"))
+                        for i in range(3)]
+        # doc0 suit pat0 ; doc1 suit pat0 et pat1 ; doc2 a seulement un rendez-vous avec pat2.
+        cls.records = [
+            MedicalRecord.objects.create(patient=cls.patients[p], doctor=cls.doctors[d], title="-", description="-")
+            for p, d in ((0, 0), (0, 1), (1, 1), (1, 1), (2, 0))
+        ]
+        Appointment.objects.create(doctor=cls.doctors[2], patient=cls.patients[2],
+                                   start=timezone.now(), end=timezone.now())
+
+    def visible(self, user, url="/api/medical-records/"):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(user, 'test')[1]}"}
+        return sorted(r["id"] for r in self.client.get(url, **headers).json()["results"])
+
+    def ids(self, *indexes):
+        return sorted(self.records[i].pk for i in indexes)
+
+    def test_each_role(self):
+        self.assertEqual(self.visible(self.agent), self.ids(0, 1, 2, 3, 4))
+        self.assertEqual(self.visible(self.patients[1].user), self.ids(2, 3))
+        # Dossiers rédigés, et ceux des autres médecins pour les patients suivis.
+        self.assertEqual(self.visible(self.doctors[0].user), self.ids(0, 1, 4))
+        self.assertEqual(self.visible(self.doctors[2].user), self.ids(4))
+        self.assertEqual(self.visible(self.doctors[1].user, "/api/async/medical-records/"), self.ids(0, 1, 2, 3))
+
+    @override_settings(APPOINTMENT_RECORD_ACCESS_DAYS=30)
+    def test_only_booked_recent_appointments_grant_access(self):
+        appointment = Appointment.objects.get(doctor=self.doctors[2])
+        appointment.status = Appointment.Status.CANCELLED
+        appointment.save()
+        self.assertEqual(self.visible(self.doctors[2].user), [])
+        past = timezone.now() - timedelta(days=31)
+        Appointment.objects.create(doctor=self.doctors[2], patient=self.patients[2], start=past, end=past)
+        self.assertEqual(self.visible(self.doctors[2].user), [])
+        recent = timezone.now() - timedelta(days=29)
+        Appointment.objects.create(doctor=self.doctors[2], patient=self.patients[2], start=recent, end=recent)
+        self.assertEqual(self.visible(self.doctors[2].user), self.ids(4))
+
+    def test_out_of_scope(self):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(self.patients[0].user, 'test')[1]}"}
+        self.assertEqual(self.client.get(f"/api/medical-records/{self.records[2].pk}/", **headers).status_code, 404)
+        self.assertEqual(self.client.get(f"/api/medical-records/{self.records[0].pk}/", **headers).status_code, 200)
+        self.assertEqual(self.client.get("/api/medical-records/export/", **headers).status_code, 403)
+
+    def test_page_query_count_is_role_independent(self):
+        counts = set()
+        for user in (self.agent, self.patients[0].user, self.doctors[1].user):
+            headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(user, 'test')[1]}"}
+            self.client.get("/api/medical-records/", **headers)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get("/api/medical-records/", **headers)
+            counts.add(len(queries))
+        self.assertEqual(len(counts), 1, counts)
+
+
+class StartupProfileTests(TestCase):
+    """Mesure du démarrage à froid (manage.py startup_profile)."""
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     django.contrib.admin.sites\n"
+            "import time:       300 |        420 |   django.contrib.admin\n"
+            "import time:        50 |         50 | rest_framework\n"
+        )
+        modules = parse_importtime(output)
+        self.assertEqual(modules[1], ("django.contrib.admin", 300, 420))
+        self.assertEqual(import_packages(modules), [("django.contrib.admin", 420), ("rest_framework", 50)])
+
+    def test_admin_disabled_is_not_imported(self):
+        phases, modules = measure_startup("wsgi", env={"ENABLE_ADMIN": "False"}, importtime=True)
+        self.assertLess(phases["apps_ready"], phases["urls"])
+        names = {name for name, _, _ in modules}
+        self.assertIn("app.views", names)
+        self.assertNotIn("app.admin", names)
+
+
+class ConditionalGetTests(TestCase):
+    """304 tant que rien de ce qu'affiche la réponse n'a changé, comptes liés compris."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+        cls.doctor = DoctorProfile.objects.create(
+            user=User.objects.create(username="doc", first_name="Ancien", role=User.Roles.DOCTOR),
+            license_number="L1")
+        cls.patient = PatientProfile.objects.create(user=User.objects.create(username="pat", first_name="Awa"))
+        cls.record = MedicalRecord.objects.create(patient=cls.patient, doctor=cls.doctor, title="Bilan",
+                                                  description="-")
+        MedicalRecord.objects.create(patient=cls.patient, title="Sans médecin", description="-")
+
+    def get(self, url, **headers):
+        return self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {issue_token(self.agent, 'test')[1]}", **headers)
+
+    def assertRevalidates(self, url, change):
+        etag = self.get(url)["ETag"]
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        change()
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        return response
+
+    def rename(self, user, first_name):
+        def change():
+            user.first_name = first_name
+            user.save()
+        return change
+
+    def test_record_list_and_detail_follow_doctor_account(self):
+        self.assertRevalidates("/api/medical-records/", self.rename(self.doctor.user, "Nouveau"))
+        response = self.assertRevalidates(f"/api/medical-records/{self.record.pk}/",
+                                          self.rename(self.doctor.user, "Autre"))
+        self.assertEqual(response.json()["doctor_name"], "Autre")
+
+    def test_patient_views_follow_patient_account(self):
+        self.assertRevalidates("/api/patients/", self.rename(self.patient.user, "Aminata"))
+        self.assertRevalidates(f"/api/patients/{self.patient.pk}/", self.rename(self.patient.user, "Fatou"))
+        self.assertRevalidates(f"/api/patients/{self.patient.pk}/records/", self.rename(self.patient.user, "Marie"))
+
+    def test_updated_since(self):
+        since = timezone.now().isoformat()
+        self.assertEqual(self.get(f"/api/medical-records/?updated_since={since}").json()["results"], [])
+        self.rename(self.doctor.user, "Nouveau")()
+        results = self.get(f"/api/medical-records/?updated_since={since}").json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.record.pk])
+        results = self.get(f"/api/patients/{self.patient.pk}/records/?updated_since={since}").json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.record.pk])
+        self.assertEqual(self.get("/api/medical-records/?updated_since=hier").status_code, 400)
+        for url in ("/api/medical-records/", "/api/async/medical-records/", f"/api/patients/{self.patient.pk}/records/"):
+            self.assertEqual(self.get(f"{url}?updated_since=2025-13-01T00:00:00").status_code, 400, url)
+
+    def test_malformed_id_is_not_found(self):
+        for url in ("/api/medical-records/abc/", "/api/patients/abc/", "/api/patients/abc/records/"):
+            self.assertEqual(self.get(url).status_code, 404, url)
+
+
+class TokenAuthenticationTests(TestCase):
+    """Jetons d'API : validation, révocation et cache des principaux."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = User.objects.create(username="agent", role=User.Roles.AGENT)
+
+    def setUp(self):
+        principal_cache.clear()
+
+    def get(self, authorization):
+        return self.client.get("/api/users/", HTTP_AUTHORIZATION=authorization)
+
+    def test_valid_token_is_cached(self):
+        _, key = issue_token(self.agent)
+        self.assertEqual(self.get(f"Bearer {key}").status_code, 200)
+        with self.assertNumQueries(0):
+            principal, key_hash = TokenAuthentication().authenticate_credentials(key)
+        self.assertEqual((principal.pk, key_hash), (self.agent.pk, hash_token(key)))
+
+    def test_rejected_headers(self):
+        _, key = issue_token(self.agent)
+        for header in (f"Bearer {key} extra", "Bearer", "Bearer inconnu", "Bearer été"):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(header).status_code, 401)
+
+    def test_expired_token(self):
+        token, key = issue_token(self.agent)
+        AuthToken.objects.filter(pk=token.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.get(f"Bearer {key}").status_code, 401)
+        self.assertEqual(len(principal_cache), 0)
+
+    def test_inactive_user(self):
+        user = User.objects.create(username="inactif", role=User.Roles.AGENT, is_active=False)
+        self.assertEqual(self.get(f"Bearer {issue_token(user)[1]}").status_code, 401)
+
+    def test_revoke_evicts_cached_principal(self):
+        token, key = issue_token(self.agent)
+        self.assertEqual(self.get(f"Bearer {key}").status_code, 200)
+        revoke_token(token.key_hash)
+        self.assertIsNone(principal_cache.get(token.key_hash))
+        self.assertEqual(self.get(f"Bearer {key}").status_code, 401)
+
+    def test_account_changes_apply_on_next_request(self):
+        _, key = issue_token(self.agent)
+        self.assertEqual(self.get(f"Bearer {key}").status_code, 200)
+        self.agent.role = User.Roles.PATIENT
+        self.agent.save()
+        self.assertEqual(self.get(f"Bearer {key}").status_code, 403)
+        self.agent.role, self.agent.is_active = User.Roles.AGENT, False
+        self.agent.save()
+        self.assertEqual(self.get(f"Bearer {key}").status_code, 401)
+
+    def test_lru_eviction(self):
+        with mock.patch.object(principal_cache, "maxsize", 2):
+            keys = [issue_token(self.agent)[1] for _ in range(3)]
+            for key in keys[:2]:
+                self.assertEqual(self.get(f"Bearer {key}").status_code, 200)
+            # Le premier redevient le plus récent : le deuxième est évincé.
+            principal_cache.get(hash_token(keys[0]))
+            self.assertEqual(self.get(f"Bearer {keys[2]}").status_code, 200)
+            self.assertEqual(len(principal_cache), 2)
+            self.assertIsNotNone(principal_cache.get(hash_token(keys[0])))
+            self.assertIsNone(principal_cache.get(hash_token(keys[1])))
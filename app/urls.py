@@ -1,11 +1,43 @@
 # app/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserAdminViewSet
+from .async_views import (
+    AsyncDoctorDetail,
+    AsyncDoctorList,
+    AsyncMedicalRecordDetail,
+    AsyncMedicalRecordList,
+    AsyncUserDetail,
+    AsyncUserList,
+)
+from .views import (
+    AccessEventViewSet,
+    AppointmentViewSet,
+    AuthTokenView,
+    DoctorViewSet,
+    MedicalRecordViewSet,
+    PatientProfileViewSet,
+    StatsView,
+    UserAdminViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"users", UserAdminViewSet, basename="user")
+router.register(r"doctors", DoctorViewSet, basename="doctor")
+router.register(r"medical-records", MedicalRecordViewSet, basename="medical-record")
+router.register(r"patients", PatientProfileViewSet, basename="patient")
+router.register(r"appointments", AppointmentViewSet, basename="appointment")
+router.register(r"audit/events", AccessEventViewSet, basename="access-event")
 
 urlpatterns = [
+    path("auth/token/", AuthTokenView.as_view(), name="auth-token"),
+    path("stats/", StatsView.as_view(), name="stats"),
+    # Lecture seule, servies nativement sous ASGI (voir app/async_views.py)
+    path("async/users/", AsyncUserList.as_view(), name="async-user-list"),
+    path("async/users/<int:pk>/", AsyncUserDetail.as_view(), name="async-user-detail"),
+    path("async/doctors/", AsyncDoctorList.as_view(), name="async-doctor-list"),
+    path("async/doctors/<int:pk>/", AsyncDoctorDetail.as_view(), name="async-doctor-detail"),
+    path("async/medical-records/", AsyncMedicalRecordList.as_view(), name="async-medical-record-list"),
+    path("async/medical-records/<int:pk>/", AsyncMedicalRecordDetail.as_view(),
+         name="async-medical-record-detail"),
     path("", include(router.urls)),
 ]
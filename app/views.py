@@ -1,16 +1,528 @@
 # app/views.py (extrait)
-from rest_framework import viewsets
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import router
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import User
-from .serializers import UserSerializer
-from .permissions import IsAgentOrSuperAdmin
-from rest_framework.permissions import IsAuthenticated
+from . import audit, stats
+from .appointments import SlotUnavailable, book, cancel, free_slots, slot_minutes
+from .authentication import issue_token, revoke_token
+from .bulk import UserBulkWriter
+from .cache import doctor_directory_cache, patient_summary_cache
+from .conditional import (
+    changed_at,
+    collection_validators,
+    not_modified_response,
+    object_validators,
+    parse_updated_since,
+    set_validators,
+)
+from .exports import CONTENT_TYPES, WRITERS, export_rows
+from .fastjson import render_json
+from .instrumentation import InstrumentedViewMixin, registry, span
+from .models import AccessEvent, Appointment, DoctorProfile, MedicalRecord, PatientProfile, StatCounter, User
+from .pagination import KeysetPagination
+from .serializers import (
+    AccessEventFilterSerializer,
+    AccessEventSerializer,
+    AppointmentSerializer,
+    AuthTokenSerializer,
+    DoctorDirectoryFilterSerializer,
+    DoctorDirectorySerializer,
+    MedicalRecordExportSerializer,
+    MedicalRecordSearchResultSerializer,
+    MedicalRecordSerializer,
+    PatientProfileSerializer,
+    PatientSummarySerializer,
+    SlotSearchSerializer,
+    UserSerializer,
+    values_fields,
+)
+from .permissions import IsAgentOrDoctor, IsAgentOrSuperAdmin
+from rest_framework.permissions import AllowAny, IsAuthenticated
 
-class UserAdminViewSet(viewsets.ModelViewSet):
+class UserAdminViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """
     CRUD utilisateur accessible uniquement aux agents / superadmins.
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsAgentOrSuperAdmin]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("date_joined", "id")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        columns = self.get_serializer_class().requested_model_fields(self.request)
+        if columns is not None:
+            # Ne charge que les colonnes demandées (+ celles du curseur).
+            queryset = queryset.only(*columns, *self.keyset_ordering)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        return self.values_list_response(request) or super().list(request, *args, **kwargs)
+
+    def values_list_response(self, request):
+        """
+        Liste rendue sans instances : ``values()`` sur les seules colonnes
+        sérialisées, puis encodage direct (orjson si installé). Octet pour octet
+        identique à ``UserSerializer`` + ``JSONRenderer`` ; ``None`` si ce chemin
+        ne s'applique pas (API navigable, indentation, champ non trivial).
+        """
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, JSONRenderer) or renderer.get_indent(request.accepted_media_type, {}):
+            return None
+        names = values_fields(self.get_serializer())
+        if names is None:
+            return None
+        cursor_only = [field.lstrip("-") for field in self.keyset_ordering if field.lstrip("-") not in names]
+        queryset = self.filter_queryset(self.get_queryset()).values(*names, *cursor_only)
+        paginator = self.paginator
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        data = OrderedDict([("next", paginator.get_next_link()), ("results", page)])
+        with span("serialize"):
+            for row in page:
+                for name in cursor_only:
+                    del row[name]
+        with span("render"):
+            content = render_json(data, renderer)
+        return HttpResponse(content, content_type=renderer.media_type)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Crée ou met à jour une liste d'utilisateurs en une seule requête.
+
+        Les lignes avec ``id`` sont mises à jour, les autres créées. Les lignes
+        invalides sont rejetées individuellement ; avec ``?atomic=true``, la
+        moindre erreur annule tout le lot.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({"detail": "Une liste d'utilisateurs est attendue."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.BULK_USERS_MAX_ROWS:
+            return Response({"detail": f"Au plus {settings.BULK_USERS_MAX_ROWS} lignes par requête."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        writer = UserBulkWriter(rows, context=self.get_serializer_context())
+        valid = writer.is_valid()
+        atomic = request.query_params.get("atomic", "").lower() in ("1", "true", "yes")
+        if not valid and (atomic or not (writer.to_create or writer.to_update)):
+            return Response({"created": [], "updated": [], "errors": writer.error_list()},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        created, updated = writer.save()
+        if not valid:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif created:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({
+            "created": [user.pk for user in created],
+            "updated": [user.pk for user in updated],
+            "errors": writer.error_list(),
+        }, status=response_status)
+
+
+class ConditionalGetMixin:
+    """
+    GET conditionnels sur ``list`` / ``retrieve`` et synchronisation différentielle.
+
+    Les validateurs (ETag, Last-Modified) sont calculés sans charger les
+    lignes, à partir du plus récent des ``validator_fields`` : la ligne et les
+    comptes dont la réponse affiche les noms. Un client à jour reçoit un 304.
+    ``?updated_since=<date ISO>`` ne renvoie que les lignes modifiées depuis.
+    """
+
+    validator_fields = ("updated_at",)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        updated_since = parse_updated_since(self.request) if self.action == "list" else None
+        return self.changed_since(queryset, updated_since)
+
+    def changed_since(self, queryset, updated_since, fields=None):
+        if updated_since is None:
+            return queryset
+        return queryset.alias(changed_at=changed_at(fields or self.validator_fields)).filter(
+            changed_at__gt=updated_since)
+
+    def conditional_list(self, queryset, render, fields=None):
+        etag, last_modified = collection_validators(queryset, changed_at(fields or self.validator_fields))
+        not_modified = not_modified_response(self.request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(render(), etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_list(
+            self.filter_queryset(self.get_queryset()),
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        try:
+            updated_at = (self.get_queryset().filter(**lookup).annotate(changed_at=changed_at(self.validator_fields))
+                          .values_list("changed_at", flat=True).first())
+        except (ValueError, TypeError, DjangoValidationError):
+            # Identifiant mal formé : 404, comme get_object_or_404 de DRF.
+            raise Http404
+
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = object_validators(updated_at)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+
+class MedicalRecordViewSet(InstrumentedViewMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Consultation des dossiers médicaux, restreinte en SQL selon le rôle
+    (``MedicalRecordQuerySet.visible_to``) : le patient voit les siens, le
+    médecin ceux des patients qu'il suit, agents et superadmins tout.
+    Un dossier hors périmètre répond 404. L'export reste réservé aux agents.
+    """
+    queryset = MedicalRecord.objects.select_related("patient__user", "doctor__user")
+    serializer_class = MedicalRecordSerializer
+    permission_classes = [IsAuthenticated]
+    # Noms du patient et du médecin affichés : leurs comptes entrent dans les validateurs.
+    validator_fields = ("updated_at", "patient__user__updated_at", "doctor__user__updated_at")
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-record_date", "-id")
+    search_limit = 20
+    max_search_limit = 100
+
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
+
+    def get_permissions(self):
+        if self.action == "export":
+            return [IsAuthenticated(), IsAgentOrSuperAdmin()]
+        return super().get_permissions()
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Recherche plein texte classée : ``?q=<termes>&limit=<n>``."""
+        terms = request.query_params.get("q", "").strip()
+        if not terms:
+            return Response({"q": "Ce paramètre est obligatoire."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get("limit", self.search_limit)),
+                        self.max_search_limit)
+        except ValueError:
+            limit = self.search_limit
+        results = self.get_queryset().search(terms).order_by("-search_rank", "-record_date")
+        serializer = MedicalRecordSearchResultSerializer(results[:max(limit, 1)], many=True,
+                                                         context=self.get_serializer_context())
+        return Response({"results": serializer.data})
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Export en flux (NDJSON ou CSV) : ``?output=csv&date_from=…&date_to=…&patient=…&doctor=…``.
+        """
+        params = MedicalRecordExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+        output = options.pop("output")
+        # Le flux est lu après la sortie des middlewares : base choisie dès maintenant.
+        options["using"] = router.db_for_read(MedicalRecord)
+        rows = audit.audited_rows(export_rows(**options), request)
+        response = StreamingHttpResponse(WRITERS[output](rows), content_type=CONTENT_TYPES[output])
+        filename = f"medical-records-{timezone.now():%Y%m%d-%H%M%S}.{output}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class PatientProfileViewSet(InstrumentedViewMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Profils patients et leurs dossiers, avec GET conditionnels.
+    """
+    queryset = PatientProfile.objects.select_related("user")
+    serializer_class = PatientProfileSerializer
+    permission_classes = [IsAuthenticated, IsAgentOrSuperAdmin]
+    pagination_class = KeysetPagination
+    validator_fields = ("updated_at", "user__updated_at")
+
+    @property
+    def keyset_ordering(self):
+        if self.action == "records":
+            return MedicalRecordViewSet.keyset_ordering
+        return ("id",)
+
+    @action(detail=True, methods=["get"])
+    def records(self, request, pk=None):
+        """Dossiers du patient : 304 si rien n'a changé, ``?updated_since=`` pour un delta."""
+        patient = self.get_object()
+        records = MedicalRecord.objects.filter(patient=patient).select_related("patient__user", "doctor__user")
+        fields = MedicalRecordViewSet.validator_fields
+        records = self.changed_since(records, parse_updated_since(request), fields)
+
+        def render():
+            page = self.paginate_queryset(records)
+            serializer = MedicalRecordSerializer(page, many=True, context=self.get_serializer_context())
+            return self.get_paginated_response(serializer.data)
+
+        return self.conditional_list(records, render, fields)
+
+    def get_permissions(self):
+        if self.action == "summary":
+            return [IsAuthenticated(), IsAgentOrDoctor()]
+        return super().get_permissions()
+
+    def summary_queryset(self):
+        """Patient et ses derniers dossiers : deux requêtes quel que soit le nombre de dossiers."""
+        recent = (
+            MedicalRecord.objects.select_related("doctor__user", "doctor__speciality")
+            .defer("description").order_by("-record_date", "-id")[:settings.PATIENT_SUMMARY_RECORDS]
+        )
+        return (
+            PatientProfile.objects.select_related("user")
+            .annotate(record_count=stats.counter_subquery(stats.RECORDS_BY_PATIENT))
+            .prefetch_related(Prefetch("medical_records", queryset=recent, to_attr="recent_records"))
+        )
+
+    @action(detail=True, methods=["get"])
+    def summary(self, request, pk=None):
+        """
+        Synthèse pour la consultation : identité, allergies, contact d'urgence
+        et ``PATIENT_SUMMARY_RECORDS`` derniers dossiers avec médecin et spécialité.
+
+        Un médecin n'accède qu'aux patients qu'il suit. La synthèse est mise en
+        cache quelques secondes par patient ; chaque consultation est journalisée.
+        """
+        if not pk.isdigit():
+            raise Http404
+        if request.user.role == User.Roles.DOCTOR and not request.user.is_superuser:
+            doctor = DoctorProfile.objects.filter(user_id=request.user.pk).values("pk")
+            if not PatientProfile.objects.treated_by(doctor).filter(pk=pk).exists():
+                raise Http404
+
+        def build():
+            return PatientSummarySerializer(get_object_or_404(self.summary_queryset(), pk=pk)).data
+
+        data = patient_summary_cache.get_or_build(int(pk), build)
+        audit.record(request, audit.Action.VIEW_PATIENT, [(data["id"], None)])
+        audit.record(request, audit.Action.VIEW_RECORD,
+                     [(data["id"], record["id"]) for record in data["recent_records"]])
+        return Response(data)
+
+
+class DoctorViewSet(InstrumentedViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Annuaire public des médecins, servi depuis un cache versionné.
+
+    Filtres : ``speciality``, ``is_available``, ``min_fee`` / ``max_fee``,
+    ``min_experience`` / ``max_experience``.
+    """
+    queryset = DoctorProfile.objects.select_related("user", "speciality")
+    serializer_class = DoctorDirectorySerializer
+    permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("consultation_fee", "id")
+
+    def list(self, request, *args, **kwargs):
+        filters = DoctorDirectoryFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        lookups = filters.to_filters()
+        params = {
+            "view": "list",
+            "host": request.get_host(),
+            "filters": lookups,
+            "cursor": request.query_params.get("cursor"),
+            "page_size": request.query_params.get("page_size"),
+        }
+
+        def build():
+            page = self.paginate_queryset(self.get_queryset().filter(**lookups))
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data).data
+
+        return Response(doctor_directory_cache.get_or_build(params, build))
+
+    def retrieve(self, request, *args, **kwargs):
+        def build():
+            return self.get_serializer(self.get_object()).data
+
+        return Response(doctor_directory_cache.get_or_build({"view": "detail", "pk": kwargs["pk"]}, build))
+
+
+class AppointmentViewSet(InstrumentedViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Rendez-vous : un patient voit et prend les siens, un médecin voit les
+    siens, agents et superadmins voient tout et réservent pour un patient.
+
+    ``slots`` (public) : premiers créneaux libres, lus dans l'index par jour.
+    """
+    queryset = Appointment.objects.select_related("doctor__user")
+    serializer_class = AppointmentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("start", "id")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if IsAgentOrSuperAdmin().has_permission(self.request, self):
+            return queryset
+        if user.role == User.Roles.DOCTOR:
+            return queryset.filter(doctor__user_id=user.pk)
+        return queryset.filter(patient__user_id=user.pk)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if IsAgentOrSuperAdmin().has_permission(request, self):
+            patient = data.get("patient")
+            if patient is None:
+                return Response({"patient": ["Ce champ est obligatoire."]}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            patient = PatientProfile.objects.filter(user_id=request.user.pk).first()
+            if patient is None or data.get("patient", patient) != patient:
+                return Response({"detail": "Seul un patient peut réserver pour lui-même."},
+                                status=status.HTTP_403_FORBIDDEN)
+        try:
+            appointment = book(data["doctor"], patient, data["start"], reason=data.get("reason", ""))
+        except SlotUnavailable as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(appointment).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        appointment = cancel(self.get_object())
+        return Response(self.get_serializer(appointment).data)
+
+    @action(detail=False, methods=["get"], permission_classes=[AllowAny])
+    def slots(self, request):
+        params = SlotSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        found = free_slots(**params.validated_data)
+        doctors = DoctorProfile.objects.select_related("user", "speciality").in_bulk(
+            {doctor for _, doctor in found}
+        )
+        length = timedelta(minutes=slot_minutes())
+        results = []
+        for start, doctor_id in found:
+            doctor = doctors[doctor_id]
+            results.append({
+                "start": start,
+                "end": start + length,
+                "doctor": doctor_id,
+                "doctor_name": doctor.user.get_full_name() or doctor.user.username,
+                "speciality": doctor.speciality_id,
+                "speciality_name": doctor.speciality.name if doctor.speciality else None,
+            })
+        return Response({"results": results})
+
+
+class StatsView(InstrumentedViewMixin, APIView):
+    """
+    Statistiques du tableau de bord, lues dans les compteurs (``app/stats.py``) :
+    une requête indexée, quel que soit le volume des tables.
+
+    ``?patient=<id>`` ajoute le nombre de dossiers du patient.
+    """
+    permission_classes = [IsAuthenticated, IsAgentOrSuperAdmin]
+
+    def get(self, request):
+        names = (stats.USERS_BY_ROLE, stats.DOCTORS_BY_SPECIALITY, stats.RECORDS_BY_MONTH)
+        data = {name: {} for name in names}
+        patient = request.query_params.get("patient")
+        if patient is not None and not patient.isdigit():
+            return Response({"patient": ["Un identifiant entier est attendu."]}, status=status.HTTP_400_BAD_REQUEST)
+        counters = StatCounter.objects.filter(name__in=names)
+        if patient is not None:
+            counters |= StatCounter.objects.filter(name=stats.RECORDS_BY_PATIENT, key=patient)
+        patient_records = 0
+        for name, key, value in stats.totals(counters):
+            if name == stats.RECORDS_BY_PATIENT:
+                patient_records = value
+            else:
+                data[name][key] = value
+        response = {
+            "users_by_role": data[stats.USERS_BY_ROLE],
+            "doctors_by_speciality": data[stats.DOCTORS_BY_SPECIALITY],
+            "records_by_month": dict(sorted(data[stats.RECORDS_BY_MONTH].items())),
+        }
+        if patient is not None:
+            response["patient_records"] = patient_records
+        return Response(response)
+
+
+class AccessEventViewSet(InstrumentedViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Journal des accès (agents / superadmins), du plus récent au plus ancien.
+
+    Filtres : ``patient``, ``actor``, ``since`` / ``until`` (30 derniers jours
+    par défaut : seules les partitions de la période sont lues).
+    """
+    queryset = AccessEvent.objects.all()
+    serializer_class = AccessEventSerializer
+    permission_classes = [IsAuthenticated, IsAgentOrSuperAdmin]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-occurred_at", "-id")
+
+    def filter_queryset(self, queryset):
+        filters = AccessEventFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return queryset.filter(**filters.to_filters())
+
+
+class AuthTokenView(InstrumentedViewMixin, APIView):
+    """
+    POST : échange identifiant / mot de passe contre un jeton d'API.
+    DELETE : révoque le jeton utilisé pour la requête.
+    """
+
+    def get_permissions(self):
+        if self.request.method == "POST":
+            return [AllowAny()]
+        return [IsAuthenticated()]
+
+    def post(self, request):
+        serializer = AuthTokenSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        token, key = issue_token(serializer.validated_data["user"],
+                                 name=serializer.validated_data.get("name", ""))
+        return Response({"token": key, "expires_at": token.expires_at},
+                        status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        if not isinstance(request.auth, str):
+            return Response({"detail": "Aucun jeton à révoquer pour cette requête."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def metrics(request):
+    """
+    Métriques du processus au format texte Prometheus.
+
+    L'appelant doit présenter ``Authorization: Bearer <METRICS_TOKEN>`` ; sans
+    ``METRICS_TOKEN`` défini, le point d'accès est fermé.
+    """
+    expected = settings.METRICS_TOKEN
+    if not expected:
+        return HttpResponse(status=403)
+    if not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {expected}"):
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
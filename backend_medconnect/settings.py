@@ -31,6 +31,13 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 
 # ===== CONFIGURATION DES APPLICATIONS =====
 
+# Admin Django : à désactiver sur les workers qui ne servent que l'API (démarrage plus rapide,
+# voir manage.py startup_profile)
+ENABLE_ADMIN = os.getenv('ENABLE_ADMIN', 'True').lower() in ['true', '1', 'yes']
+
+# Documentation de l'API (drf-yasg, requirements-docs.txt) : chargée seulement si activée
+ENABLE_API_DOCS = os.getenv('ENABLE_API_DOCS', 'False').lower() in ['true', '1', 'yes']
+
 INSTALLED_APPS = [
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -41,10 +48,14 @@ INSTALLED_APPS = [
     
     # Votre app DOIT venir avant admin
     'app',
-    
-    'django.contrib.admin',
 ]
 
+if ENABLE_ADMIN:
+    INSTALLED_APPS.append('django.contrib.admin')
+
+if ENABLE_API_DOCS:
+    INSTALLED_APPS.append('drf_yasg')
+
 # Ceci est CRUCIAL car vous utilisez un modèle User personnalisé
 AUTH_USER_MODEL = "app.User"
 
@@ -52,6 +63,10 @@ AUTH_USER_MODEL = "app.User"
 # ===== MIDDLEWARE =====
 
 MIDDLEWARE = [
+    # En premier : mesure l'ensemble de la chaîne (Server-Timing, /metrics)
+    'app.instrumentation.PerformanceMiddleware',
+    # Lectures sur réplica pour les GET autorisés, primaire après une écriture
+    'app.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -96,6 +111,84 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite : base locale, sans PostgreSQL (développement, mesures de performance)
+if os.getenv('DB_ENGINE', 'postgresql') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+    }
+
+# Hôte « -pooler » (PgBouncer en mode transaction) : pas de curseurs côté serveur,
+# qui ne survivent pas au changement de connexion entre deux transactions
+DB_POOLED = os.getenv('DB_POOLED', str('-pooler' in DATABASES['default'].get('HOST', ''))).lower() in ['true', '1', 'yes']
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = DB_POOLED
+
+
+# ===== RÉPLICAS EN LECTURE =====
+
+# DB_REPLICAS : réplicas PostgreSQL (« hôte » ou « hôte:port », séparés par des virgules),
+# ou chemins de fichiers avec DB_ENGINE=sqlite. Alias : replica1, replica2, …
+REPLICA_DATABASES = []
+for index, entry in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    replica = dict(DATABASES['default'])
+    if replica['ENGINE'].endswith('sqlite3'):
+        replica['NAME'] = entry.strip()
+    else:
+        host, _, port = entry.strip().partition(':')
+        replica.update(HOST=host, PORT=port or replica['PORT'])
+    # En test, le réplica lit la base de test du primaire
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica{index}'] = replica
+    REPLICA_DATABASES.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['app.db_router.ReplicaRouter']
+
+# Routes dont les GET peuvent être servis par un réplica (motifs sur le nom de vue)
+REPLICA_READ_ROUTES = [
+    'user-list',
+    'user-detail',
+    'doctor-list',
+    'doctor-detail',
+    'async-user-*',
+    'async-doctor-*',
+    'medical-record-export',
+    'admin:*_changelist',
+]
+
+# Lire ses écritures : durée d'épinglage au primaire après une écriture (secondes)
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+
+# Réplica écarté au-delà de ce retard de réplication (secondes)
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+
+# Intervalle entre deux vérifications de santé d'un réplica (secondes)
+REPLICA_HEALTH_INTERVAL = int(os.getenv('REPLICA_HEALTH_INTERVAL', '5'))
+
+
+# ===== CACHE =====
+
+# Mémoire locale par défaut : un seul processus. Avec plusieurs workers, ou des
+# imports / tâches de fond à côté du serveur, un cache partagé (ex. Redis) est
+# requis pour que les invalidations atteignent tous les processus (voir app/checks.py).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'medconnect'),
+    }
+}
+
+# Nombre de workers du serveur d'application (variable lue aussi par gunicorn)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+
+# Durée de vie des pages de l'annuaire des médecins (secondes)
+DOCTOR_DIRECTORY_CACHE_TIMEOUT = int(os.getenv('DOCTOR_DIRECTORY_CACHE_TIMEOUT', '300'))
+
+# Synthèse d'un patient (/api/patients/<id>/summary/) : durée de vie courte (0 = pas de cache)
+PATIENT_SUMMARY_CACHE_TIMEOUT = int(os.getenv('PATIENT_SUMMARY_CACHE_TIMEOUT', '30'))
+
+# Nombre de dossiers récents dans la synthèse d'un patient
+PATIENT_SUMMARY_RECORDS = int(os.getenv('PATIENT_SUMMARY_RECORDS', '10'))
+
 
 # ===== VALIDATION DES MOTS DE PASSE =====
 
@@ -138,10 +231,114 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'app.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-}
\ No newline at end of file
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.instrumentation.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# ===== INSTRUMENTATION =====
+
+# En-tête Server-Timing (db, auth, perm, serialize, render, total), envoyé seulement
+# au personnel (is_staff) ou en DEBUG : les durées renseignent sur les données
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'False').lower() in ['true', '1', 'yes']
+
+# Jeton exigé par /metrics (vide = point d'accès fermé)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
+# ===== JETONS D'AUTHENTIFICATION =====
+
+# Durée de validité d'un jeton (en secondes, 7 jours par défaut)
+AUTH_TOKEN_LIFETIME = int(os.getenv('AUTH_TOKEN_LIFETIME', str(7 * 24 * 3600)))
+
+# Cache en mémoire des jetons validés : nombre d'entrées et durée de vie (secondes)
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv('AUTH_PRINCIPAL_CACHE_SIZE', '10000'))
+AUTH_PRINCIPAL_CACHE_TTL = int(os.getenv('AUTH_PRINCIPAL_CACHE_TTL', '60'))
+
+
+# ===== CRÉATION D'UTILISATEURS EN MASSE =====
+
+# Nombre maximal de lignes acceptées par /api/users/bulk/
+BULK_USERS_MAX_ROWS = int(os.getenv('BULK_USERS_MAX_ROWS', '5000'))
+
+# Taille des lots pour bulk_create / bulk_update
+BULK_USERS_BATCH_SIZE = int(os.getenv('BULK_USERS_BATCH_SIZE', '500'))
+
+# Processus dédiés au hachage des mots de passe (1 = hachage séquentiel)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+
+# En dessous de ce nombre de mots de passe, le pool n'est pas utilisé
+PASSWORD_HASH_PARALLEL_THRESHOLD = int(os.getenv('PASSWORD_HASH_PARALLEL_THRESHOLD', '8'))
+
+
+
+# ===== EXPORT DES DOSSIERS MÉDICAUX =====
+
+# Lignes lues par requête lors des exports (pagination par clé)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+
+# ===== TÂCHES EN ARRIÈRE-PLAN =====
+
+# Lignes traitées par transaction (un lot = un intervalle de clés)
+JOB_CHUNK_SIZE = int(os.getenv('JOB_CHUNK_SIZE', '1000'))
+
+# Au-delà de ce nombre de lignes, les actions de masse de l'admin créent une tâche
+JOB_INLINE_THRESHOLD = int(os.getenv('JOB_INLINE_THRESHOLD', '1000'))
+
+# Tentatives avant échec définitif, et délai initial entre deux tentatives (doublé à chaque fois)
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY', '30'))
+
+# Tâche « en cours » sans signe de vie depuis ce délai (secondes) : reprise par un autre worker
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', '300'))
+
+# Attente entre deux recherches de tâche quand la file est vide (secondes)
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))
+
+
+# ===== STATISTIQUES =====
+
+# Lignes par compteur très sollicité (rôles, spécialités, mois) : moins d'attente sur
+# les verrous de ligne entre insertions concurrentes, lecture par somme
+STAT_COUNTER_SHARDS = int(os.getenv('STAT_COUNTER_SHARDS', '8'))
+
+
+# ===== RENDEZ-VOUS =====
+
+# Durée d'un créneau (minutes) ; une journée doit compter au plus 63 créneaux
+APPOINTMENT_SLOT_MINUTES = int(os.getenv('APPOINTMENT_SLOT_MINUTES', '30'))
+
+# Jours couverts par l'index des créneaux (recalculé chaque jour par rebuild_slot_index)
+APPOINTMENT_HORIZON_DAYS = int(os.getenv('APPOINTMENT_HORIZON_DAYS', '60'))
+
+# Accès d'un médecin aux dossiers d'un patient sans dossier rédigé : rendez-vous réservé,
+# à venir ou terminé depuis moins de ce nombre de jours (un rendez-vous annulé ne compte pas)
+APPOINTMENT_RECORD_ACCESS_DAYS = int(os.getenv('APPOINTMENT_RECORD_ACCESS_DAYS', '30'))
+
+
+# ===== JOURNAL D'AUDIT DES ACCÈS =====
+
+# Journalisation des consultations de dossiers et de profils patients
+AUDIT_ENABLED = os.getenv('AUDIT_ENABLED', 'True').lower() in ['true', '1', 'yes']
+
+# Écriture par lots : dès AUDIT_BUFFER_SIZE événements ou quand le plus ancien attend depuis
+# AUDIT_FLUSH_INTERVAL secondes (0 = à chaque consultation)
+AUDIT_BUFFER_SIZE = int(os.getenv('AUDIT_BUFFER_SIZE', '500'))
+AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', '2'))
+
+# Événements conservés en mémoire si la base est indisponible
+AUDIT_BUFFER_MAX = int(os.getenv('AUDIT_BUFFER_MAX', '100000'))
+
+# Base qui reçoit le journal
+AUDIT_DATABASE = os.getenv('AUDIT_DATABASE', 'default')
+
+# Partitions mensuelles créées à l'avance par audit_partitions (PostgreSQL)
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv('AUDIT_PARTITION_MONTHS_AHEAD', '3'))
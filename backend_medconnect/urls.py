@@ -14,9 +14,32 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path
+from django.conf import settings
+from django.urls import include, path
+
+from app.views import metrics
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    path('api/', include('app.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
+
+# Admin et documentation importés seulement s'ils sont activés (voir settings.py)
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
+if settings.ENABLE_API_DOCS:
+    from drf_yasg import openapi
+    from drf_yasg.views import get_schema_view
+    from rest_framework.permissions import IsAuthenticated
+
+    schema_view = get_schema_view(
+        openapi.Info(title="MedConnect API", default_version="v1"),
+        permission_classes=[IsAuthenticated],
+    )
+    urlpatterns[:0] = [
+        path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='api-docs'),
+        path('api/schema.json', schema_view.without_ui(cache_timeout=0), name='api-schema'),
+    ]
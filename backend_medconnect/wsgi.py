@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_medconnect.settings')
 
 application = get_wsgi_application()
+
+# Journal d'audit écrit par un thread du processus serveur (voir app/audit.py)
+from app.audit import buffer  # noqa: E402
+
+buffer.start()